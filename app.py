@@ -1,13 +1,117 @@
+import hashlib
+import io
 import json
 import os
 import time
 
-import akkio
 import pandas as pd
 import streamlit as st
 
-from src import utils  # Assuming the utils module is available
-from src.utils import PPTXExporter
+from src import (
+    datasets,
+    latency,
+    precompute,
+    utils,
+)  # Assuming the utils module is available
+from src.client import AkkioClient
+from src.jobs import BackgroundJob, run_report, run_transform
+from src.utils import DeckTemplate, PPTXExporter
+
+
+@st.cache_data(show_spinner=False)
+def load_upload(digest, file_extension, _data):
+    """
+    Parse an uploaded file once per content hash.
+
+    Streamlit reruns the script on every interaction; keying the cache on the
+    digest (the raw bytes are excluded from hashing) keeps reruns from
+    re-parsing the same upload.
+    """
+    if file_extension == ".xlsx":
+        return pd.read_excel(io.BytesIO(_data))
+    elif file_extension == ".csv":
+        return pd.read_csv(io.BytesIO(_data))
+
+    raise ValueError(
+        "Invalid file format. Please upload either an Excel file (.xlsx) or a CSV file (.csv)."
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def load_template(digest, _data):
+    """
+    Parse an uploaded template deck once per content hash.
+
+    The parsed template is shared by all sessions; every export copies it
+    instead of parsing the masters, layouts and media again.
+    """
+    return DeckTemplate(io.BytesIO(_data))
+
+
+def upload_digest(uploaded_file):
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+def read_upload(uploaded_file):
+    file_extension = os.path.splitext(uploaded_file.name)[1]
+    return load_upload(
+        upload_digest(uploaded_file), file_extension, uploaded_file.getvalue()
+    )
+
+
+def render_job(job, result_label=None):
+    st.progress(job.progress)
+    st.text(job.message)
+
+    time_remaining = job.time_remaining
+    if time_remaining is not None:
+        st.caption(f"About {latency.format_eta(time_remaining)} remaining")
+
+    for error in job.errors:
+        st.error(error)
+
+    if job.exception is not None:
+        st.error(f"Error occurred: {job.exception}")
+    elif job.done:
+        st.success("Processing complete!")
+        if result_label:
+            st.write(f"{result_label}: {job.result}")
+
+
+def get_session_client(api_key):
+    """
+    Return this session's AkkioClient, creating a new one when the key changes.
+
+    Each browser session keeps its own client in session state so analysts with
+    different keys never share credentials through module globals.
+    """
+    client = st.session_state.get("akkio_client")
+    if client is None or client.api_key != api_key:
+        client = AkkioClient(api_key)
+        st.session_state["akkio_client"] = client
+    return client
+
+
+@st.fragment(run_every=1)
+def poll_job(job_key, result_label=None):
+    """Refresh only this fragment while the job runs, then rerun the app once."""
+    job = st.session_state[job_key]
+    if job.done:
+        st.rerun()
+    render_job(job, result_label)
+
+
+def show_job(job_key, result_label=None):
+    """Render progress of the background job stored under job_key."""
+    job = st.session_state.get(job_key)
+    if job is None:
+        return
+
+    if job.done:
+        render_job(job, result_label)
+    else:
+        poll_job(job_key, result_label)
+
 
 # Streamlit App
 st.title("Akkio Automation Utilities")
@@ -20,8 +124,6 @@ with tab1:
     # Input fields for API Key and Project ID
     API_KEY = st.text_input("Enter API Key", type="password", key="api_key_tab1")
 
-    utils.API_KEY = API_KEY
-
     project_id = st.text_input("Enter Project ID", key="project_key_tab1")
 
     # Browse for directory to save responses
@@ -40,14 +142,51 @@ with tab1:
         "Upload Excel file with prompts", type="xlsx", key="uploader_key_tab1"
     )
 
+    render = st.selectbox(
+        "Chart rendering",
+        utils.RENDER_STRATEGIES,
+        help="local: render with Kaleido on this host (applies label slanting). "
+        "server: use PNGs rendered by Akkio. auto: server unless layout tweaks are needed.",
+        key="render_tab1",
+    )
+
+    slant_labels = st.checkbox(
+        "Slant x-axis labels",
+        value=True,
+        help="Rotates chart labels by 45 degrees, which needs local rendering. "
+        "Untick to keep Akkio's styling, so 'auto' uses the server rendered PNGs.",
+        key="slant_tab1",
+    )
+
+    prompts = []
     if uploaded_file is not None and resp_directory:
         try:
-            df = pd.read_excel(uploaded_file)
+            df = read_upload(uploaded_file)
             prompts = df.iloc[:, 0].tolist()
         except Exception as e:
             st.error(f"Error occurred while importing prompts: {str(e)}")
             prompts = []
 
+    # Serve the deck precomputed by `cli.py schedule` with the same API key while
+    # it is still fresh
+    precomputed = (
+        precompute.DeckCache().lookup(project_id, prompts, API_KEY)
+        if API_KEY and project_id and prompts
+        else None
+    )
+    if precomputed is not None:
+        built_at = time.strftime(
+            "%Y-%m-%d %H:%M", time.localtime(precomputed["created_at"])
+        )
+        st.info(f"A deck for these prompts was precomputed at {built_at}.")
+        with open(precomputed["deck"], "rb") as file:
+            st.download_button(
+                "Download Precomputed Deck",
+                file.read(),
+                file_name=f"{project_id}.pptx",
+                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            )
+
     if st.button("Create Report Artifacts"):
 
         # Add validation handling so that the user cannot proceed without entering the required fields
@@ -57,65 +196,31 @@ with tab1:
             )
             st.stop()
 
-        # Set up a progress bar
-        progress_bar = st.progress(0)
-
-        # Set up a placeholder for status messages
-        status_text = st.empty()
-
-        # Set up a placeholder for error messages
-        error_placeholder = st.empty()
-
-        # Example loop to demonstrate the progress
-        total_iterations = len(prompts)
-        for i, content in enumerate(prompts):
-
-            # Update the progress bar with each iteration
-            progress = int((i + 1) / total_iterations * 100)
-            progress_bar.progress(progress)
-
-            status_text.text(f"Processing prompt {i + 1} of {total_iterations}")
-
-            creation_resp = utils.create_chat_request(project_id, content)
-
-            task_id = creation_resp["task_id"]
-
-            # Set a timeout for 5 minutes (300 seconds)
-            timeout = 300
-            format_type = "plotly_json"
-            start_time = time.time()
-
-            # Loop until the task status is "SUCCEEDED"
-            while True:
-                status = utils.check_task_status(task_id)
-                if status["status"] == "SUCCEEDED":
-                    chat_id = status["metadata"]["location"].split("/chats/")[1]
-                    chat_response = utils.get_chat_results(chat_id, format_type)
-
-                    # File path with project_id and task_id
-                    file_name = f"project_{project_id}_taskid_{task_id}"
-                    file_path = os.path.join(resp_directory, file_name)
-
-                    utils.process_chat_output(chat_response, file_path)
-                    break
-
-                elif status["status"] == "FAILED":
-                    error_placeholder.error("Task failed.")
-                    break
-
-                elif time.time() - start_time > timeout:
-                    error_placeholder.error("Task timed out.")
-                    break
-
-                # Wait for some time before checking again to avoid overwhelming the server
-                time.sleep(5)
-
-        # Display a message when done
-        st.success("Processing complete!")
+        job = st.session_state.get("report_job")
+        if job is not None and job.running:
+            st.warning("A report is already running for this session.")
+        else:
+            st.session_state["report_directory"] = resp_directory
+            st.session_state["report_job"] = BackgroundJob(
+                run_report,
+                project_id,
+                prompts,
+                resp_directory,
+                render=render,
+                client=get_session_client(API_KEY),
+                layout_overrides=utils.LAYOUT_OVERRIDES if slant_labels else {},
+                total=len(prompts),
+            ).start()
+
+    show_job("report_job")
 
     # Text box to name presentation
     output_filename = st.text_input("Enter PPTX filename", value="output_deck.pptx")
 
+    template_file = st.file_uploader(
+        "Upload a branded template deck (optional)", type="pptx", key="template_tab1"
+    )
+
     if st.button("Export to PPTX"):
 
         # Add validation handling so that the user cannot proceed without entering the required fields
@@ -128,8 +233,32 @@ with tab1:
         # Setup
         pptx_filepath = os.path.join(resp_directory, output_filename)
 
+        # Export straight from memory when this session just ran the report into
+        # the same directory, otherwise read the artifacts folder
+        job = st.session_state.get("report_job")
+        if (
+            job is not None
+            and job.done
+            and job.result is not None
+            and len(job.result)
+            and st.session_state.get("report_directory") == resp_directory
+        ):
+            source = job.result
+        else:
+            source = resp_directory
+
+        template = None
+        if template_file is not None:
+            try:
+                template = load_template(
+                    upload_digest(template_file), template_file.getvalue()
+                )
+            except Exception as e:
+                st.error(f"Error occurred while reading the template: {str(e)}")
+                st.stop()
+
         # Initialize object
-        obj = PPTXExporter(resp_directory)
+        obj = PPTXExporter(source, template=template)
 
         # Create slides
         obj.create()
@@ -145,9 +274,6 @@ with tab2:
     # Input fields for API Key and Project ID
     API_KEY = st.text_input("Enter API Key", type="password", key="api_key_tab2")
 
-    utils.API_KEY = API_KEY
-    akkio.api_key = API_KEY
-
     project_id = st.text_input(
         "Enter Deployed Transform Project ID", key="project_key_tab2"
     )
@@ -159,19 +285,10 @@ with tab2:
         "Upload Data", type=["xlsx", "csv"], key="uploader_key_tab2"
     )
 
+    df = None
     if uploaded_file is not None and resp_directory:
         try:
-            file_name = os.path.splitext(uploaded_file.name)[0]
-            file_extension = os.path.splitext(uploaded_file.name)[1]
-            if file_extension == ".xlsx":
-                df = pd.read_excel(uploaded_file)
-            elif file_extension == ".csv":
-                df = pd.read_csv(uploaded_file)
-            else:
-                st.error(
-                    "Invalid file format. Please upload either an Excel file (.xlsx) or a CSV file (.csv)."
-                )
-                df = None
+            df = read_upload(uploaded_file)
             # df = utils.import_data(uploaded_file.name)
         except Exception as e:
             st.error(f"Error occurred while importing data: {str(e)}")
@@ -179,74 +296,84 @@ with tab2:
 
     predict_field = st.text_input("Enter Predict Field")
 
-    if st.button("Transform Data"):
+    preview_first = st.checkbox(
+        "Preview a sample before transforming all rows",
+        value=True,
+        help=f"Transform about {datasets.PREVIEW_ROWS} rows (covering every value of the "
+        "predict field) first, so a wrong project or predict field shows up in seconds.",
+        key="preview_tab2",
+    )
+
+    def start_transform():
+        job = st.session_state.get("transform_job")
+        if df is None:
+            st.error("Please upload data that can be read to be transformed.")
+        elif job is not None and job.running:
+            st.warning("A transform is already running for this session.")
+        else:
+            st.session_state["transform_job"] = BackgroundJob(
+                run_transform,
+                project_id,
+                project_name,
+                df,
+                predict_field,
+                client=get_session_client(API_KEY),
+                total=len(df) + 1,
+            ).start()
+
+    if st.button("Preview Transform" if preview_first else "Transform Data"):
         # Add validation handling so that the user cannot proceed without entering the required fields
-        if not API_KEY or not project_id or not project_name or not uploaded_file:
+        if not API_KEY or not project_id or not project_name or df is None:
             st.error(
                 "Please fill in all the required fields and upload data to be transformed."
             )
             st.stop()
 
-        # Set up a progress bar
-        progress_bar = st.progress(0)
-
-        # Set up a placeholder for status messages
-        status_text = st.empty()
-
-        # Set up a placeholder for error messages
-        error_placeholder = st.empty()
-
-        status_text.text("Transforming data...")
-
-        transformed_df = utils.transform_data(
-            project_id, utils.df_to_dict(df), save=False
+        if preview_first:
+            st.session_state.pop("transform_preview", None)
+            with st.spinner("Transforming a sample of the data..."):
+                try:
+                    preview, fields = utils.preview_transform(
+                        project_id,
+                        df,
+                        stratify_by=predict_field or None,
+                        client=get_session_client(API_KEY),
+                    )
+                    st.session_state["transform_preview"] = {
+                        "inputs": (project_id, upload_digest(uploaded_file)),
+                        "rows": len(df),
+                        "data": preview,
+                        "fields": fields,
+                    }
+                except Exception as e:
+                    st.error(f"Transforming the sample failed: {str(e)}")
+        else:
+            start_transform()
+
+    # Only show a preview that matches the current project and upload
+    preview = st.session_state.get("transform_preview")
+    if (
+        preview_first
+        and preview is not None
+        and uploaded_file is not None
+        and preview["inputs"] == (project_id, upload_digest(uploaded_file))
+    ):
+        st.subheader("Preview")
+        st.caption(
+            f"{len(preview['data'])} of {preview['rows']} rows after the transform"
         )
+        st.dataframe(preview["data"])
+        st.dataframe(pd.DataFrame(preview["fields"])[["name", "type"]], hide_index=True)
 
-        # Update progress bar to 50%
-        progress_bar.progress(50)
-
-        # Create and add rows to dataset -- create new utility function
-        # file_name = os.path.splitext(uploaded_file.name)[0]
-
-        # dataset_name = file_name + "_transformed"
-
-        status_text.text(f"Creating project with project name: {project_name}...")
-
-        transformed_dataset_id = utils.create_dataset(project_name, transformed_df)
-
-        # Train ML Model
-        # (Train a dummy model to force project creation in the UI (I know this is suboptimal, but we will optimize this out in our v2 API))
-
-        # UI Mapping:
-        #     1    = Super Fast (Do not recommend)
-        #     10   = Fastest
-        #     60   = High Quality
-        #     300  = Higher Quality
-        #     1800 = Production
-
-        training_mode = 1
-        predict_field = [predict_field]
-        ignore_fields = []
-
-        new_model = akkio.create_model(
-            transformed_dataset_id,
-            predict_field,
-            ignore_fields,
-            {"duration": training_mode, "extra_attention": False},
-        )
-
-        if new_model["status"] != "success":
-            raise ValueError(
-                f"Project creation failed due to model training error. Model training details: {new_model}"
+        if predict_field and predict_field not in preview["data"].columns:
+            st.warning(
+                f"Predict field '{predict_field}' is not a column of the transformed data."
             )
 
-        # Update progress bar to 100%
-        progress_bar.progress(100)
-
-        # Display a message when done
-        st.success("Processing complete!")
-
-        # grab project id from new_model
-        transformed_project_id = new_model["model_id"]
+        if st.button("Transform All Rows"):
+            if not API_KEY or not project_name:
+                st.error("Please fill in all the required fields.")
+                st.stop()
+            start_transform()
 
-        st.write(f"New Project ID: {transformed_project_id}")
+    show_job("transform_job", result_label="New Project ID")
@@ -0,0 +1,95 @@
+"""
+Import-time benchmark for the src modules.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and the
+best cumulative time over several runs is compared against a budget, so a heavy
+dependency slipping back into module scope fails the check:
+
+    python benchmark_import_time.py --budget-ms 150
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+MODULES = [
+    "src.utils",
+    "src.client",
+    "src.hedging",
+    "src.batching",
+    "src.async_client",
+    "src.async_utils",
+    "src.datasets",
+    "src.transform_cache",
+    "src.latency",
+    "src.reprocess",
+    "src.precompute",
+    "src.jobs",
+    "src.reports",
+    "src.artifacts",
+    "src.streaming",
+]
+
+# Heavy dependencies that must not be imported just by importing src modules
+HEAVY_MODULES = ["pandas", "plotly", "pptx", "sklearn", "akkio", "requests"]
+
+
+def measure(module):
+    """
+    Import module in a fresh interpreter
+
+    Returns:
+        tuple: (cumulative import time in ms, set of imported top-level packages)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if not match:
+            continue
+        imported.add(match.group(3).split(".")[0])
+        if match.group(3) == module:
+            cumulative_us = int(match.group(1))
+
+    return cumulative_us / 1000, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="Maximum cumulative import time per module",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs per module")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        best_ms, imported = min(measure(module) for _ in range(args.runs))
+        heavy = sorted(imported.intersection(HEAVY_MODULES))
+
+        status = "ok"
+        if best_ms > args.budget_ms or heavy:
+            status = "FAIL"
+            failed = True
+
+        print(f"{module:<20}{best_ms:>10.1f} ms  {status}")
+        if heavy:
+            print(f"{'':<20}eagerly imports: {', '.join(heavy)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
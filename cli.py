@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import sys
+
+from src import precompute, profiling, reports, reprocess, utils
+from src.client import AkkioClient
+from src.hedging import HedgePolicy
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Akkio report automation")
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("AKKIO_API_KEY"),
+        help="Akkio API key (defaults to the AKKIO_API_KEY environment variable)",
+    )
+
+    parser.add_argument(
+        "--compression",
+        choices=["gzip", "deflate"],
+        help="Compress large request bodies with this encoding",
+    )
+
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Duplicate task status and result requests that run slower than usual",
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        default=os.environ.get(profiling.PROFILE_ENV),
+        help="Write per-stage profiles and a combined flamegraph to DIR",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser(
+        "report", help="Run a prompt workbook against one or more projects"
+    )
+    source = report.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--prompts", help="Prompt workbook (.xlsx/.csv) to run for every project"
+    )
+    source.add_argument(
+        "--matrix",
+        help="CSV/Excel file with project_id and prompts (workbook path) columns",
+    )
+    report.add_argument("--projects", nargs="+", default=[], help="Project IDs")
+    report.add_argument(
+        "--projects-file", help="Text file with one project ID per line"
+    )
+    report.add_argument(
+        "--out-dir", default="artifacts", help="Folder for artifacts and decks"
+    )
+    report.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Maximum number of chat tasks in flight across all projects",
+    )
+    report.add_argument(
+        "--render",
+        choices=utils.RENDER_STRATEGIES,
+        default="local",
+        help="Where charts are rasterized: locally with Kaleido or by the Akkio server",
+    )
+    report.add_argument(
+        "--layout",
+        type=json.loads,
+        default=utils.LAYOUT_OVERRIDES,
+        help="Plotly layout overrides as JSON; '{}' keeps the server's styling, "
+        "so --render auto uses server rendered PNGs",
+    )
+    report.add_argument(
+        "--no-persist",
+        action="store_true",
+        help="Keep artifacts in memory only and write just the decks",
+    )
+    report.add_argument(
+        "--no-export", action="store_true", help="Only write artifacts, skip decks"
+    )
+    report.add_argument(
+        "--save-responses",
+        action="store_true",
+        help="Also save raw chat responses so the run can be re-rendered with reprocess",
+    )
+    report.add_argument(
+        "--template", help="Branded .pptx every deck starts from (parsed once)"
+    )
+    report.set_defaults(func=run_report, needs_api_key=True)
+
+    rerender = subparsers.add_parser(
+        "reprocess", help="Re-render a folder of saved chat responses offline"
+    )
+    rerender.add_argument("in_dir", help="Folder with saved chat responses")
+    rerender.add_argument(
+        "--out-dir", default="reprocessed", help="Folder for the new artifacts"
+    )
+    rerender.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (defaults to the CPU count)",
+    )
+    rerender.add_argument(
+        "--layout",
+        type=json.loads,
+        default=utils.LAYOUT_OVERRIDES,
+        help='Plotly layout overrides as JSON, e.g. \'{"xaxis": {"tickangle": 0}}\'',
+    )
+    rerender.add_argument(
+        "--table-format",
+        choices=sorted(utils.TABLE_WRITERS),
+        default=utils.TABLE_FORMAT,
+        help="Storage format for tables",
+    )
+    rerender.add_argument(
+        "--csv", action="store_true", help="Also write a CSV copy of every table"
+    )
+    rerender.add_argument(
+        "--force", action="store_true", help="Re-render responses that are up to date"
+    )
+    rerender.add_argument(
+        "--deck",
+        help="Export the re-rendered artifacts to this deck; with several "
+        "folders (e.g. projects), one <deck>_<folder>.pptx per folder",
+    )
+    rerender.add_argument("--template", help="Branded .pptx the deck starts from")
+    rerender.set_defaults(func=run_reprocess, needs_api_key=False)
+
+    scheduler = subparsers.add_parser(
+        "schedule", help="Precompute decks off-peak for the app to serve"
+    )
+    scheduler.add_argument("schedule_file", help="JSON file with the schedules")
+    scheduler.add_argument(
+        "--once",
+        action="store_true",
+        help="Precompute every schedule now and exit instead of running on schedule",
+    )
+    scheduler.add_argument(
+        "--cache-dir",
+        default=precompute.DECK_CACHE,
+        help=f"Folder to publish decks to (defaults to ${precompute.DECK_CACHE_ENV} "
+        "or ~/.akkio-ce/decks, which is where the app reads them)",
+    )
+    scheduler.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Chat tasks in flight per run unless a schedule sets max_workers",
+    )
+    scheduler.set_defaults(func=run_schedule, needs_api_key=True)
+
+    exporter = subparsers.add_parser(
+        "export", help="Export artifact folders to decks, several at once"
+    )
+    exporter.add_argument(
+        "in_dirs", nargs="+", help="Artifact folders, one deck is written per folder"
+    )
+    exporter.add_argument(
+        "--out-dir",
+        help="Folder for the decks (defaults to next to each artifact folder)",
+    )
+    exporter.add_argument(
+        "--template", help="Branded .pptx every deck starts from (parsed once)"
+    )
+    exporter.add_argument(
+        "--max-workers",
+        type=int,
+        default=reports.EXPORT_WORKERS,
+        help="Maximum number of decks built at the same time",
+    )
+    exporter.set_defaults(func=run_export, needs_api_key=False)
+
+    return parser
+
+
+def read_project_ids(args):
+    project_ids = list(args.projects)
+    if args.projects_file:
+        with open(args.projects_file, "r", encoding="utf-8") as file:
+            project_ids.extend(line.strip() for line in file if line.strip())
+    return project_ids
+
+
+def run_report(args):
+    if args.matrix:
+        project_prompts = reports.load_matrix(args.matrix)
+    else:
+        project_ids = read_project_ids(args)
+        if not project_ids:
+            raise SystemExit("Provide --projects or --projects-file with --prompts.")
+        prompts = reports.load_prompts(args.prompts)
+        project_prompts = {project_id: prompts for project_id in project_ids}
+
+    total = sum(len(prompts) for prompts in project_prompts.values())
+    print(
+        f"Running {total} prompts across {len(project_prompts)} projects with {args.max_workers} workers"
+    )
+
+    client = AkkioClient(
+        args.api_key,
+        pool_size=args.max_workers,
+        compression=args.compression,
+        hedging=HedgePolicy() if args.hedge else None,
+    )
+
+    results = reports.generate_reports(
+        project_prompts,
+        args.out_dir,
+        max_workers=args.max_workers,
+        export=not args.no_export,
+        render=args.render,
+        persist=not args.no_persist,
+        client=client,
+        save_responses=args.save_responses,
+        template=args.template,
+        layout_overrides=args.layout,
+    )
+
+    print(reports.summarize(results).to_string(index=False))
+    if client.hedging is not None:
+        print(
+            f"Hedged {client.hedging.hedged} requests, {client.hedging.hedge_wins} answered by the duplicate"
+        )
+
+    return 1 if any(result["errors"] for result in results.values()) else 0
+
+
+def run_reprocess(args):
+    results = reprocess.reprocess(
+        args.in_dir,
+        args.out_dir,
+        max_workers=args.workers,
+        layout_overrides=args.layout,
+        table_format=args.table_format,
+        write_csv=args.csv,
+        force=args.force,
+    )
+
+    print(
+        f"Processed {len(results['processed'])}, skipped {len(results['skipped'])} up to date, {len(results['errors'])} failed"
+    )
+
+    if args.deck:
+        artifacts = results["processed"] + results["skipped"]
+        if not artifacts:
+            print("No artifacts to export")
+            return 1
+
+        errors = reports.export_decks(
+            reprocess.deck_paths(args.out_dir, artifacts, args.deck),
+            template=args.template,
+        )
+        failed = [error for error in errors.values() if error is not None]
+        print(f"Exported {len(errors) - len(failed)} decks, {len(failed)} failed")
+        if failed:
+            return 1
+
+    return 1 if results["errors"] else 0
+
+
+def run_schedule(args):
+    entries = precompute.load_schedule(args.schedule_file)
+    client = AkkioClient(
+        args.api_key,
+        pool_size=args.max_workers,
+        compression=args.compression,
+        hedging=HedgePolicy() if args.hedge else None,
+    )
+
+    precompute.run_schedule(
+        entries,
+        client=client,
+        cache=precompute.DeckCache(args.cache_dir),
+        once=args.once,
+        max_workers=args.max_workers,
+    )
+    return 0
+
+
+def run_export(args):
+    decks = {}
+    for in_dir in args.in_dirs:
+        in_dir = os.path.normpath(in_dir)
+        out_dir = args.out_dir or os.path.dirname(in_dir)
+        decks[os.path.join(out_dir, f"{os.path.basename(in_dir)}.pptx")] = in_dir
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    errors = reports.export_decks(
+        decks, template=args.template, max_workers=args.max_workers
+    )
+
+    failed = [error for error in errors.values() if error is not None]
+    print(f"Exported {len(errors) - len(failed)} decks, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.needs_api_key and not args.api_key:
+        raise SystemExit("An API key is required (--api-key or AKKIO_API_KEY).")
+
+    if args.profile:
+        profiling.enable(args.profile)
+
+    try:
+        return args.func(args)
+    finally:
+        profiling.disable()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
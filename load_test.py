@@ -0,0 +1,375 @@
+"""
+Load test for concurrent app sessions against a local mock Akkio backend.
+
+Each simulated session does what a user of app.py does: it starts the same
+background job the "Create Report Artifacts" or "Transform Data" button starts
+(with its own AkkioClient, like a browser session), polls its progress once a
+second like the progress fragment and, for reports, exports the deck. All
+sessions share this process, as they share the Streamlit server process, while
+host CPU, memory and Kaleido process counts are sampled:
+
+    python load_test.py --sessions 8 --workload mixed
+
+Local caches (latency history, dataset registry, transform cache) are
+redirected to the output folder so runs neither read nor pollute them.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from src import datasets, latency, transform_cache
+from src.client import AkkioClient
+from src.hedging import HedgePolicy
+from src.jobs import BackgroundJob, run_report, run_transform
+from src.mock_backend import MockAkkio
+from src.utils import PPTXExporter, RENDER_STRATEGIES
+
+try:
+    import psutil
+except ImportError:  # Host metrics are reduced to what /proc offers
+    psutil = None
+
+DEFAULT_PROMPTS = [
+    "Show spend by device in a table",
+    "Plot a bar chart of spend by placement",
+    "Summarize the main drivers of conversions",
+    "Show clicks by campaign as a line chart",
+]
+
+# Seconds between progress polls, matching the app's progress fragment
+POLL_SECONDS = 1.0
+
+
+class HostMonitor:
+    """
+    Samples CPU, memory and Kaleido processes of this process tree.
+
+    Attributes:
+    -----------
+    samples : list of dict
+        One entry per sample with ``cpu`` (percent of one core), ``rss_mb``
+        and ``kaleido`` (number of Kaleido processes).
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._process = psutil.Process() if psutil else None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _tree(self):
+        processes = [self._process]
+        try:
+            processes += self._process.children(recursive=True)
+        except psutil.Error:
+            pass
+        return processes
+
+    def _sample(self):
+        if self._process is None:
+            return {"cpu": None, "rss_mb": None, "kaleido": _count_kaleido_proc()}
+
+        cpu = rss = kaleido = 0
+        for process in self._tree():
+            try:
+                cpu += process.cpu_percent(None)
+                rss += process.memory_info().rss
+                if "kaleido" in " ".join(process.cmdline()):
+                    kaleido += 1
+            except psutil.Error:
+                continue
+
+        return {"cpu": cpu, "rss_mb": rss / 2**20, "kaleido": kaleido}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append(self._sample())
+
+    def summary(self):
+        def values(key):
+            return [s[key] for s in self.samples if s[key] is not None]
+
+        cpu, rss, kaleido = values("cpu"), values("rss_mb"), values("kaleido")
+        return {
+            "cpu_mean": statistics.mean(cpu) if cpu else None,
+            "cpu_peak": max(cpu, default=None),
+            "rss_peak_mb": max(rss, default=None),
+            "kaleido_peak": max(kaleido, default=None),
+        }
+
+
+def _count_kaleido_proc():
+    """Count Kaleido processes from /proc when psutil is not installed"""
+    if not os.path.isdir("/proc"):
+        return None
+
+    count = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as file:
+                if b"kaleido" in file.read():
+                    count += 1
+        except OSError:
+            continue
+    return count
+
+
+def _wait(job, session):
+    """Poll job like the progress fragment until it finishes"""
+    while not job.done:
+        # Mimic the fragment reading the properties it shows on every rerun
+        _ = job.progress, job.time_remaining
+        session["polls"] += 1
+        time.sleep(POLL_SECONDS)
+
+
+def session_client(session, backend, hedge):
+    return AkkioClient(
+        f"key-{session['id']}",
+        hedging=HedgePolicy() if hedge else None,
+        **backend.client_settings(),
+    )
+
+
+def report_session(session, backend, prompts, out_dir, args):
+    client = session_client(session, backend, args.hedge)
+    resp_directory = os.path.join(out_dir, f"session_{session['id']:03d}")
+    os.makedirs(resp_directory, exist_ok=True)
+
+    job = BackgroundJob(
+        run_report,
+        f"project-{session['id']}",
+        prompts,
+        resp_directory,
+        render=args.render,
+        client=client,
+        total=len(prompts),
+    ).start()
+    _wait(job, session)
+    session["job_seconds"] = job.finished_at - job.started_at
+    session["errors"] += job.errors
+    if job.exception is not None:
+        raise job.exception
+
+    export_start = time.time()
+    exporter = PPTXExporter(job.result)
+    exporter.create()
+    exporter.save(os.path.join(resp_directory, "output_deck.pptx"))
+    session["export_seconds"] = time.time() - export_start
+    if client.hedging is not None:
+        session["hedged"] = client.hedging.hedged
+        session["hedge_wins"] = client.hedging.hedge_wins
+
+
+def transform_session(session, backend, rows, out_dir, args):
+    import pandas as pd
+
+    client = session_client(session, backend, args.hedge)
+
+    # Distinct data per session so the transform cache and dataset reuse never hit
+    df = pd.DataFrame(
+        {
+            "session": session["id"],
+            "row": range(rows),
+            "spend": [(i * 37 + session["id"]) % 1000 / 10 for i in range(rows)],
+        }
+    )
+
+    job = BackgroundJob(
+        run_transform,
+        f"transform-project-{session['id']}",
+        f"load test {session['id']} {time.time()}",
+        df,
+        "spend",
+        client=client,
+        total=len(df) + 1,
+    ).start()
+    _wait(job, session)
+    session["job_seconds"] = job.finished_at - job.started_at
+    if job.exception is not None:
+        raise job.exception
+
+
+WORKLOADS = {"report": report_session, "transform": transform_session}
+
+
+def run_session(session, backend, args):
+    start = time.time()
+    try:
+        workload = WORKLOADS[session["workload"]]
+        workload_arg = args.prompts if session["workload"] == "report" else args.rows
+        workload(session, backend, workload_arg, args.out_dir, args)
+    except Exception as e:
+        session["errors"].append(str(e))
+    session["seconds"] = time.time() - start
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return None
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument(
+        "--workload",
+        choices=["report", "transform", "mixed"],
+        default="report",
+        help="What each session runs; mixed alternates report and transform",
+    )
+    parser.add_argument(
+        "--ramp",
+        type=float,
+        default=0.0,
+        help="Seconds over which session starts are spread",
+    )
+    parser.add_argument(
+        "--prompts-file", help="Text file with one prompt per line for reports"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=2000, help="Rows per transform session"
+    )
+    parser.add_argument("--render", choices=RENDER_STRATEGIES, default="local")
+    parser.add_argument(
+        "--chat-seconds",
+        type=float,
+        default=2.0,
+        help="Simulated server time per chat prompt",
+    )
+    parser.add_argument(
+        "--stall-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of status and result requests the mock stalls for 30s",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Give session clients a hedging policy for slow requests",
+    )
+    parser.add_argument("--out-dir", help="Folder for artifacts (default: temporary)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    args.out_dir = args.out_dir or tempfile.mkdtemp(prefix="akkio-load-")
+    if args.prompts_file:
+        with open(args.prompts_file, "r", encoding="utf-8") as file:
+            args.prompts = [line.strip() for line in file if line.strip()]
+    else:
+        args.prompts = DEFAULT_PROMPTS
+
+    # Keep the run independent of the user's local caches
+    state_dir = os.path.join(args.out_dir, "state")
+    latency.LATENCY_HISTORY = os.path.join(state_dir, "latency.json")
+    datasets.DATASET_REGISTRY = os.path.join(state_dir, "datasets.json")
+    datasets.SYNC_STATE_DIR = os.path.join(state_dir, "sync")
+    transform_cache.TRANSFORM_CACHE = os.path.join(state_dir, "transform_cache.sqlite")
+
+    sessions = [
+        {
+            "id": i + 1,
+            "workload": (
+                args.workload
+                if args.workload != "mixed"
+                else ("report", "transform")[i % 2]
+            ),
+            "errors": [],
+            "polls": 0,
+        }
+        for i in range(args.sessions)
+    ]
+
+    backend = MockAkkio(
+        chat_seconds=args.chat_seconds, stall_rate=args.stall_rate
+    ).start()
+    monitor = HostMonitor().start()
+    print(
+        f"Running {args.sessions} {args.workload} sessions against the mock backend on port {backend.port}"
+    )
+
+    start = time.time()
+    threads = []
+    for i, session in enumerate(sessions):
+        if args.ramp and i:
+            time.sleep(args.ramp / max(args.sessions - 1, 1))
+        thread = threading.Thread(target=run_session, args=(session, backend, args))
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+    wall = time.time() - start
+
+    monitor.stop()
+    backend.stop()
+
+    print(f"\n{'session':<9}{'workload':<11}{'seconds':>9}{'export':>9}  errors")
+    for session in sessions:
+        export = session.get("export_seconds")
+        print(
+            f"{session['id']:<9}{session['workload']:<11}{session['seconds']:>9.2f}"
+            f"{(f'{export:.2f}' if export is not None else '-'):>9}  {len(session['errors'])}"
+        )
+
+    latencies = [session["seconds"] for session in sessions]
+    host = monitor.summary()
+    summary = {
+        "sessions": args.sessions,
+        "workload": args.workload,
+        "wall_seconds": wall,
+        "p50_seconds": percentile(latencies, 0.5),
+        "p95_seconds": percentile(latencies, 0.95),
+        "max_seconds": max(latencies),
+        "failed_sessions": sum(1 for session in sessions if session["errors"]),
+        "backend_requests": backend.requests,
+        **host,
+    }
+
+    def fmt(value, spec):
+        return "n/a" if value is None else format(value, spec)
+
+    print(
+        f"\nwall {wall:.1f}s  p50 {fmt(summary['p50_seconds'], '.1f')}s  "
+        f"p95 {fmt(summary['p95_seconds'], '.1f')}s  max {summary['max_seconds']:.1f}s"
+    )
+    print(
+        f"host cpu mean {fmt(host['cpu_mean'], '.0f')}%  peak {fmt(host['cpu_peak'], '.0f')}%  "
+        f"rss peak {fmt(host['rss_peak_mb'], '.0f')} MB  kaleido processes peak {fmt(host['kaleido_peak'], 'd')}"
+    )
+    print(f"artifacts in {args.out_dir}")
+
+    for session in sessions:
+        for error in session["errors"]:
+            print(f"session {session['id']}: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"summary": summary, "sessions": sessions}, file, indent=2)
+
+    return 1 if summary["failed_sessions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
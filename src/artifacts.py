@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import namedtuple
+
+from src import utils
+
+# kind is one of "image" (PNG bytes), "table" (DataFrame) or "text" (str).
+# path is the file the artifact was persisted to, or None when kept in memory.
+Artifact = namedtuple("Artifact", ["name", "kind", "data", "path"])
+
+
+class ArtifactStore:
+    """
+    Keeps rendered chat artifacts in memory for a single-process report run.
+
+    ``utils.process_chat_output`` adds artifacts here instead of writing them to
+    disk when a store is passed, and ``PPTXExporter`` accepts the store in place
+    of a folder, so images reach ``add_picture`` as streams and tables as
+    DataFrames without a filesystem round trip. With ``persist=True`` every
+    artifact is also written to its usual path so the folder can be exported or
+    inspected later.
+
+    Attributes:
+    -----------
+    persist : bool
+        Whether artifacts are also written to disk.
+    table_format : str
+        Format used for persisted tables (see ``utils.TABLE_FORMAT``).
+    write_csv : bool
+        Whether persisted tables also get a CSV copy.
+    """
+
+    def __init__(self, persist=False, table_format=None, write_csv=False):
+        self.persist = persist
+        self.table_format = table_format or utils.TABLE_FORMAT
+        self.write_csv = write_csv
+
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    def _add(self, name, kind, data, path=None):
+        artifact = Artifact(os.path.basename(name), kind, data, path)
+        with self._lock:
+            self._artifacts[artifact.name] = artifact
+        return path or name
+
+    def add_image(self, output_file_path, data):
+        """Add PNG bytes; output_file_path includes the ``_image.png`` suffix"""
+        path = None
+        if self.persist:
+            with open(output_file_path, "wb") as file:
+                file.write(data)
+            path = output_file_path
+        return self._add(output_file_path, "image", data, path)
+
+    def add_table(self, output_file_path, df):
+        """Add a DataFrame; output_file_path is the artifact path without suffix"""
+        path = None
+        if self.persist:
+            path = utils.write_table(
+                df, output_file_path, self.table_format, self.write_csv
+            )
+        return self._add(output_file_path + "_table", "table", df, path)
+
+    def add_text(self, output_file_path, content):
+        """Add text; output_file_path includes the ``_text.txt`` suffix"""
+        path = None
+        if self.persist:
+            with open(output_file_path, "w", encoding="utf-8") as file:
+                file.write(content)
+            path = output_file_path
+        return self._add(output_file_path, "text", content, path)
+
+    def __iter__(self):
+        """Iterate artifacts in name order, matching the folder export order"""
+        with self._lock:
+            artifacts = sorted(self._artifacts.values(), key=lambda a: a.name)
+        return iter(artifacts)
+
+    def __len__(self):
+        return len(self._artifacts)
@@ -0,0 +1,309 @@
+import asyncio
+import time
+
+from src._lazy import lazy_import
+from src.client import AkkioClient
+
+httpx = lazy_import("httpx")
+
+# Statuses of idempotent requests that are retried with backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Request bodies with at least this many rows are JSON-encoded off the event loop
+ENCODE_IN_THREAD_ROWS = 10_000
+
+
+class AsyncAkkioClient(AkkioClient):
+    """
+    asyncio counterpart of AkkioClient, backed by a single httpx.AsyncClient.
+
+    Settings, URLs and request body encoding are shared with AkkioClient, and
+    the API methods have the same names and return values but are coroutines.
+    All tasks on the event loop share one connection pool of ``pool_size``
+    connections; requests beyond that wait for a free connection, so hundreds
+    of concurrent chat tasks need neither threads nor extra sockets.
+
+    Use the client from a single event loop and close it with ``aclose`` (or
+    ``async with``). Requires ``httpx``.
+
+    Attributes:
+    -----------
+    pool_size : int
+        Maximum number of connections, shared by all concurrent requests.
+    """
+
+    def __init__(self, api_key, pool_size=100, **kwargs):
+        super().__init__(api_key, pool_size=pool_size, **kwargs)
+        self._async_session = None
+
+    @property
+    def session(self):
+        """Shared httpx.AsyncClient with a sized connection pool"""
+        if self._async_session is None:
+            self._async_session = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ),
+                timeout=self.timeout,
+                transport=httpx.AsyncHTTPTransport(retries=self.retries),
+            )
+        return self._async_session
+
+    async def aclose(self):
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+        return False
+
+    # HTTP layer
+    async def post_json(self, url, payload, headers=None, rows=0):
+        """
+        POST payload as JSON through the shared encoding path
+
+        Payloads carrying many rows are encoded on a worker thread so the event
+        loop keeps serving other requests meanwhile.
+        """
+        if rows >= ENCODE_IN_THREAD_ROWS:
+            body, encoding_headers = await asyncio.to_thread(self.encode_body, payload)
+        else:
+            body, encoding_headers = self.encode_body(payload)
+
+        request_headers = {
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        request_headers.update(headers or {})
+        request_headers.update(encoding_headers)
+
+        return await self.session.post(url, content=body, headers=request_headers)
+
+    async def get_json(self, url, params=None, hedge=None):
+        """
+        GET url with the API key header and return the JSON response
+
+        Like the synchronous client, 429 and 5xx responses are retried with
+        exponential backoff, and with a hedging policy requests naming a hedge
+        kind are duplicated when they run slower than usual for that kind.
+        """
+
+        async def fetch():
+            for attempt in range(self.retries + 1):
+                response = await self.session.get(
+                    url, headers=self._headers(), params=params
+                )
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.retries
+                ):
+                    break
+                await asyncio.sleep(self.backoff_factor * 2**attempt)
+
+            # Check for HTTP errors
+            response.raise_for_status()
+
+            return response.json()
+
+        if hedge and self.hedging is not None:
+            return await self.hedging.acall(hedge, fetch)
+        return await fetch()
+
+    # Chat Wrappers
+    async def create_chat_request(self, project_id, content):
+        """
+        Make API request for chat creation
+
+        Returns:
+            dict: json response
+        """
+        data = {
+            "project_id": project_id,
+            "messages": [{"role": "user", "content": content, "images": []}],
+        }
+
+        response = await self.post_json(
+            self.chat_url(self.ENDPOINT, "new"), data, headers=self._headers()
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    async def check_task_status(self, task_id):
+        """
+        Check task status from Chat creation POST call
+
+        Returns:
+            dict: json response
+        """
+        return await self.get_json(
+            self.chat_url(self.ENDPOINT, "status", task_id), hedge="status"
+        )
+
+    async def get_chat_results(self, chat_id, format_type="plotly_json"):
+        """
+        Get chat results based on chat_id
+
+        Returns:
+            dict: json response
+        """
+        return await self.get_json(
+            self.chat_url(self.ENDPOINT, "chats", chat_id),
+            params={"image_format": format_type},
+            hedge="fetch",
+        )
+
+    # Projects
+    async def create_project(self, project_name, owner_id, org_id):
+        """
+        Make API request for create project
+
+        Returns:
+            dict: json response
+        """
+        data = {
+            "name": project_name,
+            "_owner": owner_id,
+            "_org": org_id,
+        }
+
+        response = await self.post_json(
+            self.chat_url("projects"), data, headers=self._headers()
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    # Datasets
+    async def get_datasets(self):
+        """
+        Make API request to list datasets
+
+        Returns:
+            dict: json response
+        """
+        response = await self.session.get(
+            self.api_url("datasets", self.sdk_url), params={"api_key": self.api_key}
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    async def create_dataset(self, name):
+        """
+        Make API request to create an empty dataset
+
+        Returns:
+            dict: json response
+        """
+        response = await self.post_json(
+            self.api_url("datasets", self.sdk_url),
+            {"api_key": self.api_key, "name": name},
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    async def add_rows_to_dataset(self, dataset_id, input_data):
+        """
+        Make API request to add rows to existing dataset
+
+        Returns:
+            dict: json response
+        """
+        start_time = time.time()
+        response = await self.post_json(
+            self.api_url("datasets"),
+            {"api_key": self.api_key, "id": dataset_id, "rows": input_data},
+            rows=len(input_data),
+        )
+        end_time = time.time()
+
+        # A rejected payload is retried in smaller batches by the caller
+        if response.status_code == 413:
+            response.raise_for_status()
+
+        elapsed_time = end_time - start_time
+
+        print(
+            f"Request to add rows to dataset {dataset_id} with {len(input_data)} samples completed in {elapsed_time:.4f} seconds."
+        )
+
+        return response.json()
+
+    async def set_dataset_fields(self, dataset_id, fields):
+        """
+        Make API request to set dataset fields
+
+        Returns:
+            dict: json response
+        """
+        response = await self.post_json(
+            self.api_url("datasets"),
+            {"api_key": self.api_key, "id": dataset_id, "fields": fields},
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    # Models
+    async def create_model(
+        self, dataset_id, predict_fields, ignore_fields=None, params=None
+    ):
+        """
+        Make API request to train a model on a dataset
+
+        Returns:
+            dict: json response
+        """
+        data = {
+            "api_key": self.api_key,
+            "dataset_id": dataset_id,
+            "predict_fields": predict_fields,
+            "ignore_fields": ignore_fields or [],
+            "extra_attention": False,
+            "duration": 10,
+        }
+        if params:
+            data.update(params)
+
+        # Models are trained through the SDK host, like akkio.create_model
+        response = await self.post_json(self.api_url("models", self.sdk_url), data)
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    async def post_models(self, payload):
+        """
+        POST a prediction or transform payload to the models endpoint
+
+        Returns:
+            httpx.Response: response with the body read
+        """
+        response = await self.post_json(
+            self.api_url("models"),
+            {"api_key": self.api_key, **payload},
+            rows=len(payload.get("data", ())),
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response
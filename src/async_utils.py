@@ -0,0 +1,331 @@
+"""
+asyncio counterparts of the API wrappers in src.utils.
+
+The coroutines here mirror the synchronous wrappers (same names, arguments and
+return values) on top of AsyncAkkioClient, so async services can drive many
+chat tasks and row uploads from one event loop without a thread per call.
+Blocking local work (JSON encoding of large batches, the transform cache,
+rendering artifacts) runs on worker threads.
+"""
+
+import asyncio
+import json
+import os
+import time
+import weakref
+
+from src import transform_cache, utils
+from src.async_client import AsyncAkkioClient
+from src.hedging import HedgePolicy
+from src.streaming import ColumnBuilder
+
+# Default clients per event loop; an httpx pool cannot move between loops
+_default_clients = weakref.WeakKeyDictionary()
+
+
+def get_client(client=None):
+    """
+    Return client, or the running loop's default client built from the utils
+    settings (utils.API_KEY and friends)
+
+    Returns:
+        AsyncAkkioClient
+    """
+    if client is not None:
+        return client
+
+    key = (
+        utils.API_KEY,
+        utils.PROTOCOL,
+        utils.BASE_URL,
+        utils.URL,
+        utils.SDK_URL,
+        utils.PORT,
+        utils.VERSION,
+        utils.COMPRESSION,
+        utils.COMPRESSION_MIN_BYTES,
+        utils.COMPRESSION_LEVEL,
+        utils.HEDGING,
+    )
+    loop = asyncio.get_running_loop()
+    entry = _default_clients.get(loop)
+    if entry is None or entry[0] != key:
+        client = AsyncAkkioClient(
+            utils.API_KEY,
+            protocol=utils.PROTOCOL,
+            base_url=utils.BASE_URL,
+            url=utils.URL,
+            sdk_url=utils.SDK_URL,
+            port=utils.PORT,
+            version=utils.VERSION,
+            compression=utils.COMPRESSION,
+            compression_min_bytes=utils.COMPRESSION_MIN_BYTES,
+            compression_level=utils.COMPRESSION_LEVEL,
+            hedging=HedgePolicy() if utils.HEDGING else None,
+        )
+        entry = (key, client)
+        _default_clients[loop] = entry
+    return entry[1]
+
+
+# Chat Wrappers
+async def create_chat_request(project_id, content, client=None):
+    """
+    Make API request for chat creation
+
+    Returns:
+        dict: json response
+    """
+    return await get_client(client).create_chat_request(project_id, content)
+
+
+async def check_task_status(task_id, client=None):
+    """
+    Check task status from Chat creation POST call
+
+    Returns:
+        dict: json response
+    """
+    return await get_client(client).check_task_status(task_id)
+
+
+async def get_chat_results(chat_id, format_type="plotly_json", client=None):
+    """
+    Get chat results based on chat_id
+
+    Returns:
+        dict: json response
+    """
+    return await get_client(client).get_chat_results(chat_id, format_type)
+
+
+async def run_chat_prompt(
+    project_id,
+    content,
+    resp_directory,
+    timeout=300,
+    poll_interval=5,
+    file_prefix="",
+    render="local",
+    layout_overrides=utils.LAYOUT_OVERRIDES,
+    store=None,
+    client=None,
+    save_response=False,
+):
+    """
+    Submit a prompt to chat-explore, wait for it to finish and save the artifact
+
+    Same as utils.run_chat_prompt, but polling sleeps without holding a thread
+    and the artifacts are rendered on a worker thread.
+
+    Returns:
+        list: paths of the artifacts written to resp_directory
+    """
+    client = get_client(client)
+    creation_resp = await client.create_chat_request(project_id, content)
+
+    task_id = creation_resp["task_id"]
+    format_type = utils.image_format_for(render, layout_overrides)
+    start_time = time.time()
+
+    # Loop until the task status is "SUCCEEDED"
+    while True:
+        status = await client.check_task_status(task_id)
+        if status["status"] == "SUCCEEDED":
+            chat_id = status["metadata"]["location"].split("/chats/")[1]
+            chat_response = await client.get_chat_results(chat_id, format_type)
+
+            # File path with project_id and task_id
+            file_name = f"{file_prefix}project_{project_id}_taskid_{task_id}"
+            file_path = os.path.join(resp_directory, file_name)
+
+            if save_response:
+                with open(f"{file_path}_response.json", "w", encoding="utf-8") as file:
+                    json.dump(chat_response, file)
+
+            return await asyncio.to_thread(
+                utils.process_chat_output,
+                chat_response,
+                file_path,
+                layout_overrides,
+                store=store,
+            )
+
+        elif status["status"] == "FAILED":
+            raise RuntimeError("Task failed.")
+
+        elif time.time() - start_time > timeout:
+            raise RuntimeError("Task timed out.")
+
+        await asyncio.sleep(poll_interval)
+
+
+async def create_project(project_name, owner_id, org_id, client=None):
+    """
+    Make API request for create project
+
+    Returns:
+        dict: json response
+    """
+    return await get_client(client).create_project(project_name, owner_id, org_id)
+
+
+# Datasets
+async def add_rows_to_dataset(dataset_id, input_data, client=None):
+    """
+    Make API requests to add rows to existing dataset
+
+    Rows are sent in batches sized by the client's batch sizer. Sending stops
+    at the first batch the API answers with an error.
+
+    Returns:
+        dict: json response of the last batch sent
+    """
+    client = get_client(client)
+
+    responses = await client.batch_sizer.arun(
+        "upload",
+        input_data,
+        lambda rows: client.add_rows_to_dataset(dataset_id, rows),
+        retry_timeouts=False,
+        stop=utils.upload_failed,
+    )
+
+    return responses[-1]
+
+
+async def set_dataset_fields(dataset_id, fields, client=None):
+    """
+    Make API request to set dataset fields (see utils.set_dataset_fields)
+
+    Returns:
+        dict: json response
+    """
+    return await get_client(client).set_dataset_fields(dataset_id, fields)
+
+
+# Models
+async def make_prediction(model_id, input_data, show_factors=False, client=None):
+    """
+    Make API request for inference on new data
+
+    Rows are sent in batches sized by the client's batch sizer and the
+    predictions are merged.
+
+    Returns:
+        dict: json response
+    """
+    client = get_client(client)
+    payload = {
+        "sample": True,
+        "id": model_id,
+        "data": input_data,
+        "show_factors": show_factors,
+    }
+
+    async def predict_batch(rows):
+        start_time = time.time()
+        response = await client.post_models(dict(payload, data=rows))
+        elapsed_time = time.time() - start_time
+
+        print(
+            f"Request to make predictions {model_id} with {len(rows)} samples completed in {elapsed_time:.4f} seconds."
+        )
+
+        # Parse JSON response
+        resp_dict = response.json()
+
+        # Check for application level errors
+        if resp_dict.get("status") == "error":
+            raise Exception(
+                f"Error from API: {resp_dict.get('message', 'No error message provided')}"
+            )
+
+        return resp_dict
+
+    return utils._merge_predictions(
+        await client.batch_sizer.arun("predict", input_data, predict_batch)
+    )
+
+
+async def _transform_records(project_id, input_data, client):
+    async def transform_batch(rows):
+        start_time = time.time()
+        response = await client.post_models(utils._transform_payload(project_id, rows))
+        elapsed_time = time.time() - start_time
+
+        print(
+            f"Request to transform data using project: {project_id} for input data with {len(rows)} samples completed in {elapsed_time:.4f} seconds."
+        )
+
+        resp_dict = response.json()
+
+        # Check for application level errors, as utils._transform_batch does
+        if resp_dict.get("status") == "error" or "predictions" not in resp_dict:
+            raise Exception(
+                f"Error from API: {resp_dict.get('message', 'No predictions in the transform response')}"
+            )
+
+        return resp_dict["predictions"]
+
+    batches = await client.batch_sizer.arun("transform", input_data, transform_batch)
+    return [record for batch in batches for record in batch]
+
+
+async def _records(project_id, input_data, client, use_cache, cache):
+    """Transformed records, through the transform cache unless use_cache is False"""
+    if not use_cache:
+        return await _transform_records(project_id, input_data, client)
+
+    loop = asyncio.get_running_loop()
+
+    def fetch(rows):
+        return asyncio.run_coroutine_threadsafe(
+            _transform_records(project_id, rows, client), loop
+        ).result()
+
+    return await asyncio.to_thread(
+        transform_cache.cached_transform,
+        project_id,
+        input_data,
+        fetch,
+        transform_cache.get_cache(cache),
+    )
+
+
+async def transform_rows(
+    project_id, input_data, client=None, use_cache=True, cache=None
+):
+    """
+    Make API request for data transformation and return rows ready for upload
+
+    Like utils.transform_rows, rows found in the local transform cache are not
+    sent again unless use_cache is False. The cache is read and written on a
+    worker thread.
+
+    Returns:
+        list: transformed rows as dictionaries of strings
+    """
+    records = await _records(
+        project_id, input_data, get_client(client), use_cache, cache
+    )
+    return [{name: str(value) for name, value in record.items()} for record in records]
+
+
+async def transform_data(
+    project_id, input_data, client=None, use_cache=True, cache=None
+):
+    """
+    Make API request for data transformation
+
+    Returns:
+        DataFrame: transformed data
+    """
+    records = await _records(
+        project_id, input_data, get_client(client), use_cache, cache
+    )
+
+    builder = ColumnBuilder()
+    for record in records:
+        builder.append(record)
+    return builder.to_frame()
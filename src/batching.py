@@ -0,0 +1,218 @@
+import json
+import sys
+import threading
+import time
+
+from src._lazy import lazy_import
+
+requests = lazy_import("requests")
+
+# Seconds a batch should take; well below the client's 120s request timeout
+BATCH_TARGET_SECONDS = 20.0
+
+# Rows sent in the first batch of a kind, before any latency was measured
+BATCH_INITIAL_ROWS = 5000
+
+# Bounds for the learned batch size. Timeouts and 413s can push a batch below
+# BATCH_MIN_ROWS, down to a single row.
+BATCH_MIN_ROWS = 100
+BATCH_MAX_ROWS = 100_000
+
+# Largest JSON payload per batch until a 413 teaches a lower limit
+BATCH_MAX_BYTES = 50 * 2**20
+
+# Largest factor a batch may grow by from one batch to the next
+BATCH_GROWTH = 2.0
+
+# Weight of the newest throughput measurement in the moving average
+BATCH_SMOOTHING = 0.3
+
+# Rows JSON-encoded to estimate the payload size of a row
+_BYTES_SAMPLE_ROWS = 50
+
+
+def bytes_per_row(rows):
+    """Average JSON size of rows, estimated from evenly spaced samples"""
+    if not rows:
+        return 1.0
+    step = max(len(rows) // _BYTES_SAMPLE_ROWS, 1)
+    sample = rows[::step][:_BYTES_SAMPLE_ROWS]
+    return max(len(json.dumps(sample, separators=(",", ":"))) / len(sample), 1.0)
+
+
+def _too_large(error):
+    # requests' HTTPError and httpx's HTTPStatusError both carry the response
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 413
+
+
+def _timed_out(error):
+    if "requests" in sys.modules and isinstance(error, requests.exceptions.Timeout):
+        return True
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, httpx.TimeoutException)
+
+
+class BatchSizer:
+    """
+    Sizes row batches for the datasets and models endpoints from measured latency.
+
+    Each kind of call ("upload", "transform", "predict") keeps its own moving
+    average of throughput in rows per second, and the next batch is sized to
+    take about ``target_seconds``. Batches grow by at most ``growth`` per step
+    and never exceed ``max_bytes`` of JSON, so wide rows get smaller batches
+    than narrow ones. A 413 response halves the batch and lowers the byte
+    limit below the rejected payload; a timeout halves the batch.
+
+    Attributes:
+    -----------
+    target_seconds : float
+        Latency each batch is sized for.
+    """
+
+    def __init__(
+        self,
+        target_seconds=BATCH_TARGET_SECONDS,
+        initial_rows=BATCH_INITIAL_ROWS,
+        min_rows=BATCH_MIN_ROWS,
+        max_rows=BATCH_MAX_ROWS,
+        max_bytes=BATCH_MAX_BYTES,
+        growth=BATCH_GROWTH,
+    ):
+        self.target_seconds = target_seconds
+        self.initial_rows = initial_rows
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.growth = growth
+
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _kind(self, kind):
+        return self._state.setdefault(
+            kind,
+            {
+                "rows": self.initial_rows,
+                "rows_per_second": None,
+                "max_bytes": self.max_bytes,
+            },
+        )
+
+    def size(self, kind, row_bytes=1.0):
+        """Rows to send in the next batch of kind"""
+        with self._lock:
+            state = self._kind(kind)
+            rows = min(state["rows"], state["max_bytes"] / row_bytes)
+        return max(int(rows), 1)
+
+    def record(self, kind, rows, seconds):
+        """Update kind from a full batch of rows that took seconds"""
+        with self._lock:
+            state = self._kind(kind)
+            rate = rows / max(seconds, 1e-3)
+            if state["rows_per_second"] is None:
+                state["rows_per_second"] = rate
+            else:
+                state["rows_per_second"] += BATCH_SMOOTHING * (
+                    rate - state["rows_per_second"]
+                )
+
+            target = state["rows_per_second"] * self.target_seconds
+            state["rows"] = int(
+                min(max(min(target, rows * self.growth), self.min_rows), self.max_rows)
+            )
+
+    def shrink(self, kind, rows, payload_bytes=None):
+        """Halve kind's batch after rows failed; payload_bytes marks a 413"""
+        with self._lock:
+            state = self._kind(kind)
+            state["rows"] = max(rows // 2, 1)
+            state["rows_per_second"] = state["rows"] / self.target_seconds
+            if payload_bytes is not None:
+                state["max_bytes"] = min(state["max_bytes"], payload_bytes * 0.8)
+
+    def run(self, kind, rows, send, retry_timeouts=True, stop=None):
+        """
+        Call send(batch) for consecutive batches of rows
+
+        Batches rejected with 413 are split and sent again. Timed out batches
+        are too when retry_timeouts is set; leave it off for calls that are not
+        safe to repeat, like appending rows, where the timeout is raised after
+        shrinking later batches. stop(result), if given, ends the run early.
+
+        Returns:
+            list: results of send, one per batch
+        """
+        if not rows:
+            return [send(rows)]
+
+        row_bytes = bytes_per_row(rows)
+        results = []
+        start = 0
+
+        while start < len(rows):
+            size = self.size(kind, row_bytes)
+            batch = rows[start : start + size]
+
+            start_time = time.time()
+            try:
+                result = send(batch)
+            except Exception as e:
+                self._failed(kind, batch, row_bytes, e, retry_timeouts)
+                continue
+
+            # Only full batches say something about the endpoint's throughput
+            if len(batch) == size:
+                self.record(kind, len(batch), time.time() - start_time)
+
+            results.append(result)
+            start += len(batch)
+            if stop is not None and stop(result):
+                break
+
+        return results
+
+    async def arun(self, kind, rows, send, retry_timeouts=True, stop=None):
+        """Like run, for a coroutine function send"""
+        if not rows:
+            return [await send(rows)]
+
+        row_bytes = bytes_per_row(rows)
+        results = []
+        start = 0
+
+        while start < len(rows):
+            size = self.size(kind, row_bytes)
+            batch = rows[start : start + size]
+
+            start_time = time.time()
+            try:
+                result = await send(batch)
+            except Exception as e:
+                self._failed(kind, batch, row_bytes, e, retry_timeouts)
+                continue
+
+            if len(batch) == size:
+                self.record(kind, len(batch), time.time() - start_time)
+
+            results.append(result)
+            start += len(batch)
+            if stop is not None and stop(result):
+                break
+
+        return results
+
+    def _failed(self, kind, batch, row_bytes, error, retry_timeouts):
+        """Shrink after a failed batch; re-raise error unless it can be retried"""
+        too_large = _too_large(error)
+        if not (too_large or _timed_out(error)) or len(batch) == 1:
+            raise error
+
+        self.shrink(kind, len(batch), len(batch) * row_bytes if too_large else None)
+        if not (too_large or retry_timeouts):
+            raise error
+
+        print(
+            f"Batch of {len(batch)} rows for {kind} {'was too large' if too_large else 'timed out'}, retrying with {self.size(kind, row_bytes)} rows"
+        )
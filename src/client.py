@@ -0,0 +1,424 @@
+import gzip
+import json
+import threading
+import time
+import zlib
+
+from src import profiling
+from src.batching import BatchSizer
+from src._lazy import lazy_import
+
+requests = lazy_import("requests")
+
+
+class AkkioClient:
+    """
+    Connection to the Akkio API for one API key.
+
+    Everything a request needs (key, endpoints, connection pool, retry policy,
+    compression settings) lives on the instance instead of in module globals,
+    so sessions with different keys and concurrent worker threads can share one
+    process. The underlying ``requests.Session`` is created lazily and reused,
+    keeping connections to the API alive between calls.
+
+    The module-level functions in ``src.utils`` are thin wrappers around a
+    default client built from ``utils.API_KEY`` and friends; pass ``client=`` to
+    them (or call the methods here) to use a specific key.
+
+    Attributes:
+    -----------
+    api_key : str
+        Akkio API key sent with every request.
+    protocol, base_url, url, sdk_url, port, version : str
+        Endpoint pieces. Chat-explore and project calls go to
+        ``{protocol}://{base_url}/{version}``, dataset and model calls to
+        ``{protocol}://{url}:{port}/{version}``. Listing and creating datasets
+        go to ``sdk_url`` instead, the host the akkio SDK used for them.
+    timeout : float
+        Per-request timeout in seconds.
+    compression : str or None
+        "gzip" or "deflate" to compress request bodies of at least
+        ``compression_min_bytes``; None sends plain JSON.
+    hedging : HedgePolicy or None
+        Policy duplicating slow task status and result requests (see
+        ``src.hedging``); None sends a single request.
+    batch_sizer : BatchSizer
+        Controller sizing the row batches the ``src.utils`` wrappers send to the
+        datasets and models endpoints (see ``src.batching``).
+    """
+
+    ENDPOINT = "chat-explore"
+
+    def __init__(
+        self,
+        api_key,
+        protocol="https",
+        base_url="api.akkio.com/api",
+        url="api.akkio.com",
+        sdk_url="api.akk.io",
+        port="443",
+        version="v1",
+        timeout=120,
+        pool_size=10,
+        retries=3,
+        backoff_factor=0.5,
+        compression=None,
+        compression_min_bytes=64 * 1024,
+        compression_level=6,
+        hedging=None,
+        batch_sizer=None,
+    ):
+        """
+        Parameters:
+        -----------
+        pool_size : int, optional
+            Maximum number of pooled connections kept per host.
+        retries : int, optional
+            Retries for connection errors and for 429/5xx responses to idempotent
+            requests. POSTs are never resent after reaching the server.
+        backoff_factor : float, optional
+            Exponential backoff factor between retries.
+        """
+        if compression not in (None, "gzip", "deflate"):
+            raise ValueError(
+                f"Unsupported compression '{compression}'. Use 'gzip', 'deflate' or None."
+            )
+
+        self.api_key = api_key
+        self.protocol = protocol
+        self.base_url = base_url
+        self.url = url
+        self.sdk_url = sdk_url
+        self.port = port
+        self.version = version
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self.compression_level = compression_level
+        self.hedging = hedging
+        self.batch_sizer = batch_sizer or BatchSizer()
+
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Shared requests.Session with a sized connection pool and retry policy"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    from urllib3.util.retry import Retry
+
+                    retry = Retry(
+                        total=self.retries,
+                        backoff_factor=self.backoff_factor,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        raise_on_status=False,
+                    )
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size,
+                        max_retries=retry,
+                    )
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # URLs
+    def chat_url(self, *parts):
+        return "/".join([f"{self.protocol}://{self.base_url}/{self.version}", *parts])
+
+    def api_url(self, resource, url=None):
+        return (
+            f"{self.protocol}://{url or self.url}:{self.port}/{self.version}/{resource}"
+        )
+
+    def _headers(self):
+        return {"X-API-Key": self.api_key, "Content-Type": "application/json"}
+
+    # HTTP layer
+    @profiling.profiled("json_encode")
+    def encode_body(self, payload):
+        """
+        Serialize payload to JSON bytes and compress it when enabled
+
+        Returns:
+            tuple: (body bytes, extra headers)
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+        if not self.compression or len(body) < self.compression_min_bytes:
+            return body, {}
+
+        if self.compression == "gzip":
+            body = gzip.compress(body, compresslevel=self.compression_level)
+        else:
+            body = zlib.compress(body, self.compression_level)
+
+        return body, {"Content-Encoding": self.compression}
+
+    def post_json(self, url, payload, headers=None, stream=False):
+        """
+        POST payload as JSON through the shared encoding path
+
+        Responses are negotiated with Accept-Encoding and decompressed by requests.
+        With stream=True the body is left unread for incremental parsing.
+        """
+        body, encoding_headers = self.encode_body(payload)
+
+        request_headers = {
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        request_headers.update(headers or {})
+        request_headers.update(encoding_headers)
+
+        return self.session.post(
+            url,
+            data=body,
+            headers=request_headers,
+            timeout=self.timeout,
+            stream=stream,
+        )
+
+    def get_json(self, url, params=None, hedge=None):
+        """
+        GET url with the API key header and return the JSON response
+
+        With a hedging policy, requests naming a hedge kind are duplicated when
+        they run slower than usual for that kind.
+        """
+
+        def fetch():
+            response = self.session.get(
+                url, headers=self._headers(), params=params, timeout=self.timeout
+            )
+
+            # Check for HTTP errors
+            response.raise_for_status()
+
+            return response.json()
+
+        if hedge and self.hedging is not None:
+            return self.hedging.call(hedge, fetch)
+        return fetch()
+
+    # Chat Wrappers
+    @profiling.profiled("submit")
+    def create_chat_request(self, project_id, content):
+        """
+        Make API request for chat creation
+
+        Returns:
+            dict: json response
+        """
+        data = {
+            "project_id": project_id,
+            "messages": [{"role": "user", "content": content, "images": []}],
+        }
+
+        response = self.post_json(
+            self.chat_url(self.ENDPOINT, "new"), data, headers=self._headers()
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    @profiling.profiled("poll")
+    def check_task_status(self, task_id):
+        """
+        Check task status from Chat creation POST call
+
+        Returns:
+            dict: json response
+        """
+        return self.get_json(
+            self.chat_url(self.ENDPOINT, "status", task_id), hedge="status"
+        )
+
+    @profiling.profiled("fetch")
+    def get_chat_results(self, chat_id, format_type="plotly_json"):
+        """
+        Get chat results based on chat_id
+
+        Returns:
+            dict: json response
+        """
+        return self.get_json(
+            self.chat_url(self.ENDPOINT, "chats", chat_id),
+            params={"image_format": format_type},
+            hedge="fetch",
+        )
+
+    # Projects
+    def create_project(self, project_name, owner_id, org_id):
+        """
+        Make API request for create project
+
+        Returns:
+            dict: json response
+        """
+        data = {
+            "name": project_name,
+            "_owner": owner_id,
+            "_org": org_id,
+        }
+
+        response = self.post_json(
+            self.chat_url("projects"), data, headers=self._headers()
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    # Datasets
+    def get_datasets(self):
+        """
+        Make API request to list datasets
+
+        Returns:
+            dict: json response
+        """
+        response = self.session.get(
+            self.api_url("datasets", self.sdk_url),
+            params={"api_key": self.api_key},
+            timeout=self.timeout,
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    def create_dataset(self, name):
+        """
+        Make API request to create an empty dataset
+
+        Returns:
+            dict: json response
+        """
+        response = self.post_json(
+            self.api_url("datasets", self.sdk_url),
+            {"api_key": self.api_key, "name": name},
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    @profiling.profiled("upload")
+    def add_rows_to_dataset(self, dataset_id, input_data):
+        """
+        Make API request to add rows to existing dataset
+
+        Returns:
+            dict: json response
+        """
+        start_time = time.time()
+        response = self.post_json(
+            self.api_url("datasets"),
+            {"api_key": self.api_key, "id": dataset_id, "rows": input_data},
+        )
+        end_time = time.time()
+
+        # A rejected payload is retried in smaller batches by the caller
+        if response.status_code == 413:
+            response.raise_for_status()
+
+        elapsed_time = end_time - start_time
+
+        print(
+            f"Request to add rows to dataset {dataset_id} with {len(input_data)} samples completed in {elapsed_time:.4f} seconds."
+        )
+
+        return response.json()
+
+    def set_dataset_fields(self, dataset_id, fields):
+        """
+        Make API request to set dataset fields
+
+        Returns:
+            dict: json response
+        """
+        start_time = time.time()
+        response = self.post_json(
+            self.api_url("datasets"),
+            {"api_key": self.api_key, "id": dataset_id, "fields": fields},
+        )
+        end_time = time.time()
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        elapsed_time = end_time - start_time
+
+        print(
+            f"Request to set dataset fields in {dataset_id} completed in {elapsed_time:.4f} seconds."
+        )
+
+        return response.json()
+
+    # Models
+    def create_model(self, dataset_id, predict_fields, ignore_fields=None, params=None):
+        """
+        Make API request to train a model on a dataset
+
+        Returns:
+            dict: json response
+        """
+        data = {
+            "api_key": self.api_key,
+            "dataset_id": dataset_id,
+            "predict_fields": predict_fields,
+            "ignore_fields": ignore_fields or [],
+            "extra_attention": False,
+            "duration": 10,
+        }
+        if params:
+            data.update(params)
+
+        # Models are trained through the SDK host, like akkio.create_model
+        response = self.post_json(self.api_url("models", self.sdk_url), data)
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response.json()
+
+    def post_models(self, payload, stream=False):
+        """
+        POST a prediction or transform payload to the models endpoint
+
+        Returns:
+            requests.Response: raw response (body unread when stream is set)
+        """
+        response = self.post_json(
+            self.api_url("models"), {"api_key": self.api_key, **payload}, stream=stream
+        )
+
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        return response
@@ -0,0 +1,527 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+
+from src._lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Local record of uploaded datasets, keyed by content fingerprint
+DATASET_REGISTRY = os.path.join(os.path.expanduser("~"), ".akkio-ce", "datasets.json")
+
+# Rows sampled from large frames for local field type inference
+SCHEMA_SAMPLE_ROWS = 10_000
+
+# Share of non-null values that must parse for a column to get a numeric/date type
+SCHEMA_PARSE_RATIO = 0.98
+
+# String columns with at most this many distinct values (and mostly repeated
+# values) are categories
+SCHEMA_MAX_CATEGORIES = 50
+
+# Values a column needs before all-unique text without spaces counts as an id
+# when the column name does not say so; fewer unique names or emails are common
+SCHEMA_ID_MIN_ROWS = 1000
+
+# Text that df_to_dict produces for missing values
+_NULL_STRINGS = ["", "nan", "NaN", "None", "NaT", "<NA>"]
+
+# Rows transformed for the preview shown before a full transform, and the
+# number of quantile bins numeric stratification columns are cut into
+PREVIEW_ROWS = 200
+PREVIEW_BINS = 10
+
+# Per-dataset sync state (watermark and uploaded row hashes) for delta appends
+SYNC_STATE_DIR = os.path.join(os.path.expanduser("~"), ".akkio-ce", "sync")
+
+# Version of row_hashes saved in sync states; version 1 hashed the raw values,
+# version 2 hashes values normalized by _normalized
+ROW_HASH_VERSION = 2
+
+
+def _normalized(values):
+    """
+    Column as text, the way df_to_dict uploads it, but independent of dtype
+
+    Numbers are written the same whether the column was read as int or float
+    (1 and 1.0 both become "1"), and missing values are None whatever their
+    type.
+
+    Returns:
+        numpy.ndarray: object array of str and None
+    """
+    missing = values.isna().to_numpy()
+
+    if pd.api.types.is_float_dtype(values):
+        numbers = values.to_numpy(dtype="float64", na_value=np.nan)
+        integral = ~missing & (numbers == np.floor(numbers)) & (np.abs(numbers) < 2**53)
+        other = ~missing & ~integral
+
+        text = np.full(len(values), None, dtype=object)
+        text[integral] = numbers[integral].astype("int64").astype(str)
+        text[other] = pd.Series(numbers[other]).astype(str).to_numpy()
+        return text
+
+    text = values.astype(str).to_numpy(dtype=object)
+    if missing.any():
+        text = text.copy()
+        text[missing] = None
+    return text
+
+
+def row_hashes(df):
+    """
+    Hash every row of df with pandas' vectorized hasher
+
+    Values are normalized first (see _normalized), so the same data read with
+    different dtypes hashes the same.
+
+    Returns:
+        numpy.ndarray: one uint64 per row, independent of the index
+    """
+    normalized = pd.DataFrame(
+        {name: _normalized(values) for name, values in df.items()}
+    )
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _raw_row_hashes(df):
+    """Hashes of the raw values, as row_hashes computed them in version 1"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def fingerprint_frame(df, salt=""):
+    """
+    Content fingerprint of a DataFrame: column names, dtypes and row hashes
+
+    salt is mixed in so the same rows sent through different pipelines (e.g. a
+    transform project) get different fingerprints.
+
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(salt.encode("utf-8"))
+    schema = [[str(name), str(dtype)] for name, dtype in df.dtypes.items()]
+    digest.update(json.dumps(schema).encode("utf-8"))
+    digest.update(_raw_row_hashes(df).tobytes())
+    return digest.hexdigest()
+
+
+class DatasetRegistry:
+    """
+    JSON file mapping content fingerprints to the datasets created from them.
+
+    Entries are only hints: callers check that the dataset still exists on the
+    account before reusing it.
+
+    Attributes:
+    -----------
+    path : str
+        Location of the JSON file. Missing or unreadable files start empty.
+    """
+
+    def __init__(self, path=DATASET_REGISTRY):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, fingerprint):
+        """Return the registry entry for fingerprint, or None"""
+        with self._lock:
+            return self._load().get(fingerprint)
+
+    def record(self, fingerprint, dataset_id, dataset_name, rows):
+        """Remember that fingerprint was uploaded as dataset_id"""
+        entry = {
+            "dataset_id": dataset_id,
+            "dataset_name": dataset_name,
+            "rows": rows,
+            "created_at": time.time(),
+        }
+
+        with self._lock:
+            entries = self._load()
+            entries[fingerprint] = entry
+
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+            # Write to a temporary file first so a crash never truncates the registry
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(entries, file, indent=2)
+            os.replace(tmp_path, self.path)
+
+        return entry
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_registry(registry=None):
+    """Return registry, or the shared registry stored at DATASET_REGISTRY"""
+    global _default_registry
+    if registry is not None:
+        return registry
+
+    with _default_registry_lock:
+        if _default_registry is None or _default_registry.path != DATASET_REGISTRY:
+            _default_registry = DatasetRegistry(DATASET_REGISTRY)
+        return _default_registry
+
+
+def find_existing(registry, fingerprint, client):
+    """
+    Look up fingerprint and confirm the dataset is still on the account
+
+    Entries whose dataset was deleted, or belongs to an account the client's key
+    cannot see, are ignored and overwritten by the next upload.
+
+    Returns:
+        dict or None: registry entry of a dataset that can be reused
+    """
+    entry = registry.lookup(fingerprint)
+    if entry is None:
+        return None
+
+    datasets = client.get_datasets().get("datasets", [])
+    if any(dataset.get("id") == entry["dataset_id"] for dataset in datasets):
+        return entry
+
+    return None
+
+
+class SyncState:
+    """
+    What has already been uploaded to one dataset, for delta appends.
+
+    Two modes are supported:
+
+    - watermark: the largest value of an increasing column (timestamp or id)
+      that has been uploaded; only rows above it are new.
+    - row hashes: the set of uploaded row hashes; only rows whose hash is not
+      in the set are new. Hashes are kept sorted in a ``.npy`` file next to the
+      JSON metadata, 8 bytes per row.
+
+    Attributes:
+    -----------
+    dataset_id : str
+        Dataset the state belongs to.
+    watermark_column : str or None
+        Column the watermark refers to, None in row-hash mode.
+    watermark : str or None
+        Last uploaded watermark value, stored as text.
+    watermark_kind : str or None
+        "datetime", "numeric" or "string", how the watermark is compared.
+    rows : int
+        Rows uploaded through delta appends and create_dataset.
+    hash_version : int
+        ROW_HASH_VERSION of the saved hashes. States saved with older versions
+        also compare rows by their old hash.
+    """
+
+    def __init__(self, dataset_id, state_dir=None):
+        self.dataset_id = dataset_id
+        self.state_dir = state_dir or SYNC_STATE_DIR
+
+        self.watermark_column = None
+        self.watermark = None
+        self.watermark_kind = None
+        self.rows = 0
+        self.hash_version = ROW_HASH_VERSION
+        self.updated_at = None
+        self._hashes = None
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.state_dir, f"{self.dataset_id}.json")
+
+    @property
+    def _hashes_path(self):
+        return os.path.join(self.state_dir, f"{self.dataset_id}.hashes.npy")
+
+    @classmethod
+    def load(cls, dataset_id, state_dir=None):
+        """Load the saved state of dataset_id, or an empty state"""
+        state = cls(dataset_id, state_dir)
+        try:
+            with open(state._meta_path, encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return state
+
+        state.watermark_column = meta.get("watermark_column")
+        state.watermark = meta.get("watermark")
+        state.watermark_kind = meta.get("watermark_kind")
+        state.rows = meta.get("rows", 0)
+        state.hash_version = meta.get("hash_version", 1)
+        state.updated_at = meta.get("updated_at")
+        return state
+
+    @property
+    def hashes(self):
+        """Sorted uint64 hashes of the uploaded rows"""
+        if self._hashes is None:
+            try:
+                self._hashes = np.load(self._hashes_path)
+            except OSError:
+                self._hashes = np.empty(0, dtype=np.uint64)
+        return self._hashes
+
+    def add_hashes(self, hashes):
+        self._hashes = np.union1d(self.hashes, hashes)
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.updated_at = time.time()
+
+        if self._hashes is not None:
+            # np.save appends .npy unless the name already ends with it
+            tmp_path = f"{self._hashes_path[:-4]}.tmp.npy"
+            np.save(tmp_path, self._hashes)
+            os.replace(tmp_path, self._hashes_path)
+
+        meta = {
+            "dataset_id": self.dataset_id,
+            "watermark_column": self.watermark_column,
+            "watermark": self.watermark,
+            "watermark_kind": self.watermark_kind,
+            "rows": self.rows,
+            "hash_version": self.hash_version,
+            "updated_at": self.updated_at,
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file, indent=2)
+        os.replace(tmp_path, self._meta_path)
+
+
+def _watermark_kind(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(values):
+        return "numeric"
+    return "string"
+
+
+def _comparable(values, kind):
+    """Convert a column or a scalar watermark to the type it is compared as"""
+    if kind == "datetime":
+        return pd.to_datetime(values)
+    if kind == "numeric":
+        return pd.to_numeric(values)
+    if isinstance(values, pd.Series):
+        return values.astype(str)
+    return str(values)
+
+
+def delta_rows(df, state, watermark_column=None, since=None):
+    """
+    Select the rows of df that have not been uploaded yet
+
+    With watermark_column, rows whose value is above the saved watermark (or
+    since, when given) are new, sorted by that column. Before the first
+    watermark is known, rows are compared by hash instead. A state synced by
+    another watermark column needs since to start over on the new column.
+    Otherwise rows are compared by hash against the uploaded row hashes.
+
+    Returns:
+        tuple: (new rows as a DataFrame, their row hashes)
+    """
+    hashes = row_hashes(df)
+
+    if watermark_column is not None:
+        if watermark_column not in df.columns:
+            raise ValueError(
+                f"Watermark column '{watermark_column}' is not in the data."
+            )
+
+        switched = state.watermark_column not in (None, watermark_column)
+        if switched and since is None:
+            raise ValueError(
+                f"Dataset {state.dataset_id} is synced by watermark column "
+                f"'{state.watermark_column}'; pass since= to start syncing by '{watermark_column}'."
+            )
+
+        kind = _watermark_kind_of(state, df[watermark_column], watermark_column)
+        watermark = since if since is not None else state.watermark
+
+        if watermark is None:
+            is_new = _unseen(df, hashes, state)
+        else:
+            values = _comparable(df[watermark_column], kind)
+            is_new = (values > _comparable(watermark, kind)).to_numpy()
+
+        new_df, new_hashes = df[is_new], hashes[is_new]
+        order = (
+            new_df[watermark_column]
+            .reset_index(drop=True)
+            .sort_values(kind="stable")
+            .index.to_numpy()
+        )
+        return new_df.iloc[order], new_hashes[order]
+
+    is_new = _unseen(df, hashes, state)
+    return df[is_new], hashes[is_new]
+
+
+def _unseen(df, hashes, state):
+    """Mask of the rows of df whose hash was not uploaded before"""
+    is_new = ~np.isin(hashes, state.hashes)
+    if state.hash_version < ROW_HASH_VERSION:
+        # Rows uploaded before values were normalized
+        is_new &= ~np.isin(_raw_row_hashes(df), state.hashes)
+    return is_new
+
+
+def _watermark_kind_of(state, values, watermark_column):
+    """How watermark_column is compared; the saved kind only applies to its column"""
+    if state.watermark_kind and state.watermark_column in (None, watermark_column):
+        return state.watermark_kind
+    return _watermark_kind(values)
+
+
+def advance_watermark(state, uploaded_df, watermark_column):
+    """Move the watermark of state to the largest value in uploaded_df"""
+    if not len(uploaded_df):
+        return
+
+    kind = _watermark_kind_of(state, uploaded_df[watermark_column], watermark_column)
+    latest = _comparable(uploaded_df[watermark_column], kind).max()
+
+    state.watermark_column = watermark_column
+    state.watermark_kind = kind
+    state.watermark = latest.isoformat() if kind == "datetime" else str(latest)
+
+
+def _parses_as_dates(values):
+    # Dates are parsed one value at a time, so callers try a few values first
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        # A single format inferred from the first value parses vectorized
+        dates = pd.to_datetime(values, errors="coerce")
+        if dates.notna().mean() < SCHEMA_PARSE_RATIO:
+            dates = pd.to_datetime(values, errors="coerce", format="mixed")
+    return dates.notna().mean() >= SCHEMA_PARSE_RATIO
+
+
+def _infer_type(name, values):
+    """Classify one sampled column into an Akkio field type"""
+    if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+        values = values.dropna().astype(str).str.strip()
+        values = values[~values.isin(_NULL_STRINGS)]
+    else:
+        values = values.dropna()
+
+    if values.empty:
+        return "unknown"
+
+    if pd.api.types.is_bool_dtype(values):
+        return "category"
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "date"
+
+    unique_ratio = values.nunique() / len(values)
+    looks_like_id = name.lower() == "id" or name.lower().endswith(("_id", " id"))
+
+    numbers = values
+    if not pd.api.types.is_numeric_dtype(values):
+        numbers = pd.to_numeric(values, errors="coerce")
+        if numbers.notna().mean() < SCHEMA_PARSE_RATIO:
+            numbers = None
+
+    if numbers is not None:
+        numbers = numbers.dropna()
+        if (numbers == numbers.round()).all():
+            if looks_like_id and unique_ratio >= 0.99:
+                return "id"
+            return "integer"
+        return "float"
+
+    if _parses_as_dates(values.head(20)) and _parses_as_dates(values):
+        return "date"
+
+    if unique_ratio >= 0.99 and (
+        looks_like_id
+        or (len(values) >= SCHEMA_ID_MIN_ROWS and not values.str.contains(" ").any())
+    ):
+        return "id"
+    if values.nunique() <= SCHEMA_MAX_CATEGORIES and unique_ratio <= 0.5:
+        return "category"
+    return "string"
+
+
+def infer_fields(df, sample_rows=SCHEMA_SAMPLE_ROWS):
+    """
+    Infer set_dataset_fields types for the columns of df
+
+    Frames longer than sample_rows are inferred from a random sample. Columns
+    holding the strings df_to_dict uploads are parsed, so transformed rows can
+    be inferred as well.
+
+    Returns:
+        list: fields in the format expected by set_dataset_fields
+    """
+    if len(df) > sample_rows:
+        df = df.sample(n=sample_rows, random_state=0)
+
+    fields = []
+    for name in df.columns:
+        field_type = _infer_type(str(name), df[name])
+        fields.append(
+            {"name": str(name), "type": field_type, "valid": field_type != "unknown"}
+        )
+
+    return fields
+
+
+def stratified_sample(df, n=PREVIEW_ROWS, by=None, seed=0):
+    """
+    Sample about n rows of df, keeping every value of column by represented
+
+    Each distinct value of by (numeric columns are cut into PREVIEW_BINS
+    quantile bins, missing values are a stratum of their own) gets at least one
+    row, largest strata first, and the rest of the rows are split in
+    proportion to stratum size. Without a by column present in df, rows are
+    sampled uniformly. Sampled rows keep their original order.
+
+    Returns:
+        DataFrame: the sampled rows
+    """
+    if len(df) <= n:
+        return df
+    if by is None or by not in df.columns:
+        return df.sample(n=n, random_state=seed).sort_index()
+
+    values = df[by]
+    if pd.api.types.is_numeric_dtype(values) and values.nunique() > PREVIEW_BINS:
+        values = pd.qcut(values, PREVIEW_BINS, duplicates="drop")
+    codes, _ = pd.factorize(values, use_na_sentinel=False)
+    counts = np.bincount(codes)
+
+    # One row for as many strata as fit, then the remainder proportionally
+    quota = np.zeros_like(counts)
+    quota[np.argsort(-counts, kind="stable")[:n]] = 1
+    budget = n - quota.sum()
+    quota = np.minimum(quota + counts * budget // len(df), counts)
+
+    rank = (
+        pd.Series(np.random.default_rng(seed).random(len(df)))
+        .groupby(codes)
+        .rank(method="first")
+        .to_numpy()
+    )
+    return df[rank <= quota[codes]]
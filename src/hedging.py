@@ -0,0 +1,211 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+
+# Latency percentile after which an idempotent request is duplicated
+HEDGE_PERCENTILE = 0.95
+
+# Recent latencies kept per request kind to learn the percentile from
+HEDGE_WINDOW = 200
+
+# Observations needed before the learned threshold replaces HEDGE_INITIAL_DELAY
+HEDGE_MIN_SAMPLES = 20
+
+# Bounds on the hedge delay in seconds
+HEDGE_INITIAL_DELAY = 10.0
+HEDGE_MIN_DELAY = 0.25
+HEDGE_MAX_DELAY = 30.0
+
+# Hedges allowed per request (a token budget), and hedges in flight at once
+HEDGE_BUDGET_RATIO = 0.1
+HEDGE_MAX_IN_FLIGHT = 4
+
+
+class HedgePolicy:
+    """
+    Duplicates slow idempotent requests and keeps whichever answers first.
+
+    Each request kind (e.g. "status" or "fetch") keeps a window of recent
+    latencies. When a call has been running longer than the kind's learned
+    percentile, one duplicate request is started on a second thread and the
+    first successful response wins; the loser is left to finish or time out on
+    its own. ``acall`` does the same for coroutines, with the duplicate as a
+    second task.
+
+    To avoid amplifying load on a struggling server, every call earns
+    ``budget_ratio`` of a hedge token and a hedge spends a whole token, so at
+    most about that fraction of requests is ever duplicated, and no more than
+    ``max_in_flight`` hedges run at the same time.
+
+    Attributes:
+    -----------
+    percentile : float
+        Latency percentile (0-1) used as the hedge delay.
+    hedged : int
+        Number of duplicate requests started.
+    hedge_wins : int
+        Number of calls answered by the duplicate first.
+    """
+
+    def __init__(
+        self,
+        percentile=HEDGE_PERCENTILE,
+        window=HEDGE_WINDOW,
+        min_samples=HEDGE_MIN_SAMPLES,
+        initial_delay=HEDGE_INITIAL_DELAY,
+        min_delay=HEDGE_MIN_DELAY,
+        max_delay=HEDGE_MAX_DELAY,
+        budget_ratio=HEDGE_BUDGET_RATIO,
+        max_in_flight=HEDGE_MAX_IN_FLIGHT,
+    ):
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.max_in_flight = max_in_flight
+
+        self.hedged = 0
+        self.hedge_wins = 0
+
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._tokens = 1.0
+        self._in_flight = 0
+
+    def record(self, kind, seconds):
+        with self._lock:
+            self._latencies.setdefault(kind, deque(maxlen=self.window)).append(seconds)
+
+    def delay(self, kind):
+        """Seconds to wait for a response of this kind before hedging"""
+        with self._lock:
+            latencies = sorted(self._latencies.get(kind, ()))
+
+        if len(latencies) < self.min_samples:
+            seconds = self.initial_delay
+        else:
+            seconds = latencies[int(self.percentile * (len(latencies) - 1))]
+
+        return min(max(seconds, self.min_delay), self.max_delay)
+
+    def _earn(self):
+        with self._lock:
+            self._tokens = min(
+                self._tokens + self.budget_ratio, 1.0 + self.budget_ratio
+            )
+
+    def _acquire(self):
+        with self._lock:
+            if self._tokens < 1.0 or self._in_flight >= self.max_in_flight:
+                return False
+            self._tokens -= 1.0
+            self._in_flight += 1
+            self.hedged += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def call(self, kind, fn):
+        """
+        Call fn(), hedged with a second fn() once it runs past the kind's delay
+
+        fn must be safe to run twice. Exceptions are raised only when every
+        attempt has failed.
+
+        Returns:
+            object: return value of the first attempt that succeeds
+        """
+        self._earn()
+        results = queue.Queue()
+
+        def attempt(is_hedge):
+            start_time = time.time()
+            try:
+                value = fn()
+            except Exception as e:
+                results.put((is_hedge, False, e))
+            else:
+                self.record(kind, time.time() - start_time)
+                results.put((is_hedge, True, value))
+            finally:
+                if is_hedge:
+                    self._release()
+
+        threading.Thread(target=attempt, args=(False,), daemon=True).start()
+        attempts = 1
+
+        try:
+            outcome = results.get(timeout=self.delay(kind))
+        except queue.Empty:
+            if self._acquire():
+                threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                attempts += 1
+            outcome = results.get()
+
+        error = None
+        while True:
+            is_hedge, ok, value = outcome
+            if ok:
+                if is_hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return value
+
+            error = error or value
+            attempts -= 1
+            if attempts == 0:
+                raise error
+            outcome = results.get()
+
+    async def acall(self, kind, fn):
+        """
+        Like call, for a coroutine function fn, on the running event loop
+
+        The attempt that loses is cancelled instead of left to finish.
+
+        Returns:
+            object: return value of the first attempt that succeeds
+        """
+        self._earn()
+
+        async def attempt():
+            start_time = time.time()
+            value = await fn()
+            self.record(kind, time.time() - start_time)
+            return value
+
+        first = asyncio.ensure_future(attempt())
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.delay(kind))
+            if not done and self._acquire():
+                hedge = asyncio.ensure_future(attempt())
+                # Released even if the hedge is cancelled before it starts
+                hedge.add_done_callback(lambda _: self._release())
+                pending.add(hedge)
+
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for task in pending:
+                task.cancel()
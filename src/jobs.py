@@ -0,0 +1,223 @@
+import threading
+import time
+
+from src import latency, utils
+from src.artifacts import ArtifactStore
+
+
+class BackgroundJob:
+    """
+    Runs a long task on a worker thread and records its progress.
+
+    Streamlit reruns the whole script on every widget interaction, so long work
+    started from a button handler blocks the session and is lost on the next
+    rerun. A job is stored in ``st.session_state`` instead; the worker updates
+    the progress attributes below and the UI reads them on each rerun.
+
+    Attributes:
+    -----------
+    total : int
+        Number of steps the job is expected to run.
+    completed : int
+        Number of steps finished so far.
+    message : str
+        Latest status message set by the worker.
+    errors : list of str
+        Non-fatal errors collected while the job was running.
+    result : object
+        Return value of the target once it has finished.
+    exception : Exception or None
+        Exception raised by the target, if any.
+    eta : float or None
+        Estimated seconds until the job finishes, if the worker reports one.
+    """
+
+    def __init__(self, target, *args, total=1, **kwargs):
+        """
+        Parameters:
+        -----------
+        target : callable
+            Function to run. It is called as ``target(job, *args, **kwargs)`` so it
+            can report progress through ``job.update``.
+        total : int, optional
+            Number of steps used to compute the progress fraction.
+        """
+        self.total = max(total, 1)
+        self.completed = 0
+        self.message = ""
+        self.errors = []
+        self.result = None
+        self.exception = None
+        self.eta = None
+        self._eta_at = None
+        self.started_at = None
+        self.finished_at = None
+
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, args=(target, args, kwargs), daemon=True
+        )
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def _run(self, target, args, kwargs):
+        try:
+            self.result = target(self, *args, **kwargs)
+        except Exception as e:
+            self.exception = e
+        finally:
+            self.finished_at = time.time()
+
+    def update(self, completed=None, message=None, eta=None):
+        """Record progress from the worker thread."""
+        with self._lock:
+            if completed is not None:
+                self.completed = completed
+            if message is not None:
+                self.message = message
+            if eta is not None:
+                self.eta = eta
+                self._eta_at = time.time()
+
+    def add_error(self, message):
+        with self._lock:
+            self.errors.append(message)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    @property
+    def time_remaining(self):
+        """Seconds left according to the last ETA, counting down between updates."""
+        if self.eta is None or self.done:
+            return None
+        return max(self.eta - (time.time() - self._eta_at), 0.0)
+
+    @property
+    def progress(self):
+        """Fraction of steps completed, between 0 and 1."""
+        return min(self.completed / self.total, 1.0)
+
+
+def run_report(
+    job,
+    project_id,
+    prompts,
+    resp_directory,
+    render="local",
+    client=None,
+    history=None,
+    layout_overrides=utils.LAYOUT_OVERRIDES,
+):
+    """
+    Job target that runs every prompt and saves the artifacts to resp_directory
+
+    Artifacts are also kept in memory so the deck can be exported from the
+    returned store without reading the files back. Prompt latencies are
+    recorded in the latency history, which also drives the job's ETA.
+
+    Returns:
+        ArtifactStore: artifacts of this run, persisted to resp_directory
+    """
+    total_iterations = len(prompts)
+    store = ArtifactStore(persist=True)
+    history = latency.get_history(history)
+    estimates = [history.estimate(content) for content in prompts]
+
+    try:
+        for i, content in enumerate(prompts):
+            job.update(
+                message=f"Processing prompt {i + 1} of {total_iterations}",
+                eta=sum(estimates[i:]),
+            )
+
+            start_time = time.time()
+            try:
+                paths = utils.run_chat_prompt(
+                    project_id,
+                    content,
+                    resp_directory,
+                    file_prefix=f"{i + 1:03d}_",
+                    render=render,
+                    layout_overrides=layout_overrides,
+                    store=store,
+                    client=client,
+                )
+                history.record(
+                    content, time.time() - start_time, latency.output_type(paths)
+                )
+            except Exception as e:
+                job.add_error(f"Prompt {i + 1}: {e}")
+
+            job.update(completed=i + 1, eta=sum(estimates[i + 1 :]))
+    finally:
+        history.save()
+
+    job.update(message="Processing complete!")
+
+    return store
+
+
+def run_transform(job, project_id, project_name, df, predict_field, client=None):
+    """
+    Job target that transforms df, creates a dataset and trains a placeholder model
+
+    Progress is counted in rows, plus one final step for model training.
+
+    Returns:
+        str: id of the newly created project
+    """
+    job.update(
+        message=f"Transforming data into project with project name: {project_name}..."
+    )
+
+    def on_progress(rows_done, total_rows):
+        job.update(
+            completed=rows_done,
+            message=f"Transformed and uploaded {rows_done} of {total_rows} rows...",
+        )
+
+    client = utils.get_client(client)
+    transformed_dataset_id = utils.transform_to_dataset(
+        project_id, df, project_name, progress_callback=on_progress, client=client
+    )
+
+    job.update(message="Training model...")
+
+    # Train ML Model
+    # (Train a dummy model to force project creation in the UI (I know this is suboptimal, but we will optimize this out in our v2 API))
+
+    # UI Mapping:
+    #     1    = Super Fast (Do not recommend)
+    #     10   = Fastest
+    #     60   = High Quality
+    #     300  = Higher Quality
+    #     1800 = Production
+
+    training_mode = 1
+    ignore_fields = []
+
+    new_model = client.create_model(
+        transformed_dataset_id,
+        [predict_field],
+        ignore_fields,
+        {"duration": training_mode, "extra_attention": False},
+    )
+
+    if new_model["status"] != "success":
+        raise ValueError(
+            f"Project creation failed due to model training error. Model training details: {new_model}"
+        )
+
+    job.update(completed=job.total, message="Processing complete!")
+
+    # grab project id from new_model
+    return new_model["model_id"]
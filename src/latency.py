@@ -0,0 +1,195 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+
+# Observed chat prompt latencies, used to schedule slow prompts first and for ETAs
+LATENCY_HISTORY = os.path.join(os.path.expanduser("~"), ".akkio-ce", "latency.json")
+
+# Seconds assumed for a prompt when nothing similar has been seen yet
+DEFAULT_PROMPT_SECONDS = 30.0
+
+# Weight of the newest observation in the moving average
+SMOOTHING = 0.3
+
+# Artifact suffixes written by process_chat_output, by output type
+OUTPUT_TYPES = {
+    ".png": "image",
+    ".parquet": "table",
+    ".feather": "table",
+    ".csv": "table",
+    ".txt": "text",
+}
+
+_IMAGE_WORDS = re.compile(r"\b(chart|plot|graph|visuali[sz]e|histogram|pie|bar|line)\b")
+_TABLE_WORDS = re.compile(r"\btable\b")
+
+
+def prompt_key(content):
+    """Key of a prompt in the history, ignoring case and whitespace"""
+    text = " ".join(str(content).lower().split())
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def output_type(paths):
+    """
+    Output type of a prompt from the artifacts it wrote
+
+    A prompt producing any chart counts as "image", otherwise any table as
+    "table", otherwise "text".
+    """
+    kinds = {
+        OUTPUT_TYPES.get(os.path.splitext(str(path))[1].lower(), "text")
+        for path in paths
+    }
+    for kind in ("image", "table"):
+        if kind in kinds:
+            return kind
+    return "text"
+
+
+def guess_output_type(content):
+    """Output type a prompt will probably produce, from its wording"""
+    text = str(content).lower()
+    if _TABLE_WORDS.search(text):
+        return "table"
+    if _IMAGE_WORDS.search(text):
+        return "image"
+    return None
+
+
+class LatencyHistory:
+    """
+    Moving averages of chat prompt latency, per prompt and per output type.
+
+    Estimates fall back from the prompt's own history to the average of the
+    output type it is likely to produce, then to the average of all prompts
+    and finally to ``DEFAULT_PROMPT_SECONDS``.
+
+    Attributes:
+    -----------
+    path : str
+        JSON file the history is loaded from and saved to.
+    """
+
+    def __init__(self, path=LATENCY_HISTORY):
+        self.path = path
+        self._lock = threading.Lock()
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            data = {}
+
+        self.prompts = data.get("prompts", {})
+        self.output_types = data.get("output_types", {})
+
+    @staticmethod
+    def _update(entry, seconds):
+        if entry.get("count"):
+            entry["seconds"] += SMOOTHING * (seconds - entry["seconds"])
+        else:
+            entry["seconds"] = seconds
+        entry["count"] = entry.get("count", 0) + 1
+
+    def record(self, content, seconds, artifact_type=None):
+        """Add one observed latency of content, producing artifact_type"""
+        with self._lock:
+            entry = self.prompts.setdefault(prompt_key(content), {})
+            self._update(entry, seconds)
+            if artifact_type:
+                entry["output_type"] = artifact_type
+                self._update(self.output_types.setdefault(artifact_type, {}), seconds)
+
+    def estimate(self, content):
+        """Expected seconds for content"""
+        with self._lock:
+            entry = self.prompts.get(prompt_key(content))
+            if entry:
+                return entry["seconds"]
+
+            artifact_type = guess_output_type(content)
+            if artifact_type in self.output_types:
+                return self.output_types[artifact_type]["seconds"]
+
+            if self.prompts:
+                return sum(e["seconds"] for e in self.prompts.values()) / len(
+                    self.prompts
+                )
+
+        return DEFAULT_PROMPT_SECONDS
+
+    def save(self):
+        with self._lock:
+            data = {"prompts": self.prompts, "output_types": self.output_types}
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def longest_first(items, estimates):
+    """
+    Order items by descending estimate (ties keep their original order)
+
+    Submitting the slowest jobs first to a pool minimizes the chance that one
+    slow job started last dictates the total run time.
+
+    Returns:
+        list: items, slowest first
+    """
+    order = sorted(range(len(items)), key=lambda i: -estimates[i])
+    return [items[i] for i in order]
+
+
+def estimate_makespan(queued, workers, running=()):
+    """
+    Seconds until a pool of workers finishes everything
+
+    queued holds the estimates of jobs not started yet, in submission order;
+    running holds the remaining seconds of jobs already in progress.
+
+    Returns:
+        float: estimated seconds until the last job finishes
+    """
+    workers = max(workers, 1)
+    free_at = sorted(max(seconds, 0.0) for seconds in running)[:workers]
+    free_at += [0.0] * (workers - len(free_at))
+    heapq.heapify(free_at)
+
+    for seconds in queued:
+        heapq.heappush(free_at, heapq.heappop(free_at) + seconds)
+
+    return max(free_at)
+
+
+def format_eta(seconds):
+    """Format seconds as e.g. "2m 05s" """
+    seconds = int(round(seconds))
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+_default_history = None
+_default_history_lock = threading.Lock()
+
+
+def get_history(history=None):
+    """Return history, or the shared history stored at LATENCY_HISTORY"""
+    global _default_history
+    if history is not None:
+        return history
+
+    with _default_history_lock:
+        if _default_history is None or _default_history.path != LATENCY_HISTORY:
+            _default_history = LatencyHistory(LATENCY_HISTORY)
+        return _default_history
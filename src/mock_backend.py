@@ -0,0 +1,349 @@
+"""
+Local stand-in for the Akkio API, for load tests and offline development.
+
+Implements the endpoints AkkioClient uses: chat-explore (new / status /
+chats), projects, datasets and models (transform, predict and training).
+Chat tasks finish ``chat_seconds`` after submission and return a chart, table
+or text depending on the prompt wording. Run it standalone with:
+
+    python -m src.mock_backend --port 8765
+"""
+
+import argparse
+import base64
+import gzip
+import itertools
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_CHART_WORDS = re.compile(r"\b(chart|plot|graph|visuali[sz]e|histogram|pie|bar|line)\b")
+
+_INTERPRETATION = "###interpretation:- The data is grouped and aggregated"
+_PLACEHOLDER = "A chart or table will be rendered here."
+
+
+def _png(width=160, height=120):
+    """Encode a flat grey RGB image as PNG bytes"""
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    rows = b"".join(b"\x00" + b"\xb0" * (width * 3) for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+class MockAkkio:
+    """
+    In-memory Akkio API served from a background thread.
+
+    Attributes:
+    -----------
+    chat_seconds : float
+        Seconds a chat task takes before its status is SUCCEEDED.
+    jitter : float
+        Fraction of chat_seconds added or removed at random per task.
+    stall_rate : float
+        Fraction of status and chat requests that stall for ``stall_seconds``
+        before answering, like a stuck connection.
+    row_seconds : float
+        Seconds the datasets and models endpoints spend per row received.
+    max_body_bytes : int or None
+        Request bodies larger than this are answered with 413.
+    port : int
+        Port the server listens on (0 picks a free port until started).
+    requests : dict
+        Number of requests served per endpoint.
+    """
+
+    def __init__(
+        self,
+        port=0,
+        chat_seconds=2.0,
+        jitter=0.25,
+        seed=0,
+        stall_rate=0.0,
+        stall_seconds=30.0,
+        row_seconds=0.0,
+        max_body_bytes=None,
+    ):
+        self.chat_seconds = chat_seconds
+        self.jitter = jitter
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.row_seconds = row_seconds
+        self.max_body_bytes = max_body_bytes
+        self.port = port
+        self.requests = {}
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._tasks = {}  # task id -> (ready at, prompt)
+        # dataset id -> name; accounts always list at least one dataset
+        self._datasets = {"dataset0": "Sample dataset"}
+        self._server = None
+        self._thread = None
+
+    # Server lifecycle
+    def start(self):
+        handler = type("Handler", (_Handler,), {"backend": self})
+        self._server = _Server(("127.0.0.1", self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def client_settings(self):
+        """Keyword arguments pointing an AkkioClient at this backend"""
+        return {
+            "protocol": "http",
+            "base_url": f"127.0.0.1:{self.port}/api",
+            "url": "127.0.0.1",
+            "sdk_url": "127.0.0.1",
+            "port": str(self.port),
+        }
+
+    def _new_id(self, prefix):
+        with self._lock:
+            return f"{prefix}{next(self._ids)}"
+
+    def _count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def _maybe_stall(self):
+        with self._lock:
+            stall = self._random.random() < self.stall_rate
+        if stall:
+            self._count("stalled")
+            time.sleep(self.stall_seconds)
+
+    # Chat explore
+    def new_chat(self, body):
+        prompt = body["messages"][-1]["content"]
+        seconds = self.chat_seconds * (1 + self._random.uniform(-1, 1) * self.jitter)
+        task_id = self._new_id("task")
+        with self._lock:
+            self._tasks[task_id] = (time.time() + max(seconds, 0.0), prompt)
+        return {"task_id": task_id}
+
+    def task_status(self, task_id):
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is None:
+            return {"status": "FAILED"}
+        if time.time() < task[0]:
+            return {"status": "IN_PROGRESS"}
+        return {"status": "SUCCEEDED", "metadata": {"location": f"/chats/{task_id}"}}
+
+    def chat(self, chat_id, image_format):
+        with self._lock:
+            prompt = self._tasks[chat_id][1]
+
+        text = prompt.lower()
+        message = {
+            "role": "assistant",
+            "content": _PLACEHOLDER,
+            "images": [],
+            "table": None,
+        }
+
+        if "table" in text:
+            message["table"] = [
+                {"group": f"g{i}", "value": round(self._random.uniform(0, 100), 2)}
+                for i in range(12)
+            ]
+        elif _CHART_WORDS.search(text):
+            if image_format == "base64_png":
+                image = base64.b64encode(_png()).decode("ascii")
+            else:
+                image = json.dumps(
+                    {
+                        "data": [
+                            {
+                                "type": "bar",
+                                "x": [f"g{i}" for i in range(8)],
+                                "y": [self._random.randint(1, 100) for _ in range(8)],
+                            }
+                        ],
+                        "layout": {"title": {"text": prompt[:60]}},
+                    }
+                )
+            message["images"] = [image]
+        else:
+            message["content"] = f"Summary for: {prompt}"
+
+        return {
+            "messages": [
+                {
+                    "role": "assistant",
+                    "content": _INTERPRETATION,
+                    "images": [],
+                    "table": None,
+                },
+                message,
+            ]
+        }
+
+    # Datasets and models
+    def _process_rows(self, rows):
+        if self.row_seconds:
+            time.sleep(self.row_seconds * len(rows))
+
+    def list_datasets(self):
+        with self._lock:
+            datasets = [{"id": i, "name": name} for i, name in self._datasets.items()]
+        return {"datasets": datasets}
+
+    def datasets(self, body):
+        if "name" in body and "id" not in body:
+            dataset_id = self._new_id("dataset")
+            with self._lock:
+                self._datasets[dataset_id] = body["name"]
+            return {"dataset_id": dataset_id, "dataset_name": body["name"]}
+
+        if "rows" in body:
+            self._process_rows(body["rows"])
+            # Akkio appends into a new master dataset with the same name
+            with self._lock:
+                name = self._datasets.get(body["id"])
+                if name is not None and list(self._datasets.values()).count(name) == 1:
+                    self._datasets[f"dataset{next(self._ids)}"] = name
+
+        return {"status": "success"}
+
+    def models(self, body):
+        if "data" in body:
+            self._process_rows(body["data"])
+            column = (
+                "transformed" if body.get("deploy-transforms-only") else "prediction"
+            )
+            return {"predictions": [dict(row, **{column: "1"}) for row in body["data"]]}
+        return {"status": "success", "model_id": self._new_id("model")}
+
+
+class _Server(ThreadingHTTPServer):
+    # Load tests open many connections at once; the default backlog is 5
+    request_queue_size = 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        limit = self.backend.max_body_bytes
+        if limit is not None and len(body) > limit:
+            return None
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return json.loads(body or b"{}")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = parse_qs(url.query)
+        backend = self.backend
+
+        if "status" in parts:
+            backend._count("status")
+            backend._maybe_stall()
+            self._send(backend.task_status(parts[-1]))
+        elif "chats" in parts:
+            backend._count("chats")
+            backend._maybe_stall()
+            image_format = query.get("image_format", ["plotly_json"])[0]
+            self._send(backend.chat(parts[-1], image_format))
+        elif parts[-1] == "datasets":
+            backend._count("list_datasets")
+            self._send(backend.list_datasets())
+        else:
+            self._send({"status": "error", "message": "not found"}, status=404)
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        body = self._body()
+        backend = self.backend
+
+        if body is None:
+            backend._count("too_large")
+            self._send({"status": "error", "message": "Payload too large"}, status=413)
+            return
+
+        if parts[-1] == "new":
+            backend._count("new")
+            self._send(backend.new_chat(body))
+        elif parts[-1] == "projects":
+            backend._count("projects")
+            self._send({"project_id": backend._new_id("project")})
+        elif parts[-1] == "datasets":
+            backend._count("datasets")
+            self._send(backend.datasets(body))
+        elif parts[-1] == "models":
+            backend._count("models")
+            self._send(backend.models(body))
+        else:
+            self._send({"status": "error", "message": "not found"}, status=404)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chat-seconds", type=float, default=2.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    backend = MockAkkio(
+        port=args.port, chat_seconds=args.chat_seconds, stall_rate=args.stall_rate
+    ).start()
+    print(f"Mock Akkio API listening with client settings {backend.client_settings()}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src import reports, utils
+
+# Set to the folder holding precomputed decks, shared by the scheduler and the app
+DECK_CACHE_ENV = "AKKIO_DECK_CACHE"
+
+# Precomputed decks and artifacts, one folder per API key, project and prompt list
+DECK_CACHE = os.environ.get(DECK_CACHE_ENV) or os.path.join(
+    os.path.expanduser("~"), ".akkio-ce", "decks"
+)
+
+# Hours a precomputed deck is served for unless its schedule says otherwise
+DECK_MAX_AGE_HOURS = 24
+
+# Longest sleep of the scheduler loop, so clock changes (suspend, DST) are
+# picked up
+SCHEDULER_POLL_SECONDS = 60
+
+WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+
+def clean_prompts(prompts):
+    """Prompts as stripped strings without blanks, as reports.load_prompts reads them"""
+    return [
+        str(content).strip()
+        for content in prompts
+        if content is not None and content == content and str(content).strip()
+    ]
+
+
+def prompts_key(prompts):
+    """Key of a prompt list in the deck cache"""
+    text = json.dumps(clean_prompts(prompts), ensure_ascii=False)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def key_id(api_key):
+    """Folder name for the decks built with api_key, which does not reveal the key"""
+    if not api_key:
+        raise ValueError("Precomputed decks need an API key")
+    return hashlib.blake2b(
+        api_key.encode("utf-8"), digest_size=16, person=b"akkio-ce-decks"
+    ).hexdigest()
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+class DeckCache:
+    """
+    Decks and artifacts precomputed for a project and prompt list.
+
+    Each entry lives in ``<root>/<key id>/<project_id>/<prompts key>/`` with the
+    deck (``deck.pptx``), its ``artifacts`` folder and a ``meta.json`` recording
+    when it was built and until when it is served. The key id is derived from
+    the API key the deck was built with (see key_id), so a deck is only served
+    to the same key, which is known to have access to the project. Entries are built in a staging
+    folder and swapped in whole, so readers never see a half-written deck.
+
+    Attributes:
+    -----------
+    root : str
+        Folder holding the cached entries.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or DECK_CACHE
+
+    def path(self, project_id, prompts, api_key):
+        return os.path.join(
+            self.root, key_id(api_key), str(project_id), prompts_key(prompts)
+        )
+
+    def lookup(self, project_id, prompts, api_key, now=None):
+        """
+        Fresh entry for project_id and prompts built with api_key, or None
+
+        Returns:
+            dict: metadata with the ``deck`` and ``artifacts`` paths
+        """
+        folder = self.path(project_id, prompts, api_key)
+        try:
+            with open(os.path.join(folder, "meta.json"), encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if (now or time.time()) > meta["expires_at"]:
+            return None
+
+        meta["deck"] = os.path.join(folder, "deck.pptx")
+        meta["artifacts"] = os.path.join(folder, "artifacts")
+        if not os.path.exists(meta["deck"]):
+            return None
+        return meta
+
+    def publish(
+        self, project_id, prompts, api_key, deck, artifacts, max_age_hours, errors=()
+    ):
+        """Move a finished deck and its artifacts folder into the cache"""
+        folder = self.path(project_id, prompts, api_key)
+        staging = f"{folder}.new"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        shutil.move(deck, os.path.join(staging, "deck.pptx"))
+        if os.path.isdir(artifacts):
+            shutil.move(artifacts, os.path.join(staging, "artifacts"))
+
+        created_at = time.time()
+        _write_json(
+            os.path.join(staging, "meta.json"),
+            {
+                "project_id": str(project_id),
+                "prompts": len(clean_prompts(prompts)),
+                "created_at": created_at,
+                "expires_at": created_at + max_age_hours * 3600,
+                "errors": list(errors),
+            },
+        )
+
+        # Swap the folders; the old entry stays readable until the last moment
+        old = f"{folder}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(folder):
+            os.replace(folder, old)
+        os.replace(staging, folder)
+        shutil.rmtree(old, ignore_errors=True)
+
+        return os.path.join(folder, "deck.pptx")
+
+
+def precompute(
+    project_prompts,
+    cache=None,
+    max_age_hours=DECK_MAX_AGE_HOURS,
+    max_workers=8,
+    render="local",
+    client=None,
+    template=None,
+    layout_overrides=utils.LAYOUT_OVERRIDES,
+):
+    """
+    Run the prompts of every project now and publish the decks to the cache
+
+    All projects share one generate_reports run (and so one concurrency
+    budget); each project's deck is published once the run has finished.
+
+    Returns:
+        dict: generate_reports results, with ``deck`` pointing into the cache
+    """
+    client = utils.get_client(client)
+    cache = cache or DeckCache()
+    os.makedirs(cache.root, exist_ok=True)
+
+    project_prompts = {
+        str(project_id): clean_prompts(prompts)
+        for project_id, prompts in project_prompts.items()
+    }
+
+    # Build next to the cache so publishing is a rename on the same filesystem
+    with tempfile.TemporaryDirectory(prefix=".run-", dir=cache.root) as run_dir:
+        results = reports.generate_reports(
+            project_prompts,
+            run_dir,
+            max_workers=max_workers,
+            render=render,
+            client=client,
+            template=template,
+            layout_overrides=layout_overrides,
+        )
+
+        for project_id, result in results.items():
+            if result["deck"] is None:
+                print(f"No deck to publish for project {project_id}")
+                continue
+
+            result["deck"] = cache.publish(
+                project_id,
+                project_prompts[project_id],
+                client.api_key,
+                result["deck"],
+                os.path.join(run_dir, project_id),
+                max_age_hours,
+                errors=result["errors"],
+            )
+            print(f"Published precomputed deck for project {project_id}")
+
+    return results
+
+
+def load_schedule(filepath):
+    """
+    Reads scheduled precomputations from a JSON file
+
+    The file holds a ``schedules`` list. Each entry needs a ``name``, a
+    ``time`` ("HH:MM", local time) and either ``prompts`` (a workbook) with
+    ``projects`` or a ``matrix`` file (see reports.load_matrix). ``weekday``
+    makes the entry weekly instead of daily; ``max_age_hours``, ``render``,
+    ``max_workers``, ``template`` (a branded .pptx) and ``layout`` (plotly layout
+    overrides, ``{}`` for server styling) are optional. Paths are relative to the schedule file.
+
+    Returns:
+        list: entries with their ``project_prompts`` loaded
+    """
+    with open(filepath, encoding="utf-8") as file:
+        config = json.load(file)
+
+    base_dir = os.path.dirname(os.path.abspath(filepath))
+    entries = []
+
+    for entry in config["schedules"]:
+        entry = dict(entry)
+
+        if "matrix" in entry:
+            entry["project_prompts"] = reports.load_matrix(
+                os.path.join(base_dir, entry["matrix"])
+            )
+        elif "prompts" in entry and entry.get("projects"):
+            prompts = reports.load_prompts(os.path.join(base_dir, entry["prompts"]))
+            entry["project_prompts"] = {
+                str(project_id): prompts for project_id in entry["projects"]
+            }
+        else:
+            raise ValueError(
+                f"Schedule '{entry.get('name')}' needs a matrix or prompts with projects"
+            )
+
+        if entry.get("template"):
+            entry["template"] = os.path.join(base_dir, entry["template"])
+
+        hour, minute = (int(part) for part in entry["time"].split(":"))
+        entry["hour"], entry["minute"] = hour, minute
+
+        weekday = entry.get("weekday")
+        if isinstance(weekday, str):
+            entry["weekday"] = WEEKDAYS.index(weekday.lower())
+
+        entries.append(entry)
+
+    return entries
+
+
+def last_due(entry, now):
+    """Latest time at or before now the entry was due to run"""
+    due = now.replace(
+        hour=entry["hour"], minute=entry["minute"], second=0, microsecond=0
+    )
+
+    if entry.get("weekday") is None:
+        if due > now:
+            due -= timedelta(days=1)
+    else:
+        due -= timedelta(days=(due.weekday() - entry["weekday"]) % 7)
+        if due > now:
+            due -= timedelta(days=7)
+
+    return due
+
+
+def next_due(entry, now):
+    """First time after now the entry is due to run"""
+    period = timedelta(days=1 if entry.get("weekday") is None else 7)
+    return last_due(entry, now) + period
+
+
+def run_schedule(
+    entries,
+    client=None,
+    cache=None,
+    state_path=None,
+    once=False,
+    max_workers=8,
+):
+    """
+    Precompute each entry whenever it is due, forever (or once with once=True)
+
+    The last run of every entry is kept in ``schedule_state.json`` in the cache,
+    so a run missed while the scheduler was down is caught up on start. New
+    entries wait for their first due time; once runs every entry right away.
+    """
+    cache = cache or DeckCache()
+    state_path = state_path or os.path.join(cache.root, "schedule_state.json")
+
+    try:
+        with open(state_path, encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        state = {}
+
+    now = datetime.now()
+    for entry in entries:
+        state.setdefault(entry["name"], now.timestamp())
+
+    announced = None
+    while True:
+        for entry in entries:
+            now = datetime.now()
+            if not once and state[entry["name"]] >= last_due(entry, now).timestamp():
+                continue
+
+            print(f"Precomputing schedule '{entry['name']}'")
+            try:
+                precompute(
+                    entry["project_prompts"],
+                    cache=cache,
+                    max_age_hours=entry.get("max_age_hours", DECK_MAX_AGE_HOURS),
+                    max_workers=entry.get("max_workers", max_workers),
+                    render=entry.get("render", "local"),
+                    client=client,
+                    template=entry.get("template"),
+                    layout_overrides=entry.get("layout", utils.LAYOUT_OVERRIDES),
+                )
+            except Exception as e:
+                print(f"Schedule '{entry['name']}' failed: {e}")
+
+            state[entry["name"]] = time.time()
+            os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+            _write_json(state_path, state)
+
+        if once:
+            return
+
+        now = datetime.now()
+        wake = min(next_due(entry, now) for entry in entries)
+        if wake != announced:
+            print(f"Next precomputation at {wake:%Y-%m-%d %H:%M}")
+            announced = wake
+        time.sleep(min(max((wake - now).total_seconds(), 1.0), SCHEDULER_POLL_SECONDS))
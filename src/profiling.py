@@ -0,0 +1,289 @@
+import atexit
+import cProfile
+import functools
+import html
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+# Set to a directory to profile every pipeline stage of the process
+PROFILE_ENV = "AKKIO_PROFILE"
+
+# Seconds between stack samples taken for the combined flamegraph
+SAMPLE_INTERVAL = 0.005
+
+_profiler = None
+
+
+class Profiler:
+    """
+    Profiles named pipeline stages (submit, poll, fetch, render, ...).
+
+    Each stage is measured three ways:
+
+    - a deterministic ``cProfile`` profile per stage, merged across calls and
+      threads and written to ``<stage>.prof`` (open with ``snakeviz`` or
+      ``python -m pstats``). Nested stages are attributed to the innermost one.
+    - a sampling thread that records the stacks of threads inside a stage,
+      written as ``combined.folded`` (flamegraph.pl / speedscope input) and
+      rendered to ``combined.svg``.
+    - wall time and call counts per stage, written to ``summary.txt``.
+
+    Attributes:
+    -----------
+    out_dir : str
+        Folder the profile files are written to.
+    interval : float
+        Seconds between stack samples.
+    """
+
+    def __init__(self, out_dir, interval=SAMPLE_INTERVAL):
+        self.out_dir = out_dir
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active = {}  # thread id -> stack of stage names
+        self._stats = {}  # stage -> pstats.Stats
+        self._wall = defaultdict(float)
+        self._calls = Counter()
+        self._samples = Counter()
+
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.write()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def _enter(self, name):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        # Pause the enclosing stage so time is attributed to the innermost one
+        if stack and stack[-1][1] is not None:
+            stack[-1][1].disable()
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process; concurrent
+            # stages in other threads then rely on the sampled stacks only
+            profile = None
+
+        stack.append((name, profile, time.perf_counter()))
+        with self._lock:
+            self._active[threading.get_ident()] = [entry[0] for entry in stack]
+
+    def _exit(self):
+        stack = self._local.stack
+        name, profile, start = stack.pop()
+        elapsed = time.perf_counter() - start
+
+        if profile is not None:
+            profile.disable()
+
+        with self._lock:
+            self._wall[name] += elapsed
+            self._calls[name] += 1
+            if profile is not None:
+                if name in self._stats:
+                    self._stats[name].add(profile)
+                else:
+                    self._stats[name] = pstats.Stats(profile)
+
+            if stack:
+                self._active[threading.get_ident()] = [entry[0] for entry in stack]
+            else:
+                self._active.pop(threading.get_ident(), None)
+
+        if stack and stack[-1][1] is not None:
+            try:
+                stack[-1][1].enable()
+            except ValueError:
+                pass
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = {ident: list(stages) for ident, stages in self._active.items()}
+            if not active:
+                continue
+
+            frames = sys._current_frames()
+            for ident, stages in active.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+
+                calls = []
+                while frame is not None:
+                    code = frame.f_code
+                    calls.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+
+                key = ";".join([f"[{stage}]" for stage in stages] + calls[::-1])
+                with self._lock:
+                    self._samples[key] += 1
+
+    def write(self):
+        """Write per-stage profiles, the combined flamegraph and a summary."""
+        with self._lock:
+            stats = dict(self._stats)
+            samples = Counter(self._samples)
+            wall = dict(self._wall)
+            calls = Counter(self._calls)
+
+        for name, stage_stats in stats.items():
+            stage_stats.dump_stats(os.path.join(self.out_dir, f"{name}.prof"))
+
+        with open(
+            os.path.join(self.out_dir, "combined.folded"), "w", encoding="utf-8"
+        ) as file:
+            for key, count in sorted(samples.items()):
+                file.write(f"{key} {count}\n")
+
+        with open(
+            os.path.join(self.out_dir, "combined.svg"), "w", encoding="utf-8"
+        ) as file:
+            file.write(render_flamegraph(samples))
+
+        with open(
+            os.path.join(self.out_dir, "summary.txt"), "w", encoding="utf-8"
+        ) as file:
+            file.write(f"{'stage':<20}{'calls':>8}{'seconds':>12}\n")
+            for name in sorted(wall, key=wall.get, reverse=True):
+                file.write(f"{name:<20}{calls[name]:>8}{wall[name]:>12.4f}\n")
+
+        print(f"Profiles written to {self.out_dir}")
+
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._profiler._enter(self._name)
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler._exit()
+        return False
+
+
+def render_flamegraph(samples, width=1200, row_height=16):
+    """
+    Render folded stack samples as a self-contained SVG flamegraph
+
+    Returns:
+        str: SVG document
+    """
+    root = {"count": 0, "children": {}}
+    for key, count in samples.items():
+        node = root
+        node["count"] += count
+        for name in key.split(";"):
+            node = node["children"].setdefault(name, {"count": 0, "children": {}})
+            node["count"] += count
+
+    rects = []
+    depth_max = 0
+
+    def walk(node, x, depth):
+        nonlocal depth_max
+        depth_max = max(depth_max, depth)
+        for name, child in sorted(node["children"].items()):
+            w = child["count"] / root["count"] * width
+            rects.append((x, depth, w, name, child["count"]))
+            walk(child, x, depth + 1)
+            x += w
+
+    if root["count"]:
+        walk(root, 0.0, 0)
+
+    height = (depth_max + 1) * row_height
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">'
+    ]
+    for x, depth, w, name, count in rects:
+        if w < 0.5:
+            continue
+        y = height - (depth + 1) * row_height
+        hue = 20 + (hash(name) % 40)
+        label = html.escape(name)
+        parts.append(
+            f"<g><title>{label} ({count} samples)</title>"
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" fill="hsl({hue},80%,60%)"/>'
+        )
+        if w > 40:
+            chars = int(w / 7)
+            text = html.escape(name[:chars])
+            parts.append(
+                f'<text x="{x + 2:.1f}" y="{y + row_height - 4}">{text}</text>'
+            )
+        parts.append("</g>")
+    parts.append("</svg>")
+
+    return "\n".join(parts)
+
+
+def enable(out_dir, interval=SAMPLE_INTERVAL):
+    """Start profiling stages into out_dir; files are written by disable()"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(out_dir, interval).start()
+    return _profiler
+
+
+def disable():
+    """Stop profiling and write the profile files"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+
+
+def stage(name):
+    """Context manager that profiles a pipeline stage when profiling is enabled"""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.stage(name)
+
+
+def profiled(name):
+    """Decorator that runs the function as the named stage"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+if os.environ.get(PROFILE_ENV):
+    enable(os.environ[PROFILE_ENV])
+    atexit.register(disable)
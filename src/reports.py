@@ -0,0 +1,308 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src import latency, utils
+from src._lazy import lazy_import
+from src.artifacts import ArtifactStore
+
+pd = lazy_import("pandas")
+
+# Decks built at the same time, next to the chat tasks of unfinished projects
+EXPORT_WORKERS = 4
+
+
+def load_prompts(filepath):
+    """
+    Reads the prompts from the first column of a prompt workbook
+
+    Returns:
+        list: prompts in file order
+    """
+    df = utils.import_data(filepath)
+    return df.iloc[:, 0].dropna().tolist()
+
+
+def load_matrix(filepath):
+    """
+    Reads a project x prompt workbook matrix from a CSV or Excel file.
+
+    The file needs a ``project_id`` column and a ``prompts`` column holding the
+    path of the prompt workbook to run for that project. Paths are resolved
+    relative to the matrix file.
+
+    Returns:
+        dict: prompts keyed by project id
+    """
+    df = utils.import_data(filepath)
+
+    missing = {"project_id", "prompts"} - set(df.columns)
+    if missing:
+        raise ValueError(
+            f"Matrix file {filepath} is missing column(s): {', '.join(sorted(missing))}"
+        )
+
+    base_dir = os.path.dirname(os.path.abspath(filepath))
+    workbooks = {}
+    project_prompts = {}
+
+    for project_id, workbook in df[["project_id", "prompts"]].itertuples(index=False):
+        workbook = os.path.join(base_dir, workbook)
+        if workbook not in workbooks:
+            workbooks[workbook] = load_prompts(workbook)
+        project_prompts.setdefault(str(project_id), []).extend(workbooks[workbook])
+
+    return project_prompts
+
+
+def _timed_prompt(history, started, key, project_id, content, *args, **kwargs):
+    """Run one chat prompt and record its latency and output type in history"""
+    start_time = time.time()
+    started[key] = start_time
+
+    paths = utils.run_chat_prompt(project_id, content, *args, **kwargs)
+
+    history.record(content, time.time() - start_time, latency.output_type(paths))
+    return paths
+
+
+def generate_reports(
+    project_prompts,
+    out_dir,
+    max_workers=8,
+    export=True,
+    render="local",
+    persist=True,
+    client=None,
+    history=None,
+    progress_callback=None,
+    save_responses=False,
+    template=None,
+    layout_overrides=utils.LAYOUT_OVERRIDES,
+):
+    """
+    Runs every prompt of every project under one shared concurrency budget.
+
+    All chat tasks are submitted to a single thread pool, so ``max_workers``
+    bounds the number of chat tasks in flight across all projects. Prompts are
+    submitted slowest first according to their latency history, so a long
+    prompt never starts last and dictates the total run time. Artifacts for
+    each project are written to ``out_dir/<project_id>`` with a prompt index
+    prefix so slide order follows the workbook, and the project's deck is
+    exported to ``out_dir/<project_id>.pptx`` as soon as its last prompt finishes.
+    Decks are built from in-memory artifact stores, so artifacts are never read
+    back from disk, on a separate pool of ``EXPORT_WORKERS`` threads that all
+    copy the same template, parsed once for the whole run.
+
+    Parameters:
+    -----------
+    project_prompts : dict
+        Lists of prompts keyed by project id.
+    out_dir : str
+        Folder to write artifacts and decks to.
+    max_workers : int, optional
+        Maximum number of chat tasks running at the same time.
+    export : bool, optional
+        Whether to export a deck per project.
+    render : str, optional
+        Chart rendering strategy passed to ``utils.run_chat_prompt``.
+    persist : bool, optional
+        Whether artifacts are also written to ``out_dir/<project_id>``.
+    client : AkkioClient, optional
+        Client shared by all workers (defaults to ``utils.get_client()``).
+    history : LatencyHistory, optional
+        Latency history used for ordering and ETAs and updated with this run
+        (defaults to ``latency.get_history()``).
+    progress_callback : callable, optional
+        Called as ``progress_callback(done, total, eta_seconds)`` after each
+        prompt finishes.
+    save_responses : bool, optional
+        Whether raw chat responses are saved to ``out_dir/<project_id>`` for
+        later re-rendering with ``src.reprocess``, even without persist.
+    template : str or DeckTemplate, optional
+        Template deck every deck starts from (defaults to a blank presentation).
+    layout_overrides : dict, optional
+        Plotly layout overrides for locally rendered charts; with render="auto"
+        an empty dict lets charts use the server rendered PNGs.
+
+    Returns:
+    --------
+    dict
+        Per project summary with the ``deck`` path (or None), written
+        ``artifacts`` and ``errors``.
+    """
+    client = utils.get_client(client)
+    history = latency.get_history(history)
+    template = utils.get_template(template) if export else None
+    results = {}
+    remaining = {}
+    stores = {}
+
+    for project_id, prompts in project_prompts.items():
+        # Saved responses are written to the project folder even without persist
+        os.makedirs(
+            (
+                os.path.join(out_dir, project_id)
+                if persist or save_responses
+                else out_dir
+            ),
+            exist_ok=True,
+        )
+        stores[project_id] = ArtifactStore(persist=persist)
+        results[project_id] = {"deck": None, "artifacts": [], "errors": []}
+        remaining[project_id] = len(prompts)
+
+    tasks = [
+        (project_id, i, content)
+        for project_id, prompts in project_prompts.items()
+        for i, content in enumerate(prompts)
+    ]
+    estimates = {task: history.estimate(task[2]) for task in tasks}
+    ordered = latency.longest_first(tasks, [estimates[task] for task in tasks])
+    started = {}
+    done = set()
+
+    def eta():
+        now = time.time()
+        queued = [estimates[task] for task in ordered if task not in started]
+        running = [
+            estimates[task] - (now - started_at)
+            for task, started_at in list(started.items())
+            if task not in done
+        ]
+        return latency.estimate_makespan(queued, max_workers, running)
+
+    print(f"Running {len(tasks)} prompts, estimated time {latency.format_eta(eta())}")
+
+    export_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS)
+    exports = {}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for task in ordered:
+                project_id, i, content = task
+                future = executor.submit(
+                    _timed_prompt,
+                    history,
+                    started,
+                    task,
+                    project_id,
+                    content,
+                    os.path.join(out_dir, project_id),
+                    file_prefix=f"{i + 1:03d}_",
+                    render=render,
+                    layout_overrides=layout_overrides,
+                    store=stores[project_id],
+                    client=client,
+                    save_response=save_responses,
+                )
+                futures[future] = task
+
+            for future in as_completed(futures):
+                task = futures[future]
+                project_id, i, _ = task
+                done.add(task)
+                try:
+                    results[project_id]["artifacts"].extend(future.result())
+                except Exception as e:
+                    results[project_id]["errors"].append(f"Prompt {i + 1}: {e}")
+                    print(f"Project {project_id} prompt {i + 1} failed: {e}")
+
+                remaining_seconds = eta()
+                print(
+                    f"{len(done)} of {len(tasks)} prompts finished, ETA {latency.format_eta(remaining_seconds)}"
+                )
+                if progress_callback:
+                    progress_callback(len(done), len(tasks), remaining_seconds)
+
+                remaining[project_id] -= 1
+                if remaining[project_id] == 0:
+                    print(f"All prompts finished for project {project_id}")
+                    if export and results[project_id]["artifacts"]:
+                        export_future = export_executor.submit(
+                            export_deck,
+                            stores.pop(project_id),
+                            os.path.join(out_dir, f"{project_id}.pptx"),
+                            template=template,
+                        )
+                        exports[export_future] = project_id
+
+            for future in as_completed(exports):
+                project_id = exports[future]
+                try:
+                    results[project_id]["deck"] = future.result()
+                except Exception as e:
+                    results[project_id]["errors"].append(f"Deck export: {e}")
+                    print(f"Exporting the deck of project {project_id} failed: {e}")
+    finally:
+        export_executor.shutdown()
+        history.save()
+
+    return results
+
+
+def export_deck(artifacts_folder, pptx_filepath, template=None):
+    """
+    Exports the artifacts in artifacts_folder (a folder or an ArtifactStore) to a
+    deck started from template and returns its path
+    """
+    obj = utils.PPTXExporter(artifacts_folder, template=template)
+    obj.create()
+    obj.save(pptx_filepath)
+    return pptx_filepath
+
+
+def export_decks(decks, template=None, max_workers=EXPORT_WORKERS):
+    """
+    Exports many decks at once from one template, parsed a single time
+
+    Parameters:
+    -----------
+    decks : dict
+        Artifact folders (or ArtifactStores) keyed by the deck path to write.
+    template : str or DeckTemplate, optional
+        Template deck every deck starts from (defaults to a blank presentation).
+    max_workers : int, optional
+        Maximum number of decks built at the same time.
+
+    Returns:
+    --------
+    dict
+        Error message, or None for decks that were written, keyed by deck path.
+    """
+    template = utils.get_template(template)
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                export_deck, artifacts_folder, pptx_filepath, template=template
+            ): pptx_filepath
+            for pptx_filepath, artifacts_folder in decks.items()
+        }
+        for future in as_completed(futures):
+            pptx_filepath = futures[future]
+            try:
+                future.result()
+                errors[pptx_filepath] = None
+            except Exception as e:
+                errors[pptx_filepath] = str(e)
+                print(f"Exporting {pptx_filepath} failed: {e}")
+
+    return errors
+
+
+def summarize(results):
+    """Returns the report results as a DataFrame with one row per project"""
+    return pd.DataFrame(
+        [
+            {
+                "project_id": project_id,
+                "artifacts": len(result["artifacts"]),
+                "errors": len(result["errors"]),
+                "deck": result["deck"],
+            }
+            for project_id, result in results.items()
+        ]
+    )
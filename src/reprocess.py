@@ -0,0 +1,234 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src import utils
+
+# Suffixes of saved chat responses (the sandbox archive stores JSON as .txt)
+RESPONSE_SUFFIXES = (".json", ".txt")
+
+# Suffix run_chat_prompt adds to saved responses, dropped from artifact names
+RESPONSE_TAG = "_response"
+
+# Records which responses were rendered with which settings
+MANIFEST_NAME = ".reprocess.json"
+
+
+def find_responses(in_dir, exclude=None):
+    """
+    Saved chat responses below in_dir, in sorted order
+
+    The exclude folder (usually the output folder) and text artifacts are
+    skipped, so rendering into a folder inside in_dir is safe.
+
+    Returns:
+        list: paths relative to in_dir
+    """
+    exclude = os.path.abspath(exclude) if exclude else None
+    found = []
+    for root, dirs, files in os.walk(in_dir):
+        dirs[:] = sorted(
+            name
+            for name in dirs
+            if os.path.abspath(os.path.join(root, name)) != exclude
+        )
+        for name in sorted(files):
+            if name.startswith(".") or name.endswith("_text.txt"):
+                continue
+            if name.lower().endswith(RESPONSE_SUFFIXES):
+                found.append(os.path.relpath(os.path.join(root, name), in_dir))
+    return found
+
+
+def artifact_base(relative_path):
+    """
+    Artifact path (without type suffix) for a response, unique per input file
+
+    The response's folder structure is kept and the saved-response tag is
+    dropped, so re-rendered artifacts keep the names (and slide order) of the
+    original run.
+    """
+    base = os.path.splitext(relative_path)[0]
+    if base.endswith(RESPONSE_TAG):
+        base = base[: -len(RESPONSE_TAG)]
+    return base
+
+
+def deck_paths(out_dir, artifacts, deck):
+    """
+    Deck to write for every folder of out_dir holding artifacts
+
+    Responses keep their folder structure (e.g. one folder per project of a
+    report run), so each folder gets its own deck. A single folder is exported
+    to deck; otherwise the folder's path is appended to deck's name, e.g.
+    ``restyled_<project_id>.pptx``.
+
+    Returns:
+        dict: artifact folders keyed by the deck path to write
+    """
+    folders = sorted({os.path.dirname(path) for path in artifacts})
+    if len(folders) == 1:
+        return {deck: folders[0]}
+
+    stem, ext = os.path.splitext(deck)
+    decks = {}
+    for folder in folders:
+        relative = os.path.relpath(folder, out_dir)
+        name = stem if relative == "." else f"{stem}_{relative.replace(os.sep, '_')}"
+        decks[f"{name}{ext or '.pptx'}"] = folder
+    return decks
+
+
+def settings_key(layout_overrides, table_format, write_csv):
+    """Hash of the rendering settings; a change makes every artifact stale"""
+    settings = json.dumps(
+        [layout_overrides, table_format, write_csv], sort_keys=True, default=str
+    )
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+
+def _source_key(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _render_response(
+    source, output_file_path, layout_overrides, table_format, write_csv
+):
+    """Process pool worker: render one saved response to its artifacts"""
+    with open(source, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+
+    return utils.process_chat_output(
+        data,
+        output_file_path,
+        layout_overrides,
+        table_format=table_format,
+        write_csv=write_csv,
+    )
+
+
+def reprocess(
+    in_dir,
+    out_dir,
+    max_workers=None,
+    layout_overrides=utils.LAYOUT_OVERRIDES,
+    table_format=utils.TABLE_FORMAT,
+    write_csv=False,
+    force=False,
+):
+    """
+    Re-render a folder of saved chat responses with a process pool.
+
+    The artifacts of each response are written under ``out_dir`` named after
+    its input file. Responses already rendered from the same file with the
+    same settings are skipped unless ``force`` is set; a manifest in
+    ``out_dir`` records what was rendered.
+
+    Parameters:
+    -----------
+    in_dir : str
+        Folder with saved chat responses (searched recursively).
+    out_dir : str
+        Folder to write artifacts to.
+    max_workers : int, optional
+        Number of worker processes (defaults to the CPU count).
+    layout_overrides : dict, optional
+        Plotly layout applied to locally rendered charts.
+    table_format : str, optional
+        Storage format for tables (see ``utils.TABLE_FORMAT``).
+    write_csv : bool, optional
+        Whether tables also get a CSV copy.
+    force : bool, optional
+        Re-render responses that are up to date.
+
+    Returns:
+    --------
+    dict
+        ``processed`` and ``skipped`` artifact paths and ``errors`` messages.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    settings = settings_key(layout_overrides, table_format, write_csv)
+    manifest = _load_manifest(out_dir)
+    results = {"processed": [], "skipped": [], "errors": []}
+
+    pending = []
+    for relative_path in find_responses(in_dir, exclude=out_dir):
+        entry = manifest.get(relative_path)
+        source = os.path.join(in_dir, relative_path)
+        if (
+            not force
+            and entry
+            and entry["source"] == _source_key(source)
+            and entry["settings"] == settings
+            and all(os.path.exists(path) for path in entry.get("artifacts", [None]))
+        ):
+            results["skipped"].extend(entry["artifacts"])
+            continue
+        pending.append(relative_path)
+
+    print(
+        f"Reprocessing {len(pending)} responses ({len(results['skipped'])} up to date)"
+    )
+
+    if not pending:
+        return results
+
+    try:
+        # Spawned workers start their own Kaleido instead of inheriting the
+        # parent's render threads and renderer through fork
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _render_response,
+                    os.path.join(in_dir, relative_path),
+                    os.path.join(out_dir, artifact_base(relative_path)),
+                    layout_overrides,
+                    table_format,
+                    write_csv,
+                ): relative_path
+                for relative_path in pending
+            }
+
+            for future in as_completed(futures):
+                relative_path = futures[future]
+                try:
+                    artifacts = future.result()
+                except Exception as e:
+                    results["errors"].append(f"{relative_path}: {e}")
+                    print(f"Failed to reprocess {relative_path}: {e}")
+                    continue
+
+                manifest[relative_path] = {
+                    "source": _source_key(os.path.join(in_dir, relative_path)),
+                    "settings": settings,
+                    "artifacts": artifacts,
+                }
+                results["processed"].extend(artifacts)
+    finally:
+        _save_manifest(out_dir, manifest)
+
+    return results
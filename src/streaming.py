@@ -0,0 +1,293 @@
+import codecs
+import json
+
+from src._lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Bytes requested from the response per read
+READ_CHUNK_SIZE = 64 * 1024
+
+# Rows buffered per Parquet row group when spilling to disk
+SPILL_CHUNK_ROWS = 50_000
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonArrayStream:
+    """
+    Incrementally parses the array stored under one key of a JSON object.
+
+    Items of the array are yielded one at a time as the bytes arrive, so the
+    full response never has to exist as a Python object tree. All other
+    top-level members are collected into ``extras`` while iterating. A
+    top-level JSON array is streamed as-is.
+
+    Attributes:
+    -----------
+    key : str
+        Name of the top-level member holding the array to stream.
+    extras : dict
+        Other top-level members, complete once iteration has finished.
+    found : bool
+        Whether the key was present in the response.
+    """
+
+    def __init__(self, chunks, key="predictions"):
+        """
+        Parameters:
+        -----------
+        chunks : iterable of bytes
+            Raw response body, e.g. ``response.iter_content(READ_CHUNK_SIZE)``.
+        key : str, optional
+            Name of the top-level member holding the array to stream.
+        """
+        self.key = key
+        self.extras = {}
+        self.found = False
+
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read more input, at least doubling the unread part of the buffer."""
+        if self._eof:
+            return False
+
+        # Drop the consumed prefix so the buffer stays proportional to one value
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+
+        target = max(len(self._buffer), 1) * 2
+        parts = [self._buffer]
+        size = len(self._buffer)
+
+        while size < target:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._decoder.decode(b"", final=True))
+                self._eof = True
+                break
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+
+        self._buffer = "".join(parts)
+        return True
+
+    def _peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON response")
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} in JSON response, found {char!r}"
+            )
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next complete JSON value from the buffer."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # A number at the very end of the buffer may still be incomplete
+            if end == len(self._buffer) and not self._eof:
+                self._fill()
+                continue
+
+            self._pos = end
+            return value
+
+    def _array_items(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def __iter__(self):
+        if self._peek() == "[":
+            self.found = True
+            yield from self._array_items()
+            return
+
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            name = self._value()
+            self._expect(":")
+
+            if name == self.key and self._peek() == "[":
+                self.found = True
+                yield from self._array_items()
+            else:
+                self.extras[name] = self._value()
+
+            if self._expect(",}") == "}":
+                return
+
+
+class ColumnBuilder:
+    """
+    Builds column lists from row dictionaries.
+
+    Rows are appended straight into per-column lists so no intermediate list of
+    row dictionaries is kept. Columns that appear late are back-filled with
+    None, and missing values in a row are filled with None.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.rows = 0
+
+    def append(self, record):
+        for name, value in record.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = [None] * self.rows
+            column.append(value)
+
+        self.rows += 1
+
+        # Pad columns this row did not have
+        if len(record) != len(self.columns):
+            for column in self.columns.values():
+                if len(column) < self.rows:
+                    column.append(None)
+
+    def to_frame(self):
+        return pd.DataFrame(self.columns)
+
+    def clear(self):
+        self.columns = {name: [] for name in self.columns}
+        self.rows = 0
+
+
+class ParquetSpiller:
+    """Writes column chunks to a Parquet file, one row group per chunk."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Spilling predictions to Parquet requires pyarrow (pip install pyarrow)."
+            ) from e
+
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, columns):
+        table = self._pa.table(columns)
+
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            schema = self._writer.schema
+            unknown = set(table.column_names) - set(schema.names)
+            if unknown:
+                raise ValueError(
+                    f"Column(s) {', '.join(sorted(unknown))} first appeared after the first spilled chunk."
+                )
+            # Align the chunk with the file schema, filling columns it lacks
+            table = self._pa.table(
+                {
+                    field.name: (
+                        table[field.name]
+                        if field.name in table.column_names
+                        else self._pa.nulls(table.num_rows, field.type)
+                    )
+                    for field in schema
+                }
+            ).cast(schema)
+
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def read_records_frame(
+    response, key="predictions", spill_path=None, chunk_rows=SPILL_CHUNK_ROWS
+):
+    """
+    Parse the records array of a streamed response into a DataFrame.
+
+    Parameters:
+    -----------
+    response : requests.Response
+        Response opened with ``stream=True``.
+    key : str, optional
+        Top-level member holding the records array.
+    spill_path : str, optional
+        When set, records are written to this Parquet file in row groups of
+        ``chunk_rows`` and the path is returned instead of a DataFrame.
+    chunk_rows : int, optional
+        Rows per Parquet row group when spilling.
+
+    Returns:
+    --------
+    tuple
+        ``(DataFrame or spill path, extras)`` where extras holds the other
+        top-level members of the response. When the key is missing, e.g. in an
+        error response, the first item is None and extras holds the whole
+        response.
+    """
+    stream = JsonArrayStream(response.iter_content(READ_CHUNK_SIZE), key=key)
+    builder = ColumnBuilder()
+    spiller = ParquetSpiller(spill_path) if spill_path else None
+
+    try:
+        for record in stream:
+            builder.append(record)
+            if spiller is not None and builder.rows >= chunk_rows:
+                spiller.write(builder.columns)
+                builder.clear()
+
+        if not stream.found:
+            return None, stream.extras
+
+        if spiller is None:
+            return builder.to_frame(), stream.extras
+
+        if builder.rows or spiller.rows == 0:
+            spiller.write(builder.columns)
+    finally:
+        if spiller is not None:
+            spiller.close()
+        response.close()
+
+    return spill_path, stream.extras
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+# Local cache of transformed rows, keyed by (transform project id, input row hash)
+TRANSFORM_CACHE = os.path.join(
+    os.path.expanduser("~"), ".akkio-ce", "transform_cache.sqlite"
+)
+
+# Eviction limits: entries older than MAX_AGE seconds are dropped, and the least
+# recently used entries beyond MAX_ROWS are dropped after every write
+TRANSFORM_CACHE_MAX_AGE = 30 * 24 * 3600
+TRANSFORM_CACHE_MAX_ROWS = 1_000_000
+
+# Rows looked up and transformed per step; outputs are handed to the caller
+# window by window instead of being held for the whole input
+TRANSFORM_CACHE_WINDOW = 50_000
+
+# SQLite limits the number of host parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def hash_record(record):
+    """Stable hash of one input row (column order does not matter)"""
+    text = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TransformCache:
+    """
+    SQLite-backed cache of transform outputs per input row.
+
+    Deployed transforms are assumed to map each input row to exactly one output
+    row; callers verify this before storing results, and projects whose
+    transform turns out not to are remembered and bypass the cache.
+
+    Attributes:
+    -----------
+    path : str
+        SQLite database file, created on first use.
+    max_age : float
+        Seconds after which a cached row is no longer used.
+    max_rows : int
+        Maximum number of cached rows kept across all projects.
+    """
+
+    def __init__(
+        self,
+        path=TRANSFORM_CACHE,
+        max_age=TRANSFORM_CACHE_MAX_AGE,
+        max_rows=TRANSFORM_CACHE_MAX_ROWS,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_rows = max_rows
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rows ("
+                "project_id TEXT NOT NULL, row_hash TEXT NOT NULL, output TEXT NOT NULL, "
+                "created_at REAL NOT NULL, used_at REAL NOT NULL, "
+                "PRIMARY KEY (project_id, row_hash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS rows_used_at ON rows (used_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS not_row_wise ("
+                "project_id TEXT PRIMARY KEY, created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_many(self, project_id, row_hashes):
+        """
+        Look up cached outputs
+
+        Returns:
+            dict: row hash -> output record for the hashes that are cached
+        """
+        now = time.time()
+        unique = list(dict.fromkeys(row_hashes))
+        found = {}
+
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[start : start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                cursor = conn.execute(
+                    f"SELECT row_hash, output FROM rows WHERE project_id = ? "
+                    f"AND created_at >= ? AND row_hash IN ({placeholders})",
+                    [project_id, now - self.max_age, *batch],
+                )
+                for row_hash, output in cursor:
+                    found[row_hash] = json.loads(output)
+
+            if found:
+                conn.executemany(
+                    "UPDATE rows SET used_at = ? WHERE project_id = ? AND row_hash = ?",
+                    [(now, project_id, row_hash) for row_hash in found],
+                )
+                conn.commit()
+
+        return found
+
+    def put_many(self, project_id, row_hashes, outputs):
+        """Store outputs for row_hashes and apply the eviction limits"""
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?)",
+                [
+                    (project_id, row_hash, json.dumps(output, default=str), now, now)
+                    for row_hash, output in zip(row_hashes, outputs)
+                ],
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def row_wise(self, project_id):
+        """Whether project_id's outputs can be cached per row, as far as is known"""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT created_at FROM not_row_wise WHERE project_id = ?",
+                    (project_id,),
+                )
+                .fetchone()
+            )
+        return row is None or row[0] < time.time() - self.max_age
+
+    def mark_not_row_wise(self, project_id):
+        """Remember that project_id does not map rows one to one and drop its rows"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO not_row_wise VALUES (?, ?)",
+                (project_id, time.time()),
+            )
+            conn.execute("DELETE FROM rows WHERE project_id = ?", (project_id,))
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM rows WHERE created_at < ?", (now - self.max_age,))
+
+        (count,) = conn.execute("SELECT COUNT(*) FROM rows").fetchone()
+        if count > self.max_rows:
+            conn.execute(
+                "DELETE FROM rows WHERE rowid IN "
+                "(SELECT rowid FROM rows ORDER BY used_at LIMIT ?)",
+                (count - self.max_rows,),
+            )
+
+    def clear(self, project_id=None):
+        """Drop cached rows of one project, or of all projects"""
+        with self._lock:
+            conn = self._connect()
+            if project_id is None:
+                conn.execute("DELETE FROM rows")
+                conn.execute("DELETE FROM not_row_wise")
+            else:
+                conn.execute("DELETE FROM rows WHERE project_id = ?", (project_id,))
+                conn.execute(
+                    "DELETE FROM not_row_wise WHERE project_id = ?", (project_id,)
+                )
+            conn.commit()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache(cache=None):
+    """Return cache, or the shared cache stored at TRANSFORM_CACHE"""
+    global _default_cache
+    if cache is not None:
+        return cache
+
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != TRANSFORM_CACHE:
+            _default_cache = TransformCache(TRANSFORM_CACHE)
+        return _default_cache
+
+
+def iter_cached_transform(
+    project_id, records, fetch, cache, window=TRANSFORM_CACHE_WINDOW
+):
+    """
+    Transform records, sending only rows missing from the cache
+
+    fetch(records) must return the transformed records for the rows it is given.
+    Records are looked up and fetched one window of rows at a time, and the
+    cached and fresh outputs are yielded in input order, so callers can stream
+    them into columns without holding every output.
+
+    A transform that does not return one output per input row cannot be cached
+    per row. The project is then remembered as not row-wise, so later calls
+    skip the cache. The rows of the window that were not sent yet are sent once
+    (their outputs follow the fresh ones) and the remaining windows are
+    transformed without the cache. No row is sent twice.
+
+    Yields:
+        dict: transformed records
+    """
+    if not cache.row_wise(project_id):
+        print(f"Transform for project {project_id} is not row-wise; skipping cache.")
+        for start in range(0, len(records), window):
+            yield from fetch(records[start : start + window])
+        return
+
+    cached_rows = 0
+
+    for start in range(0, len(records), window):
+        chunk = records[start : start + window]
+        row_hashes = [hash_record(record) for record in chunk]
+        outputs = cache.get_many(project_id, row_hashes)
+
+        # Send each distinct missing row once
+        missing = {}
+        for i, (row_hash, record) in enumerate(zip(row_hashes, chunk)):
+            if row_hash not in outputs and row_hash not in missing:
+                missing[row_hash] = i
+        cached_rows += len(chunk) - len(missing)
+
+        if not missing:
+            yield from (outputs[row_hash] for row_hash in row_hashes)
+            continue
+
+        fresh = fetch([chunk[i] for i in missing.values()])
+
+        if len(fresh) == len(missing):
+            cache.put_many(project_id, list(missing), fresh)
+            outputs.update(zip(missing, fresh))
+            yield from (outputs[row_hash] for row_hash in row_hashes)
+            continue
+
+        warnings.warn(
+            f"Transform for project {project_id} is not row-wise ({len(missing)} rows in, {len(fresh)} out); not caching it."
+        )
+        cache.mark_not_row_wise(project_id)
+
+        sent = set(missing.values())
+        rest = [record for i, record in enumerate(chunk) if i not in sent]
+        yield from fresh
+        if rest:
+            yield from fetch(rest)
+
+        for rest_start in range(start + window, len(records), window):
+            yield from fetch(records[rest_start : rest_start + window])
+        return
+
+    print(
+        f"Transform cache for project {project_id}: {cached_rows} of {len(records)} rows cached."
+    )
+
+
+def cached_transform(project_id, records, fetch, cache):
+    """
+    Transform records through the cache (see iter_cached_transform)
+
+    Returns:
+        list: transformed records in input order
+    """
+    return list(iter_cached_transform(project_id, records, fetch, cache))
@@ -1,146 +1,487 @@
+import base64
+import copy
+import io
 import json
 import os
+import threading
 import time
-
-import akkio
-import pandas as pd
-import plotly.io as pio
-import requests
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from sklearn.model_selection import train_test_split
+from concurrent.futures import ThreadPoolExecutor
+
+from src import profiling
+from src._lazy import lazy_import
+from src import datasets, transform_cache
+from src.client import AkkioClient
+from src.hedging import HedgePolicy
+from src.streaming import (
+    READ_CHUNK_SIZE,
+    ColumnBuilder,
+    JsonArrayStream,
+    read_records_frame,
+)
+
+# Heavy dependencies are imported on first use, so e.g. exporting a deck does
+# not pay for plotly and the chat wrappers do not pay for python-pptx
+pd = lazy_import("pandas")
+pio = lazy_import("plotly.io")
+pptx = lazy_import("pptx")
+pptx_util = lazy_import("pptx.util")
 
 API_KEY = None
 BASE_URL = "api.akkio.com/api"
 URL = "api.akkio.com"
+SDK_URL = "api.akk.io"  # Host the akkio SDK listed and created datasets on
 VERSION = "v1"
 PROTOCOL = "https"
 ENDPOINT = "chat-explore"
 PORT = "443"
 
+# Settings of the default client used when no client is passed to a wrapper.
+# Request body compression: "gzip", "deflate" or None to send plain JSON.
+# Bodies smaller than COMPRESSION_MIN_BYTES are always sent uncompressed.
+COMPRESSION = None
+COMPRESSION_MIN_BYTES = 64 * 1024
+COMPRESSION_LEVEL = 6
+
+# Duplicate task status and result requests that run slower than usual
+# (see src.hedging) to trim the latency tail of stalled connections
+HEDGING = False
+
+# Rows sent per transform call when piping a transform into a new dataset
+TRANSFORM_CHUNK_ROWS = 5000
+
+# Image formats accepted by the chats endpoint
+BASE64_PNG = "base64_png"
+PLOTLY_JSON = "plotly_json"
+
+# Chart rendering strategies:
+# - "local": request plotly_json and rasterize with Kaleido, applying layout overrides
+# - "server": request base64_png rendered by Akkio and decode it straight to disk
+# - "auto": server rendering, falling back to local when layout overrides are set.
+#   The default overrides slant the labels, so pass layout_overrides={} (--layout
+#   '{}' on the CLI, or untick "Slant x-axis labels" in the app) to use server PNGs
+RENDER_STRATEGIES = ("local", "server", "auto")
+LAYOUT_OVERRIDES = {"xaxis": {"tickangle": -45}}  # Slant the labels by 45 degrees
+
+# Storage format for chat table artifacts: "parquet", "feather" or "csv".
+# Typed formats keep column dtypes; CSV can still be written as a side output.
+TABLE_FORMAT = "parquet"
+TABLE_WRITERS = {
+    "parquet": lambda df, path: df.to_parquet(path, index=False),
+    "feather": lambda df, path: df.to_feather(path),
+    "csv": lambda df, path: df.to_csv(path, index=False),
+}
+TABLE_READERS = {
+    ".parquet": lambda path: pd.read_parquet(path),
+    ".feather": lambda path: pd.read_feather(path),
+    ".csv": lambda path: pd.read_csv(path),
+}
+
+# Image files the exporter turns into picture slides
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff")
+
+# Number of base64 characters decoded per write (must be a multiple of 4)
+BASE64_CHUNK_SIZE = 64 * 1024
+
+# Threads rendering the blocks of one chat response concurrently
+RENDER_WORKERS = 4
+
+# Slide layout artifacts are placed on; templates without a layout of this name
+# use their layout with the fewest placeholders
+BLANK_LAYOUT_NAME = "Blank"
+
+
+_default_client = None
+_default_client_key = None
+_default_client_lock = threading.Lock()
+
+
+def get_client(client=None):
+    """
+    Return client, or the default client built from the module settings
+
+    The default client is rebuilt whenever API_KEY or the other module settings
+    change, so code that assigns utils.API_KEY keeps working.
+
+    Returns:
+        AkkioClient
+    """
+    global _default_client, _default_client_key
+
+    if client is not None:
+        return client
+
+    key = (
+        API_KEY,
+        PROTOCOL,
+        BASE_URL,
+        URL,
+        SDK_URL,
+        PORT,
+        VERSION,
+        COMPRESSION,
+        COMPRESSION_MIN_BYTES,
+        COMPRESSION_LEVEL,
+        HEDGING,
+    )
+    with _default_client_lock:
+        if _default_client is None or _default_client_key != key:
+            _default_client = AkkioClient(
+                API_KEY,
+                protocol=PROTOCOL,
+                base_url=BASE_URL,
+                url=URL,
+                sdk_url=SDK_URL,
+                port=PORT,
+                version=VERSION,
+                compression=COMPRESSION,
+                compression_min_bytes=COMPRESSION_MIN_BYTES,
+                compression_level=COMPRESSION_LEVEL,
+                hedging=HedgePolicy() if HEDGING else None,
+            )
+            _default_client_key = key
+        return _default_client
+
 
 # Chat Wrappers
-def create_chat_request(project_id, content):
+def create_chat_request(project_id, content, client=None):
     """
     Make API request for chat creation
 
     Returns:
         dict: json response
     """
+    return get_client(client).create_chat_request(project_id, content)
 
-    MODE = "new"
 
-    url = f"{PROTOCOL}://{BASE_URL}/{VERSION}/{ENDPOINT}/{MODE}"
-    headers = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
-    data = {
-        "project_id": project_id,
-        "messages": [{"role": "user", "content": content, "images": []}],
-    }
+def check_task_status(task_id, client=None):
+    """
+    Check task status from Chat creation POST call
 
-    response = requests.post(
-        url,
-        json=data,
-        headers=headers,
-        timeout=120,
-    )
+    Returns:
+        dict: json response
+    """
+    return get_client(client).check_task_status(task_id)
 
-    # Check for HTTP errors
-    response.raise_for_status()
 
-    return response.json()
+def get_chat_results(chat_id, format_type="plotly_json", client=None):
+    """
+    Get chat results based on chat_id
+
+    Returns:
+        dict: json response
+    """
+    return get_client(client).get_chat_results(chat_id, format_type)
 
 
-def check_task_status(task_id):
+def resolve_render_strategy(render="local", layout_overrides=None):
     """
-    Check task status from Chat creation POST call
+    Resolve a rendering strategy to "local" or "server"
 
     Returns:
-        dict: json response
+        str: "local" or "server"
     """
+    if render not in RENDER_STRATEGIES:
+        raise ValueError(
+            f"Unsupported render strategy '{render}'. Supported strategies are: {', '.join(RENDER_STRATEGIES)}."
+        )
 
-    MODE = "status"
+    if render == "auto":
+        # Layout tweaks can only be applied to the plotly figure
+        return "local" if layout_overrides else "server"
 
-    url = f"{PROTOCOL}://{BASE_URL}/{VERSION}/{ENDPOINT}/{MODE}/{task_id}"
-    headers = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
+    return render
 
-    response = requests.get(
-        url,
-        headers=headers,
-        timeout=120,
-    )
 
-    # Check for HTTP errors
-    response.raise_for_status()
+def image_format_for(render="local", layout_overrides=None):
+    """Image format to request from get_chat_results for a rendering strategy"""
+    if resolve_render_strategy(render, layout_overrides) == "server":
+        return BASE64_PNG
+    return PLOTLY_JSON
 
-    return response.json()
 
+def _strip_base64(encoded):
+    # Strip an optional data URI prefix, e.g. "data:image/png;base64,"
+    if encoded.startswith("data:"):
+        encoded = encoded.split(",", 1)[1]
 
-def get_chat_results(chat_id, format_type="plotly_json"):
+    # Chunked decoding needs 4-character alignment, so drop any line breaks
+    if "\n" in encoded or "\r" in encoded:
+        encoded = "".join(encoded.split())
+
+    return encoded
+
+
+def write_base64_image(encoded, output_file_path, chunk_size=BASE64_CHUNK_SIZE):
     """
-    Get chat results based on chat_id
+    Decode a base64 image to disk in chunks so the full decoded image is never
+    held in memory next to the encoded string
+    """
+    encoded = _strip_base64(encoded)
 
-    Returns:
-        dict: json response
+    with open(output_file_path, "wb") as file:
+        for start in range(0, len(encoded), chunk_size):
+            file.write(base64.b64decode(encoded[start : start + chunk_size]))
+
+
+def _is_plotly_json(image):
+    return isinstance(image, dict) or image.lstrip().startswith("{")
+
+
+def write_table(df, output_file_path, table_format=TABLE_FORMAT, write_csv=False):
     """
+    Write a table artifact in table_format, falling back to CSV when the typed
+    format is unavailable (e.g. pyarrow is not installed) or cannot hold the data
 
-    # BASE64_PNG = "base64_png"
-    # PLOTLY_JSON = "plotly_json"
+    Returns:
+        str: path of the table artifact
+    """
+    if table_format not in TABLE_WRITERS:
+        raise ValueError(
+            f"Unsupported table format '{table_format}'. Supported formats are: {', '.join(TABLE_WRITERS)}."
+        )
 
-    MODE = "chats"
+    if table_format != "csv":
+        table_path = f"{output_file_path}_table.{table_format}"
+        try:
+            TABLE_WRITERS[table_format](df, table_path)
+        except (ImportError, TypeError, ValueError) as e:
+            print(f"Could not write {table_format} table ({e}), writing CSV instead.")
+            if os.path.exists(table_path):
+                os.remove(table_path)
+        else:
+            if write_csv:
+                df.to_csv(f"{output_file_path}_table.csv", index=False)
+            return table_path
+
+    table_path = f"{output_file_path}_table.csv"
+    df.to_csv(table_path, index=False)
+    return table_path
+
+
+def chat_blocks(data):
+    """
+    Split a chat response into the blocks that become artifacts
 
-    url = f"{PROTOCOL}://{BASE_URL}/{VERSION}/{ENDPOINT}/{MODE}/{chat_id}"
-    headers = {"X-API-Key": API_KEY, "Content-Type": "application/json"}
-    query_params = {"image_format": format_type}
+    Every message after the first (which holds the interpretation of the
+    generated code) is a result message. Each of its images and its table is
+    a block; its text becomes a block only when it has neither, because the
+    text of chart and table messages is a placeholder.
 
-    response = requests.get(
-        url,
-        headers=headers,
-        params=query_params,
-        timeout=120,
-    )
+    Returns:
+        list: (kind, payload) tuples in response order, kind being "image",
+        "table" or "text"
+    """
+    blocks = []
+    for message in data["messages"][1:]:
+        images = message.get("images") or []
+        table = message.get("table")
 
-    # Check for HTTP errors
-    response.raise_for_status()
-    return response.json()
+        blocks.extend(("image", image) for image in images)
+        if table:
+            blocks.append(("table", table))
+        if not images and not table and (message.get("content") or not blocks):
+            blocks.append(("text", message.get("content") or ""))
 
+    return blocks
 
-def process_chat_output(data, output_file_path="ce"):
 
-    raw_message = data["messages"][1]
+def _write_block(
+    kind, payload, output_file_path, layout_overrides, table_format, write_csv, store
+):
+    """Save one chat block as an artifact and return its path"""
 
     # Check if 'images' exist in raw_message
-    if "images" in raw_message and raw_message["images"]:
-        # Deserialize the first image's JSON data
-        fig = pio.from_json(raw_message["images"][0])
+    if kind == "image":
+        image = payload
 
-        # Define desired dimensions and scale
         output_file_path = output_file_path + "_image.png"
-        # fig.write_image(output_file_path, width=1920, height=1080, scale=1)
 
-        fig.update_layout(
-            xaxis=dict(
-                tickangle=-45  # Slant the labels by 45 degrees. You can change this value as needed.
-            )
-        )
+        with profiling.stage("render"):
+            if _is_plotly_json(image):
+                # Deserialize the first image's JSON data
+                if isinstance(image, dict):
+                    image = json.dumps(image)
+                fig = pio.from_json(image)
+
+                # fig.write_image(output_file_path, width=1920, height=1080, scale=1)
+
+                if layout_overrides:
+                    fig.update_layout(**layout_overrides)
 
-        fig.write_image(output_file_path, width=800, height=600, scale=2)
+                if store is not None:
+                    return store.add_image(
+                        output_file_path,
+                        fig.to_image(format="png", width=800, height=600, scale=2),
+                    )
+
+                fig.write_image(output_file_path, width=800, height=600, scale=2)
+            elif store is not None:
+                return store.add_image(
+                    output_file_path, base64.b64decode(_strip_base64(image))
+                )
+            else:
+                write_base64_image(image, output_file_path)
 
     # Check if 'table' exists in raw_message
-    elif "table" in raw_message and raw_message["table"]:
+    elif kind == "table":
         # Process table data here
 
-        df = pd.DataFrame(raw_message["table"])
+        with profiling.stage("table"):
+            df = pd.DataFrame(payload)
 
-        output_file_path = output_file_path + "_table.csv"
+            if store is not None:
+                return store.add_table(output_file_path, df)
 
-        df.to_csv(output_file_path, index=False)
+            output_file_path = write_table(
+                df, output_file_path, table_format, write_csv
+            )
 
     # Fallback to process text if no images or table
     else:
         # Process text data here
         output_file_path = output_file_path + "_text.txt"
+
+        if store is not None:
+            return store.add_text(output_file_path, payload)
+
         with open(output_file_path, "w", encoding="utf-8") as file:
-            file.write(raw_message["content"])
+            file.write(payload)
+
+    return output_file_path
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ThreadPoolExecutor(
+                max_workers=RENDER_WORKERS, thread_name_prefix="render"
+            )
+        return _render_pool
+
+
+def process_chat_output(
+    data,
+    output_file_path="ce",
+    layout_overrides=LAYOUT_OVERRIDES,
+    table_format=TABLE_FORMAT,
+    write_csv=False,
+    store=None,
+):
+    """
+    Save every image, table and text block of the chat output as an artifact
+
+    Images returned as plotly_json are rendered locally with layout_overrides
+    applied, while server-rendered base64_png images are decoded straight to disk.
+    Tables are stored in table_format, with an optional CSV copy when write_csv is set.
+    When an ArtifactStore is passed as store the artifacts are kept in memory
+    there instead (and only written to disk if the store persists).
+
+    A response with a single block keeps the usual ``<output_file_path>_image.png``
+    style name. With several blocks (see chat_blocks) they are rendered
+    concurrently and numbered ``<output_file_path>_b01_...``, ``_b02_...`` so the
+    artifacts sort in response order.
+
+    Returns:
+        list: paths of the artifacts that were written, in response order
+    """
+    blocks = chat_blocks(data)
+
+    if len(blocks) == 1:
+        kind, payload = blocks[0]
+        return [
+            _write_block(
+                kind,
+                payload,
+                output_file_path,
+                layout_overrides,
+                table_format,
+                write_csv,
+                store,
+            )
+        ]
+
+    pool = _get_render_pool()
+    futures = [
+        pool.submit(
+            _write_block,
+            kind,
+            payload,
+            f"{output_file_path}_b{n:02d}",
+            layout_overrides,
+            table_format,
+            write_csv,
+            store,
+        )
+        for n, (kind, payload) in enumerate(blocks, start=1)
+    ]
+
+    return [future.result() for future in futures]
+
+
+def run_chat_prompt(
+    project_id,
+    content,
+    resp_directory,
+    timeout=300,
+    poll_interval=5,
+    file_prefix="",
+    render="local",
+    layout_overrides=LAYOUT_OVERRIDES,
+    store=None,
+    client=None,
+    save_response=False,
+):
+    """
+    Submit a prompt to chat-explore, wait for it to finish and save the artifact
+
+    render selects where charts are rasterized (see RENDER_STRATEGIES) and store,
+    if given, keeps the artifact in memory (see process_chat_output). With
+    save_response the raw chat response is also written next to the artifact
+    as ``<name>_response.json`` so it can be re-rendered later (see
+    src.reprocess).
+
+    Returns:
+        list: paths of the artifacts written to resp_directory
+    """
+    client = get_client(client)
+    creation_resp = client.create_chat_request(project_id, content)
+
+    task_id = creation_resp["task_id"]
+    format_type = image_format_for(render, layout_overrides)
+    start_time = time.time()
+
+    # Loop until the task status is "SUCCEEDED"
+    while True:
+        status = client.check_task_status(task_id)
+        if status["status"] == "SUCCEEDED":
+            chat_id = status["metadata"]["location"].split("/chats/")[1]
+            chat_response = client.get_chat_results(chat_id, format_type)
+
+            # File path with project_id and task_id
+            file_name = f"{file_prefix}project_{project_id}_taskid_{task_id}"
+            file_path = os.path.join(resp_directory, file_name)
+
+            if save_response:
+                with open(f"{file_path}_response.json", "w", encoding="utf-8") as file:
+                    json.dump(chat_response, file)
+
+            return process_chat_output(
+                chat_response, file_path, layout_overrides, store=store
+            )
+
+        elif status["status"] == "FAILED":
+            raise RuntimeError("Task failed.")
+
+        elif time.time() - start_time > timeout:
+            raise RuntimeError("Task timed out.")
+
+        # Wait for some time before checking again to avoid overwhelming the server
+        time.sleep(poll_interval)
 
 
 # Import data from disk
@@ -173,6 +514,7 @@ def import_data(filepath):
     return df
 
 
+@profiling.profiled("df_to_dict")
 def df_to_dict(df):
     """
     Converts DataFrame to list of dictionaries
@@ -187,34 +529,47 @@ def df_to_dict(df):
     return dict_list
 
 
-def add_rows_to_dataset(dataset_id, input_data):
+def add_rows_to_dataset(dataset_id, input_data, client=None):
     """
-    Make API request to add rows to existing dataset
+    Make API requests to add rows to existing dataset
+
+    Rows are sent in batches sized by the client's batch sizer. Sending stops
+    at the first batch the API answers with an error.
 
     Returns:
-        dict: json response
+        dict: json response of the last batch sent
     """
-    start_time = time.time()
-    response = requests.post(
-        "{}://{}:{}/{}/datasets".format(PROTOCOL, URL, PORT, VERSION),
-        json={"api_key": API_KEY, "id": dataset_id, "rows": input_data},
-        timeout=120,
+    client = get_client(client)
+
+    responses = client.batch_sizer.run(
+        "upload",
+        input_data,
+        lambda rows: client.add_rows_to_dataset(dataset_id, rows),
+        retry_timeouts=False,
+        stop=upload_failed,
     )
-    end_time = time.time()
 
-    elapsed_time = end_time - start_time
+    return responses[-1]
 
-    print(
-        f"Request to add rows to dataset {dataset_id} with {len(input_data)} samples completed in {elapsed_time:.4f} seconds."
-    )
 
-    return response.json()
+def upload_failed(response):
+    """Whether an add_rows_to_dataset response reports an error"""
+    return isinstance(response, dict) and response.get("status") == "error"
+
+
+def _check_upload(response):
+    """Raise the error of a failed add_rows_to_dataset call"""
+    if upload_failed(response):
+        raise Exception(
+            f"Error from API: {response.get('message', 'No error message provided')}"
+        )
 
 
 def partition_data(
     filename, out_location=os.getcwd(), test_partition=0.1, shuffle=True
 ):
     """Partition data to generate a train / test split"""
+    from sklearn.model_selection import train_test_split
 
     fname = os.path.splitext(filename)[0]
     ext = os.path.splitext(filename)[1]
@@ -235,80 +590,108 @@ def partition_data(
     testing_data.to_csv(test_filename, index=False)
 
 
-def create_project(project_name, owner_id, org_id):
+def create_project(project_name, owner_id, org_id, client=None):
     """
     Make API request for create project
 
     Returns:
         dict: json response
     """
+    return get_client(client).create_project(project_name, owner_id, org_id)
 
-    url = f"{PROTOCOL}://{BASE_URL}/{VERSION}/projects"
-    headers = {"X-Api-Key": API_KEY, "Content-Type": "application/json"}
-    data = {
-        "name": project_name,
-        "_owner": owner_id,
-        "_org": org_id,
-    }
 
-    response = requests.post(
-        url,
-        json=data,
-        headers=headers,
-        timeout=120,
-    )
+def _merge_predictions(responses):
+    """
+    Single response with the predictions of every batch, in input order
+
+    A lone response is returned as is. When several batches were sent, every
+    one of them must hold predictions, since merging the others would silently
+    drop rows.
+    """
+    if len(responses) == 1:
+        return responses[0]
 
-    # Check for HTTP errors
-    response.raise_for_status()
+    missing = [i for i, r in enumerate(responses, start=1) if "predictions" not in r]
+    if missing:
+        raise Exception(
+            f"Error from API: no predictions for batch {', '.join(map(str, missing))} "
+            f"of {len(responses)}: "
+            f"{responses[missing[0] - 1].get('message', 'No error message provided')}"
+        )
 
-    return response.json()
+    resp_dict = responses[0]
+    resp_dict["predictions"] = [
+        prediction for r in responses for prediction in r["predictions"]
+    ]
+    return resp_dict
 
 
+@profiling.profiled("predict")
 def make_prediction(
     model_id,
     input_data,
     show_factors=False,
     save=False,
     save_file_path="",
+    as_frame=False,
+    spill_path=None,
+    client=None,
 ):
     """
     Make API request for inference on new data
 
+    Rows are sent in batches sized by the client's batch sizer and the
+    predictions are merged. With as_frame=True the predictions are parsed incrementally from the
+    response stream into a DataFrame (see transform_data for spill_path).
+
     Returns:
-        dict: json response
+        dict: json response, or the predictions DataFrame when as_frame is set
     """
-    start_time = time.time()
-    response = requests.post(
-        "{}://{}:{}/{}/models".format(PROTOCOL, URL, PORT, VERSION),
-        json={
-            "api_key": API_KEY,
-            "sample": True,
-            "id": model_id,
-            "data": input_data,
-            "show_factors": show_factors,
-        },
-        timeout=120,
-    )
-    end_time = time.time()
+    payload = {
+        "sample": True,
+        "id": model_id,
+        "data": input_data,
+        "show_factors": show_factors,
+    }
 
-    elapsed_time = end_time - start_time
+    if as_frame:
+        return _records_request(
+            get_client(client),
+            payload,
+            f"Request to make predictions {model_id}",
+            "predict",
+            save_file_path=(save_file_path or "predictions.csv") if save else "",
+            spill_path=spill_path,
+        )
 
-    print(
-        f"Request to make predictions {model_id} with {len(input_data)} samples completed in {elapsed_time:.4f} seconds."
-    )
+    client = get_client(client)
 
-    # Check for HTTP errors
-    response.raise_for_status()
+    def predict_batch(rows):
+        start_time = time.time()
+        response = client.post_models(dict(payload, data=rows))
+        end_time = time.time()
 
-    # Parse JSON response
-    resp_dict = response.json()
+        elapsed_time = end_time - start_time
 
-    # Check for application level errors
-    if resp_dict.get("status") == "error":
-        raise Exception(
-            f"Error from API: {resp_dict.get('message', 'No error message provided')}"
+        print(
+            f"Request to make predictions {model_id} with {len(rows)} samples completed in {elapsed_time:.4f} seconds."
         )
 
+        # Parse JSON response
+        resp_dict = response.json()
+
+        # Check for application level errors
+        if resp_dict.get("status") == "error":
+            raise Exception(
+                f"Error from API: {resp_dict.get('message', 'No error message provided')}"
+            )
+
+        return resp_dict
+
+    resp_dict = _merge_predictions(
+        client.batch_sizer.run("predict", input_data, predict_batch)
+    )
+
     if "predictions" in resp_dict.keys():
         df = pd.DataFrame(resp_dict["predictions"])
     else:
@@ -327,7 +710,7 @@ def make_prediction(
     return resp_dict
 
 
-def set_dataset_fields(dataset_id, fields):
+def set_dataset_fields(dataset_id, fields, client=None):
     """
     Make API request to set dataset fields
 
@@ -359,109 +742,496 @@ def set_dataset_fields(dataset_id, fields):
     #     ...
     # ]
 
-    start_time = time.time()
-    response = requests.post(
-        "{}://{}:{}/{}/datasets".format(PROTOCOL, URL, PORT, VERSION),
-        json={"api_key": API_KEY, "id": dataset_id, "fields": fields},
-        timeout=120,
+    return get_client(client).set_dataset_fields(dataset_id, fields)
+
+
+def set_inferred_fields(dataset_id, df, client=None):
+    """
+    Infer field types from df locally and set them on the dataset
+
+    Returns:
+        list: fields that were sent
+    """
+    fields = datasets.infer_fields(df)
+
+    print(
+        "Inferred field types: "
+        + ", ".join(f"{field['name']}={field['type']}" for field in fields)
     )
-    end_time = time.time()
 
-    elapsed_time = end_time - start_time
+    response = set_dataset_fields(dataset_id, fields, client=client)
+
+    if isinstance(response, dict) and response.get("status") == "error":
+        print(
+            f"Setting field types failed, leaving them to the server: {response.get('message', response)}"
+        )
+
+    return fields
+
+
+def _records_batch(client, payload, description, spill_path):
+    start_time = time.time()
+
+    response = client.post_models(payload, stream=True)
+
+    df, extras = read_records_frame(response, spill_path=spill_path)
+
+    elapsed_time = time.time() - start_time
 
     print(
-        f"Request to set dataset fields in {dataset_id} completed in {elapsed_time:.4f} seconds."
+        f"{description} with {len(payload['data'])} samples completed in {elapsed_time:.4f} seconds."
     )
 
-    return response.json()
+    # Check for application level errors
+    if extras.get("status") == "error" or df is None:
+        raise Exception(
+            f"Error from API: {extras.get('message', 'No predictions in the response')}"
+        )
+
+    return df
 
 
-def transform_data(project_id, input_data, save=False, save_file_path=""):
+def _records_request(
+    client,
+    payload,
+    description,
+    kind,
+    save_file_path="",
+    spill_path=None,
+):
+    """
+    POST payload and stream the "predictions" records of the response into columns
+
+    The rows in payload["data"] are sent in batches sized by the client's
+    batch sizer (kind names the call, e.g. "transform"), except with
+    spill_path, where a single response is streamed to the Parquet file.
+
+    Returns:
+        DataFrame: parsed records, or the Parquet path when spill_path is set
+    """
+    if spill_path:
+        df = _records_batch(client, payload, description, spill_path)
+    else:
+        frames = client.batch_sizer.run(
+            kind,
+            payload["data"],
+            lambda rows: _records_batch(
+                client, dict(payload, data=rows), description, None
+            ),
+        )
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    if spill_path:
+        print(f"Saved records to disk to {spill_path}")
+    elif save_file_path:
+        print(f"Saving records to disk to {save_file_path}")
+
+        df.to_csv(save_file_path, index=False)
+
+        print("Done!")
+
+    return df
+
+
+def _transform_payload(project_id, input_data):
+    return {
+        "id": project_id,
+        "data": input_data,
+        "deploy-transforms-only": "true",
+    }
+
+
+@profiling.profiled("transform")
+def transform_data(
+    project_id,
+    input_data,
+    save=False,
+    save_file_path="",
+    spill_path=None,
+    client=None,
+    use_cache=True,
+    cache=None,
+):
     """
     Make API request for data transformation
 
+    The "predictions" array is parsed incrementally from the response stream
+    straight into columns, so the raw body and a Python object tree never exist
+    next to the DataFrame. When spill_path is set the rows are written to that
+    Parquet file in row groups and the path is returned instead.
+
+    Unless use_cache is False (or spill_path is set), only rows missing from
+    the local transform cache are sent and cached outputs are merged back in.
+
     Returns:
-        dict: json response
+        DataFrame: transformed data, or the Parquet path when spill_path is set
+    """
+    client = get_client(client)
+    save_file_path = (save_file_path or "transformed_data.csv") if save else ""
+
+    if not use_cache or spill_path:
+        return _records_request(
+            client,
+            _transform_payload(project_id, input_data),
+            f"Request to transform data using project: {project_id} for input data",
+            "transform",
+            save_file_path=save_file_path,
+            spill_path=spill_path,
+        )
+
+    # Cached and fresh outputs go straight into columns, window by window
+    builder = ColumnBuilder()
+    for record in transform_cache.iter_cached_transform(
+        project_id,
+        input_data,
+        lambda rows: _transform_records(project_id, rows, client),
+        transform_cache.get_cache(cache),
+    ):
+        builder.append(record)
+    df = builder.to_frame()
+
+    if save_file_path:
+        print(f"Saving records to disk to {save_file_path}")
+
+        df.to_csv(save_file_path, index=False)
+
+        print("Done!")
+
+    return df
+
+
+def _transform_records(project_id, input_data, client):
+    """
+    Make API requests for data transformation, in batches sized by the client
+
+    Returns:
+        list: transformed records, streamed from the responses
     """
+    batches = client.batch_sizer.run(
+        "transform",
+        input_data,
+        lambda rows: _transform_batch(project_id, rows, client),
+    )
+    return [record for batch in batches for record in batch]
+
+
+def _transform_batch(project_id, input_data, client):
     start_time = time.time()
 
-    response = requests.post(
-        "{}://{}:{}/{}/models".format(PROTOCOL, URL, PORT, VERSION),
-        json={
-            "api_key": API_KEY,
-            "id": project_id,
-            "data": input_data,
-            "deploy-transforms-only": "true",
-        },
-        timeout=120,
+    response = client.post_models(
+        _transform_payload(project_id, input_data), stream=True
     )
 
-    end_time = time.time()
+    try:
+        # Check for HTTP errors
+        response.raise_for_status()
+
+        stream = JsonArrayStream(response.iter_content(READ_CHUNK_SIZE))
+        records = list(stream)
+    finally:
+        response.close()
 
-    elapsed_time = end_time - start_time
+    elapsed_time = time.time() - start_time
 
     print(
         f"Request to transform data using project: {project_id} for input data with {len(input_data)} samples completed in {elapsed_time:.4f} seconds."
     )
 
-    # Check for HTTP errors
-    response.raise_for_status()
+    # Check for application level errors; an error body has no predictions
+    if stream.extras.get("status") == "error" or not stream.found:
+        raise Exception(
+            f"Error from API: {stream.extras.get('message', 'No predictions in the transform response')}"
+        )
 
-    # Parse JSON response
-    resp_dict = response.json()
+    return records
 
-    if "predictions" in resp_dict.keys():
-        df = pd.DataFrame(resp_dict["predictions"])
+
+@profiling.profiled("transform")
+def transform_rows(project_id, input_data, client=None, use_cache=True, cache=None):
+    """
+    Make API request for data transformation and return rows ready for upload
+
+    Transformed records are streamed from the response and stringified (like
+    df_to_dict) without building a DataFrame. Unless use_cache is False, rows
+    found in the local transform cache are not sent again.
+
+    Returns:
+        list: transformed rows as dictionaries of strings
+    """
+    client = get_client(client)
+
+    if use_cache:
+        records = transform_cache.iter_cached_transform(
+            project_id,
+            input_data,
+            lambda rows: _transform_records(project_id, rows, client),
+            transform_cache.get_cache(cache),
+        )
     else:
-        df = pd.DataFrame(resp_dict)
+        records = _transform_records(project_id, input_data, client)
 
-    if save:
-        if not save_file_path:
-            save_file_path = "transformed_data.csv"
+    return [{name: str(value) for name, value in record.items()} for record in records]
 
-        print(f"Saving transformed dataset to disk to {save_file_path}")
 
-        df.to_csv(save_file_path, index=False)
+def preview_transform(
+    project_id,
+    input_df,
+    sample_rows=datasets.PREVIEW_ROWS,
+    stratify_by=None,
+    client=None,
+):
+    """
+    Transform a stratified sample of input_df as a quick check before a full run
 
-        print("Done!")
+    A wrong project id fails within seconds instead of after a full transform.
+    The sample goes through the transform cache, so the full run does not send
+    these rows again.
 
-    return df
+    Returns:
+        tuple: (transformed sample DataFrame, inferred fields of the output)
+    """
+    sample = datasets.stratified_sample(input_df, sample_rows, by=stratify_by)
 
+    print(
+        f"Previewing transform of project {project_id} on {len(sample)} of {len(input_df)} rows"
+    )
+
+    preview = pd.DataFrame(
+        transform_rows(project_id, df_to_dict(sample), client=client)
+    )
+    return preview, datasets.infer_fields(preview)
 
-def create_dataset(dataset_name, input_df):
-    # Create dataset based on train partition and add rows
-    print("Create Akkio dataset object with imported data...")
+
+def _new_dataset(dataset_name, client):
+    """Create an empty dataset after checking that the name is not taken"""
 
     # Do multiple dataset name check here to avoid creating unnecessary datasets
-    datasets = akkio.get_datasets()["datasets"]
-    dataset_df = pd.DataFrame(datasets)
+    datasets = client.get_datasets()["datasets"]
 
-    if dataset_name in dataset_df["name"].values:
+    if any(dataset.get("name") == dataset_name for dataset in datasets):
         raise ValueError(
             "Error: Multiple datasets with the same name found. Please specify a unique dataset name."
         )
 
-    new_dataset = akkio.create_dataset(dataset_name)
+    return client.create_dataset(dataset_name)
+
+
+def _reusable_dataset(fingerprint, registry, client, dataset_name):
+    """Return the id of an existing dataset with the same fingerprint, or None"""
+    entry = datasets.find_existing(registry, fingerprint, client)
+    if entry is None:
+        return None
+
+    print(
+        f"Identical data was already uploaded as dataset {entry['dataset_name']}, reusing id: {entry['dataset_id']}"
+    )
+    if entry["dataset_name"] != dataset_name:
+        print(
+            f"No dataset named {dataset_name} was created; pass reuse=False to upload the data again under that name"
+        )
+    return entry["dataset_id"]
+
+
+def create_dataset(
+    dataset_name, input_df, client=None, reuse=True, registry=None, set_fields=True
+):
+    """
+    Create a dataset from input_df
+
+    Unless reuse is False, the frame is fingerprinted (schema and row hashes)
+    and the id of a previous upload with identical content is returned instead
+    of uploading the rows again. The reused dataset keeps its original name,
+    so dataset_name is then ignored (a message says so). With set_fields, field types inferred locally
+    are set on the new dataset.
+
+    Returns:
+        str: dataset id
+    """
+    client = get_client(client)
+    registry = datasets.get_registry(registry)
+
+    fingerprint = datasets.fingerprint_frame(input_df)
+    if reuse:
+        existing_id = _reusable_dataset(fingerprint, registry, client, dataset_name)
+        if existing_id is not None:
+            return existing_id
+
+    # Create dataset based on train partition and add rows
+    print("Create Akkio dataset object with imported data...")
+
+    new_dataset = _new_dataset(dataset_name, client)
 
     # Add rows to new dataset
-    add_rows_to_dataset(new_dataset["dataset_id"], df_to_dict(input_df))
+    response = add_rows_to_dataset(
+        new_dataset["dataset_id"], df_to_dict(input_df), client=client
+    )
+    _check_upload(response)
 
     time.sleep(5)  # Pause for operation completion
 
     # get master dataset id after append
     # Won't need this once we can create dataset with file upload in one step
-    new_dataset_id = update_dataset_id(new_dataset)
+    new_dataset_id = update_dataset_id(new_dataset, client)
+
+    # Only a confirmed, non-empty upload is worth reusing
+    if len(input_df):
+        registry.record(fingerprint, new_dataset_id, dataset_name, len(input_df))
+
+    if set_fields:
+        set_inferred_fields(new_dataset_id, input_df, client=client)
+
+    # Remember the uploaded rows so later delta appends skip them
+    state = datasets.SyncState.load(new_dataset_id)
+    state.add_hashes(datasets.row_hashes(input_df))
+    state.rows += len(input_df)
+    state.save()
 
     print(f"Dataset is ready with id: {new_dataset_id}")
 
     return new_dataset_id
 
 
-def update_dataset_id(dataset_obj):
+def append_to_dataset(
+    dataset_id,
+    input_df,
+    watermark_column=None,
+    since=None,
+    chunk_size=TRANSFORM_CHUNK_ROWS,
+    client=None,
+    state_dir=None,
+):
+    """
+    Append only the rows of input_df that are not in the dataset yet
+
+    With watermark_column (an increasing timestamp or id column), rows above
+    the last uploaded value are appended; since overrides the saved value.
+    Otherwise rows are compared by hash with the rows uploaded before,
+    including those uploaded by create_dataset. The sync state is saved after
+    every chunk, so a failed sync resumes where it stopped.
+
+    Returns:
+        int: number of rows appended
+    """
+    client = get_client(client)
+    state = datasets.SyncState.load(dataset_id, state_dir)
+
+    new_df, new_hashes = datasets.delta_rows(
+        input_df, state, watermark_column=watermark_column, since=since
+    )
+
+    print(
+        f"Delta sync for dataset {dataset_id}: {len(new_df)} of {len(input_df)} rows are new."
+    )
+
+    for start in range(0, len(new_df), chunk_size):
+        chunk = new_df.iloc[start : start + chunk_size]
+        _check_upload(add_rows_to_dataset(dataset_id, df_to_dict(chunk), client=client))
+
+        if watermark_column is not None:
+            datasets.advance_watermark(state, chunk, watermark_column)
+        state.add_hashes(new_hashes[start : start + chunk_size])
+        state.rows += len(chunk)
+        state.save()
+
+    return len(new_df)
+
+
+def transform_to_dataset(
+    project_id,
+    input_df,
+    dataset_name,
+    chunk_size=TRANSFORM_CHUNK_ROWS,
+    progress_callback=None,
+    client=None,
+    reuse=True,
+    registry=None,
+    set_fields=True,
+):
+    """
+    Transform input_df chunk by chunk and pipe each result into a new dataset
+
+    The upload of chunk N runs on a background thread while chunk N+1 is being
+    transformed, and the full transformed frame is never materialized.
+    progress_callback, if given, is called with (rows_done, total_rows).
+
+    Unless reuse is False, a previous run of the same project over identical
+    input is detected by fingerprint and its dataset id returned directly,
+    keeping that dataset's name instead of dataset_name (a message says so).
+    With set_fields, field types are inferred from the first transformed
+    chunk and set on the new dataset.
+
+    Returns:
+        str: id of the new dataset
+    """
+    client = get_client(client)
+    registry = datasets.get_registry(registry)
+    total_rows = len(input_df)
+
+    fingerprint = datasets.fingerprint_frame(input_df, salt=f"transform:{project_id}")
+    if reuse:
+        existing_id = _reusable_dataset(fingerprint, registry, client, dataset_name)
+        if existing_id is not None:
+            if progress_callback:
+                progress_callback(total_rows, total_rows)
+            return existing_id
+
+    print("Create Akkio dataset object for transformed data...")
+
+    new_dataset = _new_dataset(dataset_name, client)
+    rows_done = 0
+    rows_uploaded = 0
+    schema_sample = None
+
+    with ThreadPoolExecutor(max_workers=1) as uploader:
+        pending = None
+
+        for start in range(0, total_rows, chunk_size):
+            chunk = input_df.iloc[start : start + chunk_size]
+            rows = transform_rows(project_id, df_to_dict(chunk), client=client)
+            if schema_sample is None:
+                schema_sample = rows[: datasets.SCHEMA_SAMPLE_ROWS]
+
+            # Keep at most one upload in flight and surface its errors
+            if pending is not None:
+                _check_upload(pending.result())
+                rows_done += pending_rows
+                if progress_callback:
+                    progress_callback(rows_done, total_rows)
+
+            pending = uploader.submit(
+                add_rows_to_dataset, new_dataset["dataset_id"], rows, client=client
+            )
+            pending_rows = len(chunk)
+            rows_uploaded += len(rows)
+
+        if pending is not None:
+            _check_upload(pending.result())
+            rows_done += pending_rows
+            if progress_callback:
+                progress_callback(rows_done, total_rows)
+
+    time.sleep(5)  # Pause for operation completion
+
+    # get master dataset id after append
+    new_dataset_id = update_dataset_id(new_dataset, client)
+
+    # Only a confirmed, non-empty upload is worth reusing
+    if rows_uploaded:
+        registry.record(fingerprint, new_dataset_id, dataset_name, rows_uploaded)
+
+    if set_fields and schema_sample:
+        set_inferred_fields(new_dataset_id, pd.DataFrame(schema_sample), client=client)
+
+    print(f"Dataset is ready with id: {new_dataset_id}")
+
+    return new_dataset_id
+
+
+def update_dataset_id(dataset_obj, client=None):
 
     old_dataset_id = dataset_obj["dataset_id"]
 
-    datasets = akkio.get_datasets()["datasets"]
+    datasets = get_client(client).get_datasets()["datasets"]
     df = pd.DataFrame(datasets)
 
     # Filter the DataFrame to get the list of IDs for the specified dataset name
@@ -479,16 +1249,93 @@ def update_dataset_id(dataset_obj):
     return new_master_id[0]
 
 
+class DeckTemplate:
+    """
+    A template deck parsed once and copied for every deck exported from it.
+
+    Parsing a branded template (its masters, layouts, theme and media) costs
+    more than copying the parsed parts, so the template is loaded once and
+    every ``PPTXExporter`` starts from a deep copy of it. Media blobs are
+    shared between the copies. Slides already in the template (e.g. a cover)
+    are kept at the start of every deck. Copies can be taken from several
+    threads at once.
+
+    Attributes:
+    -----------
+    source : str or file-like or None
+        The template .pptx, or None for python-pptx's default template.
+    blank_layout : int
+        Index of the slide layout artifact slides are added with.
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self._prs = pptx.Presentation(source)
+        self._lock = threading.Lock()
+
+        layouts = list(self._prs.slide_layouts)
+        names = [layout.name for layout in layouts]
+        if BLANK_LAYOUT_NAME in names:
+            self.blank_layout = names.index(BLANK_LAYOUT_NAME)
+        else:
+            self.blank_layout = min(
+                range(len(layouts)), key=lambda i: len(layouts[i].placeholders)
+            )
+
+    def presentation(self):
+        """
+        Returns a new presentation holding a copy of the template
+
+        Returns:
+            pptx.Presentation
+        """
+        with self._lock:
+            return copy.deepcopy(self._prs)
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(template=None):
+    """
+    Return template, or the DeckTemplate for a template path (None for the
+    default template)
+
+    Templates are parsed once per path and reused until the file changes.
+
+    Returns:
+        DeckTemplate
+    """
+    if isinstance(template, DeckTemplate):
+        return template
+
+    if template is None:
+        path, stamp = None, None
+    else:
+        stat = os.stat(template)
+        path, stamp = os.path.abspath(template), (stat.st_mtime_ns, stat.st_size)
+
+    with _templates_lock:
+        entry = _templates.get(path)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, DeckTemplate(template))
+            _templates[path] = entry
+        return entry[1]
+
+
 class PPTXExporter:
     """
-    A class to export images and CSV data as slides in a PowerPoint presentation.
+    A class to export images, tables and text as slides in a PowerPoint presentation.
 
     Attributes:
     -----------
-    artifacts_folder : str
-        Path to the folder containing images and CSV files to be added to the presentation.
+    artifacts_folder : str or ArtifactStore
+        Path to the folder containing images and CSV files to be added to the presentation,
+        or an in-memory ArtifactStore.
     prs : pptx.Presentation
-        A PowerPoint presentation object used to create and manipulate slides.
+        A PowerPoint presentation object used to create and manipulate slides,
+        copied from the template.
     image_layout : dict
         A dictionary containing the layout configuration for images on slides.
         Default layout is {'left': Inches(1), 'top': Inches(1), 'width': Inches(5), 'height': Inches(5)}.
@@ -505,38 +1352,50 @@ class PPTXExporter:
     """
 
     def __init__(
-        self, input_folder, image_layout=None, table_layout=None, text_layout=None
+        self,
+        input_folder,
+        image_layout=None,
+        table_layout=None,
+        text_layout=None,
+        template=None,
     ):
         """
         Initializes the PPTXExporter with the folder path containing artifacts and optional layout configurations.
 
         Parameters:
         -----------
-        input_folder : str
-            The folder path where images and CSV files are stored.
+        input_folder : str or ArtifactStore
+            The folder path where images and CSV files are stored, or an in-memory
+            ArtifactStore to export without reading files back.
         image_layout : dict, optional
             Layout configuration for images (default is None, which uses a preset layout).
         table_layout : dict, optional
             Layout configuration for tables (default is None, which uses a preset layout).
+        template : str or DeckTemplate, optional
+            Template deck to start from, as a path or a DeckTemplate loaded once
+            for many exports (default is None, which uses a blank presentation).
         """
         self.artifacts_folder = input_folder
-        self.prs = Presentation()
+
+        template = get_template(template)
+        self.prs = template.presentation()
+        self.blank_layout = self.prs.slide_layouts[template.blank_layout]
 
         self.slide_width = self.prs.slide_width
         self.slide_height = self.prs.slide_height
 
         self.table_layout = table_layout or {
-            "left": Inches(1),
-            "top": Inches(1),
-            "width": Inches(8),
-            "height": Inches(5),
+            "left": pptx_util.Inches(1),
+            "top": pptx_util.Inches(1),
+            "width": pptx_util.Inches(8),
+            "height": pptx_util.Inches(5),
         }
 
         self.text_layout = text_layout or {
-            "left": Inches(1),
-            "top": Inches(1),
-            "width": Inches(8),
-            "height": Inches(5),
+            "left": pptx_util.Inches(1),
+            "top": pptx_util.Inches(1),
+            "width": pptx_util.Inches(8),
+            "height": pptx_util.Inches(5),
         }
 
         # Adjust image layout to take up most of the slide, relative to slide size
@@ -552,41 +1411,90 @@ class PPTXExporter:
         """
         Creates slides for each image and CSV file in the artifacts folder.
 
-        The method iterates through all files in the specified folder.
+        The method iterates through all files in the specified folder in name order.
         If the file is an image (supported formats: PNG, JPG, JPEG, BMP, GIF, TIFF),
-        it creates an image slide. If the file is a CSV file, it creates a table slide.
+        it creates an image slide. If the file is a table (Parquet, Feather or CSV),
+        it creates a table slide. CSV side outputs of a typed table are skipped.
         """
         print("Starting process...")
 
+        # An ArtifactStore is exported from memory without touching the disk
+        if not isinstance(self.artifacts_folder, (str, os.PathLike)):
+            self._create_from_store(self.artifacts_folder)
+            return
+
         # Check if there are any files in the artifacts folder
         if not os.listdir(self.artifacts_folder):
             raise ValueError(
                 f"No files found in {self.artifacts_folder}. Files need to be present."
             )
 
-        for fname in os.listdir(self.artifacts_folder):
+        fnames = sorted(os.listdir(self.artifacts_folder))
+        typed_tables = {
+            os.path.splitext(fname)[0]
+            for fname in fnames
+            if fname.lower().endswith((".parquet", ".feather"))
+        }
+
+        for fname in fnames:
+            stem, ext = os.path.splitext(fname)
+            ext = ext.lower()
+            if ext == ".csv" and stem in typed_tables:
+                continue
+
+            # Hidden files and other files (e.g. saved chat responses) get no slide
+            if fname.startswith(".") or ext not in (
+                *IMAGE_EXTENSIONS,
+                *TABLE_READERS,
+                ".txt",
+            ):
+                continue
+
             print(f"Creating slide for: {fname}")
             file_path = os.path.join(self.artifacts_folder, fname)
 
-            if fname.lower().endswith(
-                (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tiff")
-            ):
+            if ext in IMAGE_EXTENSIONS:
                 self._add_image_slide(file_path)
-            elif fname.lower().endswith(".csv"):
+            elif ext in TABLE_READERS:
                 self._add_table_slide(file_path)
-            elif fname.lower().endswith(".txt"):
+            else:
                 self._add_text_slide(file_path)
 
+    def _create_from_store(self, store):
+        """
+        Creates slides for each artifact held in an ArtifactStore.
+
+        Parameters:
+        -----------
+        store : ArtifactStore
+            Store whose artifacts are added in name order.
+        """
+        if not len(store):
+            raise ValueError(
+                "No artifacts found in the store. Artifacts need to be present."
+            )
+
+        for artifact in store:
+            print(f"Creating slide for: {artifact.name}")
+
+            if artifact.kind == "image":
+                self._add_image_slide(io.BytesIO(artifact.data))
+            elif artifact.kind == "table":
+                self._add_table(artifact.data)
+            elif artifact.kind == "text":
+                self._add_text(artifact.data)
+
+    @profiling.profiled("slide")
     def _add_image_slide(self, image_path):
         """
         Adds an image slide to the presentation.
 
         Parameters:
         -----------
-        image_path : str
-            The full path to the image file to be added to the slide.
+        image_path : str or file-like
+            The full path to the image file, or a stream with the image data, to be added to the slide.
         """
-        slide = self.prs.slides.add_slide(self.prs.slide_layouts[6])
+        slide = self.prs.slides.add_slide(self.blank_layout)
         slide.shapes.add_picture(
             image_path,
             self.image_layout["left"],
@@ -595,19 +1503,31 @@ class PPTXExporter:
             height=self.image_layout["height"],
         )
 
-    def _add_table_slide(self, csv_file):
+    def _add_table_slide(self, table_file):
+        """
+        Adds a table slide to the presentation using data from a table file.
+
+        Parameters:
+        -----------
+        table_file : str
+            The full path to the Parquet, Feather or CSV file to be added to the slide.
         """
-        Adds a table slide to the presentation using data from a CSV file.
+        ext = os.path.splitext(table_file)[1].lower()
+        self._add_table(TABLE_READERS[ext](table_file))
+
+    @profiling.profiled("slide")
+    def _add_table(self, df):
+        """
+        Adds a table slide to the presentation from a DataFrame.
 
         Parameters:
         -----------
-        csv_file : str
-            The full path to the CSV file to be added to the slide.
+        df : pandas.DataFrame
+            The table to be added to the slide.
         """
-        df = pd.read_csv(csv_file)
         rows, cols = df.shape
 
-        slide = self.prs.slides.add_slide(self.prs.slide_layouts[6])
+        slide = self.prs.slides.add_slide(self.blank_layout)
         table = slide.shapes.add_table(
             rows + 1,
             cols,
@@ -621,7 +1541,7 @@ class PPTXExporter:
         for col_idx, col_name in enumerate(df.columns):
             table.cell(0, col_idx).text = col_name
 
-        # Populate the table with CSV data
+        # Populate the table with the table data
         for row_idx in range(rows):
             for col_idx in range(cols):
                 table.cell(row_idx + 1, col_idx).text = str(df.iat[row_idx, col_idx])
@@ -638,7 +1558,19 @@ class PPTXExporter:
         with open(text_file, "r", encoding="utf-8") as file:
             content = file.read()
 
-        slide = self.prs.slides.add_slide(self.prs.slide_layouts[6])
+        self._add_text(content)
+
+    @profiling.profiled("slide")
+    def _add_text(self, content):
+        """
+        Adds a text slide to the presentation.
+
+        Parameters:
+        -----------
+        content : str
+            The text to be added to the slide.
+        """
+        slide = self.prs.slides.add_slide(self.blank_layout)
         textbox = slide.shapes.add_textbox(
             self.text_layout["left"],
             self.text_layout["top"],
@@ -652,8 +1584,9 @@ class PPTXExporter:
         text_frame.word_wrap = True
         for paragraph in text_frame.paragraphs:
             for run in paragraph.runs:
-                run.font.size = Pt(12)  # Adjust the font size as needed
+                run.font.size = pptx_util.Pt(12)  # Adjust the font size as needed
 
+    @profiling.profiled("save")
     def save(self, filename):
         """
         Saves the PowerPoint presentation to the specified file.
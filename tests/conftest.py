@@ -0,0 +1,145 @@
+import io
+import json
+
+import pytest
+import requests
+
+from src.batching import BatchSizer
+
+
+def _response(body, status_code=200):
+    """requests.Response whose JSON body is read from raw, as with stream=True"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+    return response
+
+
+class FakeModelsClient:
+    """
+    Answers every models request with body, or with body(payload) when body is
+    callable, and records the payloads in requests.
+    """
+
+    def __init__(self, body=None, status_code=200, batch_sizer=None):
+        self.body = body
+        self.status_code = status_code
+        self.batch_sizer = batch_sizer or BatchSizer()
+        self.requests = []
+
+    def _respond(self, payload):
+        self.requests.append(payload)
+        body = self.body(payload) if callable(self.body) else self.body
+        return _response(body, self.status_code)
+
+    def post_models(self, payload, stream=False):
+        return self._respond(payload)
+
+
+class AsyncFakeModelsClient(FakeModelsClient):
+    async def post_models(self, payload, stream=False):
+        return self._respond(payload)
+
+
+class FakeChatClient:
+    """Reports every chat task with status, and returns chat_response once done."""
+
+    def __init__(self, chat_response=None, status="SUCCEEDED"):
+        self.chat_response = chat_response
+        self.status = status
+
+    def create_chat_request(self, project_id, content):
+        return {"task_id": f"task-{content}"}
+
+    def check_task_status(self, task_id):
+        return {"status": self.status, "metadata": {"location": f"/chats/{task_id}"}}
+
+    def get_chat_results(self, chat_id, format_type):
+        return self.chat_response
+
+
+class AsyncFakeChatClient(FakeChatClient):
+    async def create_chat_request(self, project_id, content):
+        return FakeChatClient.create_chat_request(self, project_id, content)
+
+    async def check_task_status(self, task_id):
+        return FakeChatClient.check_task_status(self, task_id)
+
+    async def get_chat_results(self, chat_id, format_type):
+        return FakeChatClient.get_chat_results(self, chat_id, format_type)
+
+
+def _echo(payload):
+    return {"predictions": payload["data"]}
+
+
+class FakeDatasetClient(FakeModelsClient):
+    """
+    In-memory datasets and models endpoints. Appending rows to a new dataset
+    creates its "master" copy under the same name, as the API does, and
+    transforms echo their input unless transform_body is set.
+    """
+
+    def __init__(self, upload_error=False, transform_body=None):
+        super().__init__(transform_body or _echo)
+        self.upload_error = upload_error
+        self.datasets = []
+        self.rows = {}
+
+    def get_datasets(self):
+        return {"datasets": list(self.datasets)}
+
+    def create_dataset(self, name):
+        dataset_id = f"dataset{len(self.datasets)}"
+        self.datasets.append({"id": dataset_id, "name": name})
+        return {"dataset_id": dataset_id, "dataset_name": name}
+
+    def add_rows_to_dataset(self, dataset_id, rows):
+        if self.upload_error:
+            return {"status": "error", "message": "Upload rejected"}
+
+        name = next(d["name"] for d in self.datasets if d["id"] == dataset_id)
+        master_id = f"{dataset_id}-master"
+        if not any(d["id"] == master_id for d in self.datasets):
+            self.datasets.append({"id": master_id, "name": name})
+        self.rows.setdefault(master_id, []).extend(rows)
+        return {"status": "success"}
+
+    def set_dataset_fields(self, dataset_id, fields):
+        return {"status": "success"}
+
+
+@pytest.fixture
+def make_response():
+    """Factory for JSON responses: make_response(body, status_code=200)"""
+    return _response
+
+
+@pytest.fixture
+def models_client():
+    """Factory for FakeModelsClient"""
+    return FakeModelsClient
+
+
+@pytest.fixture
+def async_models_client():
+    """Factory for AsyncFakeModelsClient"""
+    return AsyncFakeModelsClient
+
+
+@pytest.fixture
+def chat_client():
+    """Factory for FakeChatClient"""
+    return FakeChatClient
+
+
+@pytest.fixture
+def async_chat_client():
+    """Factory for AsyncFakeChatClient"""
+    return AsyncFakeChatClient
+
+
+@pytest.fixture
+def dataset_client():
+    """Factory for FakeDatasetClient"""
+    return FakeDatasetClient
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+
+from src import async_utils
+
+
+def test_run_chat_prompt_times_out_like_the_sync_wrapper(tmp_path, async_chat_client):
+    with pytest.raises(RuntimeError, match="Task timed out."):
+        asyncio.run(
+            async_utils.run_chat_prompt(
+                "project",
+                "prompt",
+                str(tmp_path),
+                timeout=0,
+                poll_interval=0,
+                client=async_chat_client(status="RUNNING"),
+            )
+        )
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (
+            {"status": "error", "message": "Project not deployed"},
+            "Project not deployed",
+        ),
+        ({"status": "ok"}, "No predictions in the transform response"),
+    ],
+)
+def test_transform_rows_raises_on_error_responses(body, message, async_models_client):
+    with pytest.raises(Exception, match=message):
+        asyncio.run(
+            async_utils.transform_rows(
+                "project",
+                [{"a": "1"}],
+                client=async_models_client(body),
+                use_cache=False,
+            )
+        )
+
+
+def test_transform_rows_returns_predictions(async_models_client):
+    client = async_models_client({"predictions": [{"a": 1, "b": 2}]})
+
+    rows = asyncio.run(
+        async_utils.transform_rows(
+            "project", [{"a": "1"}], client=client, use_cache=False
+        )
+    )
+
+    assert rows == [{"a": "1", "b": "2"}]
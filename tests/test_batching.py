@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+import requests
+
+from src import async_utils, batching, utils
+from src.batching import BatchSizer
+
+
+def predictions_unless(fail_value):
+    """Body predicting each row's value, or an error for a batch with fail_value"""
+
+    def body(payload):
+        if any(row["a"] == fail_value for row in payload["data"]):
+            return {"status": "failed", "message": "Model is retraining"}
+        return {"predictions": [{"prediction": row["a"]} for row in payload["data"]]}
+
+    return body
+
+
+def fixed_batches(rows):
+    return BatchSizer(initial_rows=rows, growth=1.0, min_rows=1)
+
+
+def test_record_sizes_batches_for_the_target_latency():
+    sizer = BatchSizer(target_seconds=10, initial_rows=1000, growth=100)
+
+    sizer.record("predict", 1000, 1.0)
+
+    assert sizer.size("predict") == 10_000
+
+
+def test_batches_grow_at_most_by_the_growth_factor_within_bounds():
+    sizer = BatchSizer(initial_rows=1000, max_rows=3000)
+
+    sizer.record("predict", 1000, 0.001)
+    assert sizer.size("predict") == 2000
+    sizer.record("predict", 2000, 0.001)
+    assert sizer.size("predict") == 3000
+
+
+def test_batches_stay_under_the_byte_limit():
+    sizer = BatchSizer(initial_rows=1000, max_bytes=5000)
+
+    assert sizer.size("upload", row_bytes=50) == 100
+
+
+def test_kinds_are_sized_independently():
+    sizer = BatchSizer(initial_rows=1000)
+
+    sizer.shrink("upload", 1000)
+
+    assert sizer.size("upload") == 500
+    assert sizer.size("predict") == 1000
+
+
+def test_run_splits_batches_rejected_as_too_large(make_response):
+    sizer = fixed_batches(8)
+    rows = [{"a": i} for i in range(8)]
+    sent = []
+
+    def send(batch):
+        if len(batch) > 2:
+            raise requests.HTTPError(response=make_response({}, 413))
+        sent.append(batch)
+        return len(batch)
+
+    results = sizer.run("upload", rows, send)
+
+    assert sum(results) == 8 and max(results) <= 2
+    assert [row for batch in sent for row in batch] == rows
+    # The byte limit learned from the 413 sticks for later runs
+    assert sizer.size("upload", batching.bytes_per_row(rows)) <= 2
+
+
+def test_run_raises_timeouts_that_are_not_retried():
+    sizer = fixed_batches(8)
+    calls = []
+
+    def send(batch):
+        calls.append(batch)
+        raise requests.exceptions.ReadTimeout()
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        sizer.run("upload", [{"a": i} for i in range(8)], send, retry_timeouts=False)
+    assert len(calls) == 1
+    assert sizer.size("upload") == 4
+
+
+def test_run_raises_other_errors_without_shrinking(make_response):
+    sizer = fixed_batches(8)
+
+    def send(batch):
+        raise requests.HTTPError(response=make_response({}, 500))
+
+    with pytest.raises(requests.HTTPError):
+        sizer.run("predict", [{"a": i} for i in range(8)], send)
+    assert sizer.size("predict") == 8
+
+
+def test_run_stops_when_asked():
+    sizer = fixed_batches(2)
+
+    results = sizer.run("upload", list(range(8)), len, stop=lambda result: True)
+
+    assert results == [2]
+
+
+def test_arun_sends_all_rows_in_order():
+    sizer = fixed_batches(3)
+
+    async def send(batch):
+        return batch
+
+    results = asyncio.run(sizer.arun("transform", list(range(7)), send))
+
+    assert results == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+ROWS = [{"a": i} for i in range(5)]
+
+
+def test_make_prediction_merges_every_batch(models_client):
+    client = models_client(predictions_unless(None), batch_sizer=fixed_batches(2))
+
+    resp_dict = utils.make_prediction("model", ROWS, client=client)
+
+    assert [p["prediction"] for p in resp_dict["predictions"]] == list(range(5))
+
+
+def test_make_prediction_raises_when_a_batch_has_no_predictions(models_client):
+    client = models_client(predictions_unless(3), batch_sizer=fixed_batches(2))
+
+    with pytest.raises(Exception, match="batch 2 of 3: Model is retraining"):
+        utils.make_prediction("model", ROWS, client=client)
+
+
+def test_async_make_prediction_merges_and_raises_like_the_sync_one(
+    async_models_client,
+):
+    client = async_models_client(predictions_unless(None), batch_sizer=fixed_batches(2))
+    resp_dict = asyncio.run(async_utils.make_prediction("model", ROWS, client=client))
+    assert [p["prediction"] for p in resp_dict["predictions"]] == list(range(5))
+
+    with pytest.raises(Exception, match="batch 3 of 3"):
+        asyncio.run(
+            async_utils.make_prediction(
+                "model",
+                ROWS,
+                client=async_models_client(
+                    predictions_unless(4), batch_sizer=fixed_batches(2)
+                ),
+            )
+        )
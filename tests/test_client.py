@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from src.async_client import AsyncAkkioClient
+from src.client import AkkioClient
+
+
+class FakeSession:
+    """Records requests and answers each with the same canned response."""
+
+    def __init__(self, response):
+        self.response = response
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return self.response
+
+    def post(self, url, **kwargs):
+        self.urls.append(url)
+        return self.response
+
+
+def make_client(response):
+    client = AkkioClient("key")
+    client._session = FakeSession(response)
+    return client
+
+
+def test_dataset_calls_use_the_sdk_host(make_response):
+    client = make_client(make_response({"datasets": []}))
+
+    assert client.get_datasets() == {"datasets": []}
+    client.create_dataset("name")
+
+    assert client.session.urls == [
+        "https://api.akk.io:443/v1/datasets",
+        "https://api.akk.io:443/v1/datasets",
+    ]
+
+
+CALLS = {
+    "get_datasets": (),
+    "create_dataset": ("name",),
+    "set_dataset_fields": ("dataset", []),
+    "create_model": ("dataset", ["label"]),
+}
+
+
+@pytest.mark.parametrize("call", list(CALLS))
+def test_dataset_and_model_calls_raise_http_errors(call, make_response):
+    client = make_client(make_response({"message": "Unauthorized"}, 401))
+
+    with pytest.raises(requests.HTTPError):
+        getattr(client, call)(*CALLS[call])
+
+
+def test_models_are_trained_through_the_sdk_host(make_response):
+    client = make_client(make_response({"model_id": "m"}))
+
+    assert client.create_model("dataset", ["label"]) == {"model_id": "m"}
+    assert client.session.urls == ["https://api.akk.io:443/v1/models"]
+
+
+def run_async_client(call, status_code):
+    urls = []
+
+    def handler(request):
+        urls.append(f"{request.url.host}{request.url.path}")
+        return httpx.Response(status_code, json={"message": "done"})
+
+    async def main():
+        async with AsyncAkkioClient("key") as client:
+            client._async_session = httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            )
+            return await getattr(client, call)(*CALLS[call])
+
+    return asyncio.run(main()), urls
+
+
+@pytest.mark.parametrize("call", list(CALLS))
+def test_async_dataset_and_model_calls_raise_http_errors(call):
+    with pytest.raises(httpx.HTTPStatusError):
+        run_async_client(call, 401)
+
+
+def test_async_models_are_trained_through_the_sdk_host():
+    result, urls = run_async_client("create_model", 200)
+
+    assert result == {"message": "done"}
+    assert urls == ["api.akk.io/v1/models"]
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from src import datasets, transform_cache, utils
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(datasets, "SYNC_STATE_DIR", str(tmp_path / "sync"))
+    monkeypatch.setattr(
+        transform_cache, "TRANSFORM_CACHE", str(tmp_path / "transform_cache.sqlite")
+    )
+    return datasets.DatasetRegistry(str(tmp_path / "datasets.json"))
+
+
+DF = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+
+def test_identical_upload_is_reused_and_the_new_name_reported(
+    registry, capsys, dataset_client
+):
+    client = dataset_client()
+
+    first = utils.create_dataset("first", DF, client=client, registry=registry)
+    capsys.readouterr()
+    second = utils.create_dataset("second", DF, client=client, registry=registry)
+
+    assert first == second
+    assert len(client.rows[first]) == 3
+    assert "No dataset named second was created" in capsys.readouterr().out
+
+
+def test_failed_upload_raises_and_is_not_recorded(registry, dataset_client):
+    client = dataset_client(upload_error=True)
+
+    with pytest.raises(Exception, match="Upload rejected"):
+        utils.create_dataset("first", DF, client=client, registry=registry)
+
+    assert registry.lookup(datasets.fingerprint_frame(DF)) is None
+
+
+def test_empty_upload_is_not_recorded(registry, dataset_client):
+    client = dataset_client()
+
+    utils.create_dataset("empty", DF.iloc[:0], client=client, registry=registry)
+
+    assert registry.lookup(datasets.fingerprint_frame(DF.iloc[:0])) is None
+
+
+def test_transformed_dataset_is_reused(registry, dataset_client):
+    client = dataset_client()
+
+    first = utils.transform_to_dataset(
+        "project", DF, "first", client=client, registry=registry
+    )
+    second = utils.transform_to_dataset(
+        "project", DF, "second", client=client, registry=registry
+    )
+
+    assert first == second
+    assert len(client.rows[first]) == 3
+
+
+def test_failed_transform_is_not_recorded(registry, dataset_client):
+    client = dataset_client(
+        transform_body={"status": "error", "message": "Project not found"}
+    )
+
+    with pytest.raises(Exception, match="Project not found"):
+        utils.transform_to_dataset("wrong", DF, "out", client=client, registry=registry)
+
+    fingerprint = datasets.fingerprint_frame(DF, salt="transform:wrong")
+    assert registry.lookup(fingerprint) is None
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import datasets
+
+
+@pytest.fixture
+def state(tmp_path):
+    return datasets.SyncState("dataset", str(tmp_path))
+
+
+def upload(state, df, watermark_column=None):
+    """Record df as uploaded, as append_to_dataset does after each chunk"""
+    if watermark_column is not None:
+        datasets.advance_watermark(state, df, watermark_column)
+    state.add_hashes(datasets.row_hashes(df))
+    state.save()
+
+
+def test_hash_mode_skips_uploaded_rows(state):
+    upload(state, pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+
+    new_df, hashes = datasets.delta_rows(
+        pd.DataFrame({"a": [2, 3], "b": ["y", "z"]}), state
+    )
+
+    assert new_df["a"].tolist() == [3]
+    assert len(hashes) == 1
+
+
+def test_hashes_do_not_depend_on_dtype(state):
+    upload(state, pd.DataFrame({"a": [1, 2], "b": ["x", None]}))
+
+    # The same data re-read with a missing value turns "a" into floats
+    reread = pd.DataFrame({"a": [1.0, 2.0, np.nan], "b": ["x", np.nan, "z"]})
+    new_df, _ = datasets.delta_rows(reread, state)
+
+    assert new_df["b"].tolist() == ["z"]
+
+
+def test_numeric_text_is_not_merged_with_other_text(state):
+    upload(state, pd.DataFrame({"zip": ["02134"]}))
+
+    new_df, _ = datasets.delta_rows(pd.DataFrame({"zip": ["2134"]}), state)
+
+    assert len(new_df) == 1
+
+
+def test_watermark_selects_newer_rows_in_order(state):
+    upload(state, pd.DataFrame({"ts": [1, 2]}), watermark_column="ts")
+
+    new_df, hashes = datasets.delta_rows(
+        pd.DataFrame({"ts": [4, 1, 3, 2]}), state, watermark_column="ts"
+    )
+
+    assert new_df["ts"].tolist() == [3, 4]
+    assert list(hashes) == list(datasets.row_hashes(new_df))
+
+
+def test_first_watermark_sync_skips_rows_uploaded_by_hash(state):
+    upload(state, pd.DataFrame({"ts": [1, 2]}))
+
+    new_df, _ = datasets.delta_rows(
+        pd.DataFrame({"ts": [1, 2, 3]}), state, watermark_column="ts"
+    )
+
+    assert new_df["ts"].tolist() == [3]
+
+
+def test_switching_watermark_column_needs_since(state):
+    df = pd.DataFrame({"ts": [1, 2], "updated": ["2024-01-01", "2024-02-01"]})
+    upload(state, df, watermark_column="ts")
+
+    with pytest.raises(ValueError, match="synced by watermark column 'ts'"):
+        datasets.delta_rows(df, state, watermark_column="updated")
+
+    new_df, _ = datasets.delta_rows(
+        df, state, watermark_column="updated", since="2024-01-15"
+    )
+    assert new_df["ts"].tolist() == [2]
+
+
+def test_state_round_trips(state, tmp_path):
+    upload(state, pd.DataFrame({"ts": [1, 5]}), watermark_column="ts")
+
+    loaded = datasets.SyncState.load("dataset", str(tmp_path))
+
+    assert (loaded.watermark_column, loaded.watermark) == ("ts", "5")
+    assert loaded.hash_version == datasets.ROW_HASH_VERSION
+    assert np.array_equal(loaded.hashes, state.hashes)
+
+
+def test_states_with_old_hashes_still_match(state, tmp_path):
+    df = pd.DataFrame({"a": [1, 2]})
+    state.add_hashes(datasets._raw_row_hashes(df))
+    state.save()
+    meta_path = tmp_path / "dataset.json"
+    meta = json.loads(meta_path.read_text())
+    del meta["hash_version"]
+    meta_path.write_text(json.dumps(meta))
+
+    loaded = datasets.SyncState.load("dataset", str(tmp_path))
+    new_df, _ = datasets.delta_rows(pd.DataFrame({"a": [1, 2, 3]}), loaded)
+
+    assert new_df["a"].tolist() == [3]
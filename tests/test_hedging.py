@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.hedging import HedgePolicy
+
+
+def policy():
+    # Hedge after 50 ms, with a token for every call
+    return HedgePolicy(initial_delay=0.05, min_delay=0.05, budget_ratio=1.0)
+
+
+def test_call_returns_the_hedge_when_the_first_attempt_stalls():
+    hedge = policy()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(5)
+            return "stalled"
+        return "hedged"
+
+    try:
+        assert hedge.call("status", fetch) == "hedged"
+    finally:
+        release.set()
+    assert (hedge.hedged, hedge.hedge_wins) == (1, 1)
+
+
+def test_acall_returns_the_hedge_and_cancels_the_stalled_attempt():
+    hedge = policy()
+    cancelled = []
+
+    async def main():
+        calls = []
+
+        async def fetch():
+            calls.append(None)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(None)
+                    raise
+                return "stalled"
+            return "hedged"
+
+        value = await hedge.acall("status", fetch)
+        await asyncio.sleep(0)
+        return value
+
+    assert asyncio.run(main()) == "hedged"
+    assert cancelled == [None]
+    assert (hedge.hedged, hedge.hedge_wins, hedge._in_flight) == (1, 1, 0)
+
+
+def test_acall_does_not_hedge_fast_requests():
+    hedge = policy()
+
+    async def fetch():
+        return "fast"
+
+    assert asyncio.run(hedge.acall("fetch", fetch)) == "fast"
+    assert hedge.hedged == 0
+
+
+def test_acall_raises_only_when_every_attempt_failed():
+    hedge = policy()
+
+    async def main():
+        calls = []
+
+        async def fetch():
+            calls.append(None)
+            if len(calls) == 1:
+                await asyncio.sleep(0.1)
+                raise ValueError("first")
+            raise ValueError("hedge")
+
+        return await hedge.acall("status", fetch)
+
+    start_time = time.time()
+    with pytest.raises(ValueError, match="hedge"):
+        asyncio.run(main())
+    # The hedge failed first, so the call waited for the first attempt too
+    assert time.time() - start_time >= 0.1
+    assert hedge._in_flight == 0
+
+
+def test_acall_respects_the_hedge_budget():
+    hedge = HedgePolicy(initial_delay=0.01, min_delay=0.01, budget_ratio=0.0)
+    hedge._tokens = 0.0
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    assert asyncio.run(hedge.acall("status", fetch)) == "slow"
+    assert hedge.hedged == 0
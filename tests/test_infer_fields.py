@@ -0,0 +1,68 @@
+import pandas as pd
+
+from src import datasets
+
+
+def types(df):
+    return {field["name"]: field["type"] for field in datasets.infer_fields(df)}
+
+
+def test_small_unique_text_columns_are_not_ids():
+    df = pd.DataFrame(
+        {
+            "name": ["Alice", "Bob", "Carol"],
+            "city": ["NY", "LA", "SF"],
+            "email": ["a@x.com", "b@x.com", "c@x.com"],
+        }
+    )
+
+    assert types(df) == {"name": "string", "city": "string", "email": "string"}
+
+
+def test_columns_named_as_ids_are_ids():
+    df = pd.DataFrame(
+        {"id": ["a1", "b2", "c3"], "user_id": [10, 11, 12], "count": [10, 11, 12]}
+    )
+
+    assert types(df) == {"id": "id", "user_id": "id", "count": "integer"}
+
+
+def test_many_unique_codes_are_ids():
+    codes = [f"SKU-{i:05d}" for i in range(datasets.SCHEMA_ID_MIN_ROWS)]
+    sentences = [f"Order {i} shipped" for i in range(datasets.SCHEMA_ID_MIN_ROWS)]
+
+    assert types(pd.DataFrame({"sku": codes, "note": sentences})) == {
+        "sku": "id",
+        "note": "string",
+    }
+
+
+def test_numbers_dates_and_categories():
+    df = pd.DataFrame(
+        {
+            "amount": [1.5, 2.25, 3.0, 4.75],
+            "day": ["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"],
+            "segment": ["a", "b", "a", "b"],
+            "active": [True, False, True, True],
+        }
+    )
+
+    assert types(df) == {
+        "amount": "float",
+        "day": "date",
+        "segment": "category",
+        "active": "category",
+    }
+
+
+def test_uploaded_strings_are_parsed_and_empty_columns_disabled():
+    df = pd.DataFrame(
+        {"qty": ["1", "2", "None", "4"], "blank": ["", "nan", "None", ""]}
+    )
+
+    fields = datasets.infer_fields(df)
+
+    assert fields == [
+        {"name": "qty", "type": "integer", "valid": True},
+        {"name": "blank", "type": "unknown", "valid": False},
+    ]
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from src import precompute
+
+DAILY = {"name": "daily", "hour": 5, "minute": 0}
+MONDAYS = {"name": "weekly", "hour": 5, "minute": 0, "weekday": 0}
+
+# 2026-10-21 is a Wednesday
+WEDNESDAY_NOON = datetime(2026, 10, 21, 12, 0)
+WEDNESDAY_EARLY = datetime(2026, 10, 21, 4, 59)
+
+
+def test_daily_due_times():
+    assert precompute.last_due(DAILY, WEDNESDAY_NOON) == datetime(2026, 10, 21, 5, 0)
+    assert precompute.next_due(DAILY, WEDNESDAY_NOON) == datetime(2026, 10, 22, 5, 0)
+    assert precompute.last_due(DAILY, WEDNESDAY_EARLY) == datetime(2026, 10, 20, 5, 0)
+    assert precompute.next_due(DAILY, WEDNESDAY_EARLY) == datetime(2026, 10, 21, 5, 0)
+
+
+def test_weekly_due_times():
+    assert precompute.last_due(MONDAYS, WEDNESDAY_NOON) == datetime(2026, 10, 19, 5, 0)
+    assert precompute.next_due(MONDAYS, WEDNESDAY_NOON) == datetime(2026, 10, 26, 5, 0)
+
+
+def test_weekly_due_on_the_day_itself():
+    monday_early = datetime(2026, 10, 19, 4, 0)
+    monday_due = datetime(2026, 10, 19, 5, 0)
+
+    assert precompute.last_due(MONDAYS, monday_early) == datetime(2026, 10, 12, 5, 0)
+    assert precompute.next_due(MONDAYS, monday_early) == monday_due
+    assert precompute.last_due(MONDAYS, monday_due) == monday_due
+
+
+def publish(cache, tmp_path, api_key, max_age_hours=24):
+    deck = tmp_path / "deck.pptx"
+    deck.write_bytes(b"deck")
+    return cache.publish(
+        "project", ["a", "b"], api_key, str(deck), str(tmp_path / "none"), max_age_hours
+    )
+
+
+def test_decks_are_only_served_to_the_key_that_built_them(tmp_path):
+    cache = precompute.DeckCache(str(tmp_path / "cache"))
+    publish(cache, tmp_path, "key-1")
+
+    entry = cache.lookup("project", [" a", "b", ""], "key-1")
+    assert entry is not None
+    assert open(entry["deck"], "rb").read() == b"deck"
+    assert cache.lookup("project", ["a", "b"], "key-2") is None
+    with pytest.raises(ValueError):
+        cache.lookup("project", ["a", "b"], "")
+
+
+def test_expired_decks_are_not_served(tmp_path):
+    cache = precompute.DeckCache(str(tmp_path / "cache"))
+    publish(cache, tmp_path, "key-1", max_age_hours=1)
+
+    entry = cache.lookup("project", ["a", "b"], "key-1")
+    assert (
+        cache.lookup("project", ["a", "b"], "key-1", now=entry["expires_at"] + 1)
+        is None
+    )
+
+
+def test_key_id_does_not_contain_the_key():
+    assert "secret-key" not in precompute.key_id("secret-key")
+    assert precompute.key_id("secret-key") == precompute.key_id("secret-key")
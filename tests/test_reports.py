@@ -0,0 +1,40 @@
+import json
+import os
+
+from src import latency, reports
+
+CHAT_RESPONSE = {"messages": [{"content": "code"}, {"content": "Revenue grew 4%."}]}
+
+
+def run(tmp_path, client, **kwargs):
+    return reports.generate_reports(
+        {"project": ["a", "b"]},
+        str(tmp_path / "out"),
+        export=False,
+        client=client,
+        history=latency.LatencyHistory(str(tmp_path / "latency.json")),
+        **kwargs,
+    )
+
+
+def test_save_responses_without_persist_writes_responses(tmp_path, chat_client):
+    results = run(
+        tmp_path, chat_client(CHAT_RESPONSE), persist=False, save_responses=True
+    )
+
+    assert results["project"]["errors"] == []
+    folder = tmp_path / "out" / "project"
+    saved = sorted(name for name in os.listdir(folder))
+    assert saved == [
+        "001_project_project_taskid_task-a_response.json",
+        "002_project_project_taskid_task-b_response.json",
+    ]
+    assert json.loads((folder / saved[0]).read_text()) == CHAT_RESPONSE
+
+
+def test_no_persist_keeps_artifacts_in_memory(tmp_path, chat_client):
+    results = run(tmp_path, chat_client(CHAT_RESPONSE), persist=False)
+
+    assert results["project"]["errors"] == []
+    assert len(results["project"]["artifacts"]) == 2
+    assert not (tmp_path / "out" / "project").exists()
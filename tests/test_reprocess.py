@@ -0,0 +1,25 @@
+import os
+
+from src import reprocess
+
+
+def test_deck_paths_exports_a_single_folder_to_the_deck():
+    artifacts = [
+        os.path.join("out", "001_image.png"),
+        os.path.join("out", "002_text.txt"),
+    ]
+
+    assert reprocess.deck_paths("out", artifacts, "deck.pptx") == {"deck.pptx": "out"}
+
+
+def test_deck_paths_exports_one_deck_per_project_folder():
+    artifacts = [
+        os.path.join("out", "p1", "001_image.png"),
+        os.path.join("out", "p2", "001_text.txt"),
+        os.path.join("out", "p1", "002_table.parquet"),
+    ]
+
+    assert reprocess.deck_paths("out", artifacts, "decks/restyled.pptx") == {
+        "decks/restyled_p1.pptx": os.path.join("out", "p1"),
+        "decks/restyled_p2.pptx": os.path.join("out", "p2"),
+    }
@@ -0,0 +1,106 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.streaming import ColumnBuilder, JsonArrayStream, read_records_frame
+
+BODY = {
+    "status": "ok",
+    "predictions": [{"name": "Zoë", "score": 12345}, {"name": "日本", "score": -1.5e3}],
+    "meta": {"rows": [1, 2]},
+}
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_stream_yields_items_and_extras_across_chunk_boundaries(size):
+    data = json.dumps(BODY, ensure_ascii=False).encode("utf-8")
+    stream = JsonArrayStream(chunked(data, size))
+
+    assert list(stream) == BODY["predictions"]
+    assert stream.found
+    assert stream.extras == {"status": "ok", "meta": {"rows": [1, 2]}}
+
+
+def test_stream_without_the_key_collects_everything_as_extras():
+    stream = JsonArrayStream([b'{"status": "error", "message": "Bad project"}'])
+
+    assert list(stream) == []
+    assert not stream.found
+    assert stream.extras == {"status": "error", "message": "Bad project"}
+
+
+def test_stream_of_a_top_level_array():
+    stream = JsonArrayStream(chunked(b" [1, 22, 333] ", 2))
+
+    assert list(stream) == [1, 22, 333]
+    assert stream.found
+
+
+def test_stream_of_empty_containers():
+    assert list(JsonArrayStream([b"{}"])) == []
+    stream = JsonArrayStream([b'{"predictions": []}'])
+    assert list(stream) == [] and stream.found
+
+
+def test_stream_raises_on_a_truncated_response():
+    with pytest.raises(ValueError):
+        list(JsonArrayStream([b'{"predictions": [{"a": 1}, ']))
+
+
+def test_column_builder_pads_missing_and_late_columns():
+    builder = ColumnBuilder()
+    builder.append({"a": 1})
+    builder.append({"b": 2})
+    builder.append({"a": 3, "b": 4})
+
+    assert builder.columns == {"a": [1, None, 3], "b": [None, 2, 4]}
+    assert builder.rows == 3
+
+    builder.clear()
+    builder.append({"b": 5})
+    assert builder.columns == {"a": [None], "b": [5]}
+
+
+def test_read_records_frame_builds_the_frame_and_closes_the_response(make_response):
+    response = make_response(BODY)
+
+    frame, extras = read_records_frame(response)
+
+    pd.testing.assert_frame_equal(frame, pd.DataFrame(BODY["predictions"]))
+    assert extras["status"] == "ok"
+    assert response.raw.closed
+
+
+def test_read_records_frame_returns_only_the_extras_of_an_error_body(make_response):
+    body = {"status": "error", "message": "bad model id"}
+    response = make_response(body)
+
+    frame, extras = read_records_frame(response)
+
+    assert frame is None
+    assert extras == body
+    assert response.raw.closed
+
+
+def test_read_records_frame_spills_to_parquet(tmp_path, make_response):
+    pytest.importorskip("pyarrow")
+    records = [{"a": i} for i in range(5)] + [{"a": 5, "b": "x"}]
+    path = str(tmp_path / "out.parquet")
+
+    with pytest.raises(ValueError, match="b"):
+        read_records_frame(
+            make_response({"predictions": records}), spill_path=path, chunk_rows=2
+        )
+
+    result, _ = read_records_frame(
+        make_response({"predictions": records[::-1]}), spill_path=path, chunk_rows=2
+    )
+    assert result == path
+    frame = pd.read_parquet(path)
+    assert frame["a"].tolist() == [5, 4, 3, 2, 1, 0]
+    assert frame["b"].iloc[0] == "x" and frame["b"].iloc[1:].isna().all()
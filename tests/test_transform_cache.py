@@ -0,0 +1,91 @@
+import pytest
+
+from src import transform_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = transform_cache.TransformCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+class Transform:
+    """Row-wise fake transform that records the rows it was sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, rows):
+        self.sent.extend(row["id"] for row in rows)
+        return [{"id": row["id"], "double": row["id"] * 2} for row in rows]
+
+
+def rows(*ids):
+    return [{"id": i} for i in ids]
+
+
+def test_cached_rows_are_not_sent_again(cache):
+    fetch = Transform()
+    transform_cache.cached_transform("p", rows(1, 2), fetch, cache)
+
+    out = transform_cache.cached_transform("p", rows(3, 1, 2, 3), fetch, cache)
+
+    assert [record["double"] for record in out] == [6, 2, 4, 6]
+    assert fetch.sent == [1, 2, 3]
+
+
+def test_windows_keep_input_order(cache):
+    fetch = Transform()
+    transform_cache.cached_transform("p", rows(2, 4), fetch, cache)
+
+    out = list(
+        transform_cache.iter_cached_transform(
+            "p", rows(1, 2, 3, 4, 5), fetch, cache, window=2
+        )
+    )
+
+    assert [record["id"] for record in out] == [1, 2, 3, 4, 5]
+    assert fetch.sent == [2, 4, 1, 3, 5]
+
+
+def test_outputs_are_streamed_window_by_window(cache):
+    fetch = Transform()
+    stream = transform_cache.iter_cached_transform(
+        "p", rows(1, 2, 3, 4), fetch, cache, window=2
+    )
+
+    assert next(stream)["id"] == 1
+    assert fetch.sent == [1, 2]
+
+
+def test_projects_are_cached_separately(cache):
+    fetch = Transform()
+    transform_cache.cached_transform("a", rows(1), fetch, cache)
+    transform_cache.cached_transform("b", rows(1), fetch, cache)
+
+    assert fetch.sent == [1, 1]
+
+
+def test_non_row_wise_transform_sends_each_row_once(cache):
+    transform_cache.cached_transform("p", rows(2), Transform(), cache)
+    sent = []
+
+    def drop_odd(batch):
+        sent.extend(row["id"] for row in batch)
+        return [row for row in batch if row["id"] % 2 == 0]
+
+    with pytest.warns(UserWarning, match="not row-wise"):
+        out = transform_cache.cached_transform("p", rows(1, 2, 3, 4), drop_odd, cache)
+
+    assert sorted(sent) == [1, 2, 3, 4]
+    assert sorted(record["id"] for record in out) == [2, 4]
+
+    # Later calls skip the cache instead of sending the rows twice
+    sent.clear()
+    transform_cache.cached_transform("p", rows(1, 2), drop_odd, cache)
+    assert sent == [1, 2]
+    assert not cache.row_wise("p")
+
+    cache.clear("p")
+    assert cache.row_wise("p")
@@ -0,0 +1,65 @@
+import pytest
+import requests
+
+from src import transform_cache, utils
+
+ROWS = [{"a": "1"}, {"a": "2"}]
+
+
+def test_transform_rows_returns_streamed_predictions(models_client):
+    client = models_client({"predictions": [{"a": 1, "b": 2.5}, {"a": 2, "b": None}]})
+
+    rows = utils.transform_rows("project", ROWS, client=client, use_cache=False)
+
+    assert rows == [{"a": "1", "b": "2.5"}, {"a": "2", "b": "None"}]
+
+
+def test_error_body_raises(models_client):
+    client = models_client({"status": "error", "message": "Project not found"})
+
+    with pytest.raises(Exception, match="Project not found"):
+        utils.transform_rows("wrong", ROWS, client=client, use_cache=False)
+
+
+def test_body_without_predictions_raises(models_client):
+    client = models_client({"status": "success"})
+
+    with pytest.raises(Exception, match="No predictions"):
+        utils.transform_rows("project", ROWS, client=client, use_cache=False)
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ({"status": "error", "message": "bad model id"}, "bad model id"),
+        ({"status": "success"}, "No predictions"),
+    ],
+)
+def test_streamed_error_bodies_raise_the_api_message(body, message, models_client):
+    client = models_client(body)
+
+    with pytest.raises(Exception, match=message):
+        utils.transform_data("project", ROWS, client=client, use_cache=False)
+    with pytest.raises(Exception, match=message):
+        utils.make_prediction("model", ROWS, as_frame=True, client=client)
+
+
+def test_http_error_raises(models_client):
+    client = models_client({"status": "error", "message": "boom"}, status_code=500)
+
+    with pytest.raises(requests.HTTPError):
+        utils.transform_rows("project", ROWS, client=client, use_cache=False)
+
+
+def test_cached_transform_does_not_cache_errors(tmp_path, models_client):
+    client = models_client({"status": "error", "message": "Project not found"})
+    cache = transform_cache.TransformCache(str(tmp_path / "cache.sqlite"))
+
+    with pytest.raises(Exception, match="Project not found"):
+        utils.transform_data("wrong", ROWS, client=client, cache=cache)
+
+    client.body = {"predictions": [{"a": 1}, {"a": 2}]}
+    df = utils.transform_data("wrong", ROWS, client=client, cache=cache)
+
+    assert df["a"].tolist() == [1, 2]
+    assert len(client.requests) == 2